@@ -12,7 +12,7 @@ target_payouts = [20, 30, 260]  # 0.2x, 0.3x, 2.6x
 # Decompress and read books
 with open(book_file, 'rb') as f:
     dctx = zstd.ZstdDecompressor()
-    decompressed = dctx.decompress(f.read())
+    decompressed = dctx.stream_reader(f, read_across_frames=True).read()
 
 lines = decompressed.decode('utf-8').strip().split('\n')
 
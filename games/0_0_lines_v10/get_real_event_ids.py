@@ -49,7 +49,7 @@ for mode_info in modes:
     print(f"  Decompressing {book_file.name}...")
     with open(book_file, 'rb') as f:
         dctx = zstd.ZstdDecompressor()
-        decompressed = dctx.decompress(f.read())
+        decompressed = dctx.stream_reader(f, read_across_frames=True).read()
     
     lines = decompressed.decode('utf-8').strip().split('\n')
     print(f"  Processing {len(lines)} books...")
@@ -43,7 +43,7 @@ for mode_info in modes:
     
     with open(book_file, 'rb') as f:
         dctx = zstd.ZstdDecompressor()
-        decompressed = dctx.decompress(f.read())
+        decompressed = dctx.stream_reader(f, read_across_frames=True).read()
     
     lines = decompressed.decode('utf-8').strip().split('\n')
     
@@ -105,7 +105,7 @@ class AutoBalancer:
         try:
             with open(books_path, 'rb') as f:
                 dctx = zstd.ZstdDecompressor()
-                with dctx.stream_reader(f) as reader:
+                with dctx.stream_reader(f, read_across_frames=True) as reader:
                     text_stream = reader.read().decode('utf-8')
                     # JSONL format: one JSON object per line
                     for line in text_stream.strip().split('\n'):
@@ -16,7 +16,7 @@ with open(lut_file, 'r') as f:
 book_file = "library/publish_files/books_base.jsonl.zst"
 book_payouts = []
 with open(book_file, 'rb') as f:
-    data = zstd.ZstdDecompressor().decompress(f.read()).decode()
+    data = zstd.ZstdDecompressor().stream_reader(f, read_across_frames=True).read().decode()
     books = [json.loads(line) for line in data.strip().split('\n') if line.strip()]
     book_payouts = [b['payoutMultiplier'] for b in books]
 
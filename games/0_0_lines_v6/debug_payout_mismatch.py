@@ -23,7 +23,7 @@ book_file = f"library/publish_files/books_{mode}.jsonl.zst"
 book_payouts = []
 book_ids = []
 with open(book_file, 'rb') as f:
-    data = zstd.ZstdDecompressor().decompress(f.read()).decode()
+    data = zstd.ZstdDecompressor().stream_reader(f, read_across_frames=True).read().decode()
     books = [json.loads(line) for line in data.strip().split('\n') if line.strip()]
     for book in books:
         book_ids.append(book['id'])
@@ -21,7 +21,7 @@ book_ids = []
 print(f"\nReading books from: {book_file}")
 with open(book_file, "rb") as f:
     decompressor = zst.ZstdDecompressor()
-    with decompressor.stream_reader(f) as reader:
+    with decompressor.stream_reader(f, read_across_frames=True) as reader:
         txt_stream = TextIOWrapper(reader, encoding="UTF-8")
         for line in txt_stream:
             line = line.strip()
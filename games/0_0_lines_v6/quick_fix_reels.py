@@ -31,7 +31,7 @@ def analyze_current_rtp():
     data = []
     with open(books_path, 'rb') as f:
         dctx = zstd.ZstdDecompressor()
-        with dctx.stream_reader(f) as reader:
+        with dctx.stream_reader(f, read_across_frames=True) as reader:
             text_stream = reader.read().decode('utf-8')
             for line in text_stream.strip().split('\n'):
                 if line:
@@ -19,7 +19,7 @@ print("\nChecking if system Event ID N maps to book ID N+1:\n")
 
 with open(book_file, 'rb') as f:
     dctx = zstd.ZstdDecompressor()
-    decompressed = dctx.decompress(f.read())
+    decompressed = dctx.stream_reader(f, read_across_frames=True).read()
 
 lines = decompressed.decode('utf-8').strip().split('\n')
 
@@ -11,7 +11,7 @@ print("Reading first 100 events from base mode to check ID mapping...\n")
 
 with open(book_file, 'rb') as f:
     dctx = zstd.ZstdDecompressor()
-    decompressed = dctx.decompress(f.read())
+    decompressed = dctx.stream_reader(f, read_across_frames=True).read()
 
 lines = decompressed.decode('utf-8').strip().split('\n')
 
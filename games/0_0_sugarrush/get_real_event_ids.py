@@ -1,8 +1,8 @@
 """Get REAL verified event IDs with actual payouts from book files."""
 import json
-import zstandard as zstd
 import os
 from pathlib import Path
+from src.write_data.seekable_books import iter_book_lines
 
 # Get the script directory
 script_dir = Path(__file__).parent
@@ -41,20 +41,11 @@ for mode_info in modes:
         print(f"Warning: {book_file} not found")
         continue
     
-    # Decompress and read ALL books
+    # Stream ALL books (reads across every zstd frame)
     all_events = []
     
-    print(f"  Decompressing {book_file.name}...")
-    with open(book_file, 'rb') as f:
-        dctx = zstd.ZstdDecompressor()
-        decompressed = dctx.decompress(f.read())
-    
-    lines = decompressed.decode('utf-8').strip().split('\n')
-    print(f"  Processing {len(lines)} books...")
-    
-    for line in lines:
-        if not line.strip():
-            continue
+    print(f"  Processing {book_file.name}...")
+    for line in iter_book_lines(str(book_file)):
         book = json.loads(line)
         event_id = book['id']
         payout_multiplier = book['payoutMultiplier']  # in cents
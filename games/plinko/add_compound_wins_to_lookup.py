@@ -9,7 +9,7 @@ def get_all_payouts_from_books(mode):
     
     with open(compressed_path, 'rb') as f:
         dctx = zstd.ZstdDecompressor()
-        decompressed = dctx.decompress(f.read())
+        decompressed = dctx.stream_reader(f, read_across_frames=True).read()
     
     lines = decompressed.decode('utf-8').strip().split('\n')
     payouts = set()
@@ -2,7 +2,7 @@ import zstandard as zstd
 import json
 
 f = open('library/publish_files/books_mild.jsonl.zst', 'rb')
-data = zstd.ZstdDecompressor().decompress(f.read()).decode()
+data = zstd.ZstdDecompressor().stream_reader(f, read_across_frames=True).read().decode()
 f.close()
 
 book = json.loads(data.split('\n')[0])
@@ -3,7 +3,7 @@ import json
 
 # Check normal mode
 with open('library/publish_files/books_mild.jsonl.zst', 'rb') as f:
-    data = zstd.ZstdDecompressor().decompress(f.read()).decode('utf-8')
+    data = zstd.ZstdDecompressor().stream_reader(f, read_across_frames=True).read().decode('utf-8')
     lines = data.strip().split('\n')
     book = json.loads(lines[0])
     print("=== NORMAL MODE (MILD) ===")
@@ -17,7 +17,7 @@ with open('library/publish_files/books_mild.jsonl.zst', 'rb') as f:
 
 # Check Hells Storm mode
 with open('library/publish_files/books_hells_storm_mild.jsonl.zst', 'rb') as f:
-    data = zstd.ZstdDecompressor().decompress(f.read()).decode('utf-8')
+    data = zstd.ZstdDecompressor().stream_reader(f, read_across_frames=True).read().decode('utf-8')
     lines = data.strip().split('\n')
     book = json.loads(lines[0])
     print("=== HELLS STORM MODE (MILD) ===")
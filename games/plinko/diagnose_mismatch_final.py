@@ -21,7 +21,7 @@ for mode in ["mild"]:
     # Read book payouts
     book_file = f"library/publish_files/books_{mode}.jsonl.zst"
     with open(book_file, 'rb') as f:
-        data = zstd.ZstdDecompressor().decompress(f.read()).decode()
+        data = zstd.ZstdDecompressor().stream_reader(f, read_across_frames=True).read().decode()
         books = [json.loads(line) for line in data.strip().split('\n') if line.strip()]
     
     book_payouts = set(b['payoutMultiplier'] for b in books)
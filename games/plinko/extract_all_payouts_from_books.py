@@ -8,7 +8,7 @@ for mode in ["mild", "sinful", "demonic"]:
     # Decompress and read
     with open(compressed_path, 'rb') as f:
         dctx = zstd.ZstdDecompressor()
-        decompressed = dctx.decompress(f.read())
+        decompressed = dctx.stream_reader(f, read_across_frames=True).read()
     
     # Parse JSONL (one JSON object per line)
     lines = decompressed.decode('utf-8').strip().split('\n')
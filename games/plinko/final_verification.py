@@ -26,7 +26,7 @@ for mode in ["mild", "sinful", "demonic"]:
     book_payouts = []
     with open(book_file, 'rb') as f:
         dctx = zstd.ZstdDecompressor()
-        data = dctx.decompress(f.read()).decode()
+        data = dctx.stream_reader(f, read_across_frames=True).read().decode()
         lines = data.strip().split('\n')
         for line in lines:
             if line.strip():
@@ -18,7 +18,7 @@ for mode in ["mild", "sinful", "demonic"]:
     compressed_path = f"library/publish_files/books_{mode}.jsonl.zst"
     with open(compressed_path, 'rb') as f:
         dctx = zstd.ZstdDecompressor()
-        decompressed = dctx.decompress(f.read())
+        decompressed = dctx.stream_reader(f, read_across_frames=True).read()
     
     lines = decompressed.decode('utf-8').strip().split('\n')
     book_payouts = set()
@@ -31,7 +31,7 @@ for mode in ["mild", "sinful", "demonic"]:
     # Check books
     book_file = f"library/publish_files/books_{mode}.jsonl.zst"
     with open(book_file, 'rb') as f:
-        data = zstd.ZstdDecompressor().decompress(f.read()).decode()
+        data = zstd.ZstdDecompressor().stream_reader(f, read_across_frames=True).read().decode()
         books = [json.loads(line) for line in data.strip().split('\n') if line.strip()]
     
     print(f"  Books: {len(books)}")
@@ -0,0 +1,224 @@
+"""
+Quick lookup table weight fitting, matching criteria RTP and hit-rate targets without the full optimization program.
+
+Each criteria's probability is taken from its hit-rate (or RTP and average win). Within each criteria, the original
+weights are adjusted by the `ConstructScaling` rules and then exponentially tilted (w * exp(theta * payout)) so the
+average win meets the RTP target. Volatility and test-spin scoring used by the optimization program are not applied.
+"""
+
+import os
+import numpy as np
+from src.config.paths import PATH_TO_GAMES
+from src.write_data.file_manifest import FileManifest, HashingFileWriter
+from src.write_data.sim_results import load_lookup_criteria
+from utils.analysis.lookup_table import iter_lookup_text, load_lookup_table
+
+# Weights are written as integers summing to (approximately) this total
+FIT_TOTAL_WEIGHT = 2**50
+
+
+def is_number(value) -> bool:
+    """Condition value is given as a number, rather than None or 'x'."""
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def get_criteria_targets(conditions: dict, cost: float, criteria_weights: dict) -> dict:
+    """
+    Probability and average win (payout multiplier) targets for each criteria.
+    Criteria without a hit-rate or average win share the probability not assigned to other criteria, in proportion
+    to their original weight.
+    """
+    targets, free_criteria = {}, []
+    for criteria, condition in conditions.items():
+        rtp = condition.get("rtp", 0)
+        hr, av_win = condition.get("hr"), condition.get("av_win")
+        if is_number(hr) and hr > 0:
+            targets[criteria] = {"prob": 1 / hr, "av_win": rtp * cost * hr}
+        elif is_number(av_win) and av_win > 0:
+            targets[criteria] = {"prob": rtp * cost / av_win, "av_win": av_win}
+        else:
+            free_criteria.append(criteria)
+
+    spare_prob = 1.0 - sum(target["prob"] for target in targets.values())
+    if len(free_criteria) > 0:
+        if spare_prob <= 0:
+            raise ValueError(f"Criteria {free_criteria} have no remaining probability, hit-rates sum to more than 1.")
+        free_weight = sum(criteria_weights[criteria] for criteria in free_criteria)
+        for criteria in free_criteria:
+            prob = spare_prob * criteria_weights[criteria] / free_weight
+            targets[criteria] = {"prob": prob, "av_win": conditions[criteria].get("rtp", 0) * cost / prob}
+    return targets
+
+
+def get_scaled_weights(payouts: np.ndarray, weights: np.ndarray, criteria_scaling: list) -> np.ndarray:
+    """
+    Apply scaling rules to the weights of a single criteria. The optimization program applies each rule to a
+    trial distribution with the given probability, here the expected scale factor is used.
+    """
+    weights = weights.astype(np.float64)
+    for scale in criteria_scaling:
+        in_range = (payouts >= scale["win_range"][0]) & (payouts <= scale["win_range"][1])
+        probability = min(scale["probability"], 1)
+        weights[in_range] *= 1 + probability * (scale["scale_factor"] - 1)
+    return weights
+
+
+def tilt_weights(payouts: np.ndarray, weights: np.ndarray, target_mean: float, max_iterations: int = 200):
+    """
+    Probabilities proportional to weights * exp(theta * payout), with theta chosen so the mean payout equals the
+    target. Theta is found with Newton's method, falling back to bisection when a step leaves the bracketing
+    interval.
+    """
+    probs = weights / weights.sum()
+    min_payout, max_payout = float(payouts[probs > 0].min()), float(payouts[probs > 0].max())
+    tolerance = 1e-9 * max(1.0, abs(target_mean))
+    if not min_payout - tolerance <= target_mean <= max_payout + tolerance:
+        raise ValueError(
+            f"Average win {target_mean:.6g} is outside the range of payouts [{min_payout:.6g}, {max_payout:.6g}]."
+        )
+    if max_payout - min_payout <= tolerance:
+        return probs
+
+    # Rescale payouts to [0, 1] so theta is of order one
+    x = (payouts - min_payout) / (max_payout - min_payout)
+    target = min(max((target_mean - min_payout) / (max_payout - min_payout), 0.0), 1.0)
+    with np.errstate(divide="ignore"):
+        log_probs = np.log(probs)
+
+    def get_tilted(theta):
+        exponent = log_probs + theta * x
+        tilted = np.exp(exponent - exponent.max())
+        tilted /= tilted.sum()
+        mean = float(tilted @ x)
+        return tilted, mean, float(tilted @ (x - mean) ** 2)
+
+    theta_low, theta_high = -np.inf, np.inf
+    theta = 0.0
+    for _ in range(max_iterations):
+        tilted, mean, variance = get_tilted(theta)
+        if abs(mean - target) <= 1e-12:
+            break
+        if mean < target:
+            theta_low = theta
+        else:
+            theta_high = theta
+        step_theta = theta - (mean - target) / variance if variance > 0 else np.nan
+        if theta_low < step_theta < theta_high:
+            theta = step_theta
+        elif np.isfinite(theta_low) and np.isfinite(theta_high):
+            theta = (theta_low + theta_high) / 2
+        elif np.isfinite(theta_low):
+            theta = 2 * theta_low + 1
+        else:
+            theta = 2 * theta_high - 1
+    return tilted
+
+
+def fit_weights(
+    payouts: np.ndarray,
+    weights: np.ndarray,
+    criteria_names: list,
+    criteria_index: np.ndarray,
+    opt_params: dict,
+    cost: float,
+) -> tuple:
+    """
+    Probability of each lookup table row meeting the criteria targets of `opt_params`.
+    Returns row probabilities and the achieved probability, hit-rate and RTP of each criteria.
+    """
+    conditions = opt_params["conditions"]
+    missing = [criteria_names[idx] for idx in np.unique(criteria_index) if criteria_names[idx] not in conditions]
+    if len(missing) > 0:
+        raise ValueError(f"No optimization conditions given for criteria: {missing}")
+
+    criteria_rows = {
+        criteria: criteria_index == list(criteria_names).index(criteria) if criteria in criteria_names else None
+        for criteria in conditions
+    }
+    empty = [criteria for criteria, rows in criteria_rows.items() if rows is None or not rows.any()]
+    if len(empty) > 0:
+        raise ValueError(f"No simulations found for criteria: {empty}")
+
+    criteria_weights = {
+        criteria: float(weights[rows].sum(dtype=np.float64))
+        for criteria, rows in criteria_rows.items()
+    }
+    targets = get_criteria_targets(conditions, cost, criteria_weights)
+
+    probs = np.zeros(len(payouts), dtype=np.float64)
+    summary = {}
+    for criteria, rows in criteria_rows.items():
+        criteria_scaling = [scale for scale in opt_params.get("scaling", []) if scale["criteria"] == criteria]
+        scaled_weights = get_scaled_weights(payouts[rows], weights[rows], criteria_scaling)
+        try:
+            criteria_probs = tilt_weights(payouts[rows], scaled_weights, targets[criteria]["av_win"])
+        except ValueError as exc:
+            raise ValueError(f"Cannot fit criteria '{criteria}': {exc}") from exc
+        probs[rows] = targets[criteria]["prob"] * criteria_probs
+        summary[criteria] = {
+            "prob": targets[criteria]["prob"],
+            "hr": 1 / targets[criteria]["prob"],
+            "rtp": targets[criteria]["prob"] * float(criteria_probs @ payouts[rows]) / cost,
+        }
+    return probs / probs.sum(), summary
+
+
+def get_mode_cost(game_config, mode: str) -> float:
+    """Cost of a bet mode in the game config."""
+    cost = None
+    for bet_mode in game_config.bet_modes:
+        if bet_mode.get_name() == mode:
+            cost = bet_mode.get_cost()
+    assert cost is not None, f"bet_mode {mode} not found in game config."
+    return cost
+
+
+def load_mode_lookup(library_path: str, mode: str) -> tuple:
+    """Simulated lookup table of a mode, with its criteria names and the criteria index of each row."""
+    lookup_table = load_lookup_table(os.path.join(library_path, "lookup_tables", f"lookUpTable_{mode}.csv"))
+    criteria_names, criteria_index = load_lookup_criteria(
+        os.path.join(library_path, "sim_results", mode),
+        os.path.join(library_path, "lookup_tables", f"lookUpTableSegmented_{mode}.csv"),
+        lookup_table,
+    )
+    return lookup_table, criteria_names, criteria_index
+
+
+def write_fitted_table(
+    manifest: FileManifest, lookup_table, probs: np.ndarray, mode: str, total_weight: int = FIT_TOTAL_WEIGHT
+) -> str:
+    """Write row probabilities as integer weights to the published `_0` table, recording it in the manifest."""
+    table = np.array(lookup_table.table, dtype=np.uint64)
+    table[:, 1] = np.rint(probs * total_weight).astype(np.uint64)
+    lut_file = os.path.join(manifest.library_path, "publish_files", f"lookUpTable_{mode}_0.csv")
+    if not os.path.exists(os.path.dirname(lut_file)):
+        os.makedirs(os.path.dirname(lut_file))
+    temp_file = f"{lut_file}.{os.getpid()}.tmp"
+    with HashingFileWriter(temp_file, lookup=True) as writer:
+        for text in iter_lookup_text(table):
+            writer.write(text)
+    os.replace(temp_file, lut_file)
+    manifest.record(lut_file, writer.details)
+    return lut_file
+
+
+def fit_mode(game_config, mode: str, total_weight: int = FIT_TOTAL_WEIGHT) -> dict:
+    """Fit weights for a bet mode's simulated lookup table and write them to the published `_0` table."""
+    library_path = os.path.join(PATH_TO_GAMES, game_config.game_id, "library")
+    cost = get_mode_cost(game_config, mode)
+    lookup_table, criteria_names, criteria_index = load_mode_lookup(library_path, mode)
+    probs, summary = fit_weights(
+        lookup_table.payouts / 100,
+        lookup_table.weights,
+        criteria_names,
+        criteria_index,
+        game_config.opt_params[mode],
+        cost,
+    )
+
+    manifest = FileManifest(library_path)
+    write_fitted_table(manifest, lookup_table, probs, mode, total_weight)
+    manifest.save()
+
+    summary["total"] = {"rtp": float(probs @ (lookup_table.payouts / 100)) / cost}
+    return summary
@@ -0,0 +1,169 @@
+"""
+Check optimization conditions can be met by a mode's simulations before running the optimization program.
+
+Books are assigned to each criteria as the optimization program does: conditions are taken in order, an exact
+`search_range` payout or a `force_search` takes matching books out of the remaining lookup table, and a criteria
+without search conditions takes every remaining book. A criteria's average win can only be reached if it lies
+within the range of payouts of its books.
+"""
+
+import os
+import numpy as np
+from optimization_program.fast_fit import get_criteria_targets, get_mode_cost, is_number
+from src.write_data.sim_results import load_lookup_criteria
+from utils.analysis.lookup_table import load_lookup_table
+from utils.search_tool.force_index import ForceIndex
+
+# Criteria with fewer books than this are reported, as they leave little room to shape the distribution
+MIN_FENCE_BOOKS = 10
+
+
+def get_fence_rows(conditions: dict, lookup_table, force_index: ForceIndex) -> tuple:
+    """
+    Lookup table rows given to each criteria by the optimization program, as boolean masks, with warnings about
+    search conditions the optimization program does not apply as written.
+    """
+    remaining = np.ones(len(lookup_table), dtype=bool)
+    fence_rows, warnings = {}, {criteria: [] for criteria in conditions}
+    for criteria, condition in conditions.items():
+        search_range = condition.get("search_range", (-1, -1))
+        force_search = condition.get("force_search", {})
+        if search_range[0] > -1 and search_range[0] == search_range[1]:
+            rows = remaining & (lookup_table.payouts == round(search_range[0] * 100))
+        elif len(force_search) == 0 and search_range[0] == -1:
+            fence_rows[criteria] = remaining.copy()
+            continue
+        else:
+            if len(force_search) == 0:
+                warnings[criteria].append(
+                    f"search_range {tuple(search_range)} is not a single payout, every force record book is used"
+                )
+            search_keys = {name: str(value) for name, value in force_search.items() if str(value) != "None"}
+            row_index = lookup_table.get_id_index(force_index.get_book_ids(search_keys))
+            rows = np.zeros(len(lookup_table), dtype=bool)
+            rows[row_index[row_index >= 0]] = True
+            rows &= remaining
+        remaining &= ~rows
+        fence_rows[criteria] = rows
+    return fence_rows, warnings
+
+
+def check_feasibility(
+    conditions: dict,
+    cost: float,
+    lookup_table,
+    force_index: ForceIndex,
+    criteria_names: list = None,
+    criteria_index: np.ndarray = None,
+    min_books: int = MIN_FENCE_BOOKS,
+) -> dict:
+    """
+    Books, payout range and achievable average win and RTP of each criteria, with errors for conditions which can
+    not be met and warnings for those which are unlikely to optimize well. A criteria without books is only a
+    warning, as the optimization program gives it default values. With the simulated criteria of each row, books
+    found by a force search but simulated under a different criteria are also reported.
+    """
+    fence_rows, warnings = get_fence_rows(conditions, lookup_table, force_index)
+    payouts = lookup_table.payouts / 100
+    # Criteria without books are reported below, a placeholder weight keeps the probability split defined
+    criteria_weights = {
+        criteria: float(lookup_table.weights[rows].sum(dtype=np.float64)) or 1.0
+        for criteria, rows in fence_rows.items()
+    }
+    report = {"errors": [], "criteria": {}}
+    try:
+        targets = get_criteria_targets(conditions, cost, criteria_weights)
+    except ValueError as exc:
+        report["errors"].append(str(exc))
+        # Criteria with their own hit-rate or average win are still checked
+        fixed_conditions = {
+            criteria: condition
+            for criteria, condition in conditions.items()
+            if any(is_number(condition.get(key)) and condition[key] > 0 for key in ["hr", "av_win"])
+        }
+        targets = get_criteria_targets(fixed_conditions, cost, criteria_weights)
+
+    for criteria, rows in fence_rows.items():
+        fence = {"books": int(rows.sum()), "errors": [], "warnings": warnings[criteria]}
+        report["criteria"][criteria] = fence
+        target = targets.get(criteria)
+        if target is not None:
+            fence.update({"prob": target["prob"], "av_win": target["av_win"]})
+        if fence["books"] == 0:
+            fence["warnings"].append("search conditions match no books, the optimization program uses default values")
+            continue
+
+        fence_payouts = payouts[rows]
+        fence["unique_payouts"] = len(np.unique(fence_payouts))
+        fence["min_win"], fence["max_win"] = float(fence_payouts.min()), float(fence_payouts.max())
+        if target is not None:
+            fence["rtp_range"] = (
+                target["prob"] * fence["min_win"] / cost,
+                target["prob"] * fence["max_win"] / cost,
+            )
+            tolerance = 1e-9 * max(1.0, abs(target["av_win"]))
+            margin = min(target["av_win"] - fence["min_win"], fence["max_win"] - target["av_win"])
+            if margin < -tolerance:
+                fence["errors"].append(
+                    f"av_win {target['av_win']:.6g} is outside the payout range "
+                    f"[{fence['min_win']:.6g}, {fence['max_win']:.6g}]"
+                )
+            elif fence["unique_payouts"] > 1 and margin <= tolerance:
+                # Only a distribution entirely on the smallest or largest payout has this average win
+                fence["warnings"].append(f"av_win {target['av_win']:.6g} is only met by a single payout")
+        if fence["books"] < min_books:
+            fence["warnings"].append(f"only {fence['books']} books match the search conditions")
+
+        # Books of other criteria reaching an exact payout (such as the wincap) are expected
+        searched = len(conditions[criteria].get("force_search", {})) > 0
+        if searched and criteria_index is not None and criteria in criteria_names:
+            other_books = int(np.count_nonzero(criteria_index[rows] != list(criteria_names).index(criteria)))
+            if other_books > 0:
+                fence["warnings"].append(f"{other_books} books were simulated under other criteria")
+    report["feasible"] = len(report["errors"]) == 0 and all(
+        len(fence["errors"]) == 0 for fence in report["criteria"].values()
+    )
+    return report
+
+
+def check_mode_feasibility(game_config, mode: str, library_path: str, min_books: int = MIN_FENCE_BOOKS) -> dict:
+    """
+    Check a mode's optimization conditions against its lookup table and force record. Simulated criteria, from the
+    stored simulation results or segmented lookup table, are only used for warnings and may be missing.
+    """
+    lookup_table = load_lookup_table(os.path.join(library_path, "lookup_tables", f"lookUpTable_{mode}.csv"))
+    try:
+        criteria_names, criteria_index = load_lookup_criteria(
+            os.path.join(library_path, "sim_results", mode),
+            os.path.join(library_path, "lookup_tables", f"lookUpTableSegmented_{mode}.csv"),
+            lookup_table,
+        )
+    except FileNotFoundError:
+        criteria_names, criteria_index = None, None
+    force_index = ForceIndex.from_file(os.path.join(library_path, "forces", f"force_record_{mode}.json"))
+    return check_feasibility(
+        game_config.opt_params[mode]["conditions"],
+        get_mode_cost(game_config, mode),
+        lookup_table,
+        force_index,
+        criteria_names,
+        criteria_index,
+        min_books,
+    )
+
+
+def format_feasibility_report(report: dict) -> str:
+    """Readable summary of a feasibility report, one line per criteria followed by its errors and warnings."""
+    lines = [f"ERROR: {error}" for error in report["errors"]]
+    for criteria, fence in report["criteria"].items():
+        line = f"{criteria}: {fence['books']} books"
+        if "min_win" in fence:
+            line += f", payouts [{fence['min_win']:.6g}, {fence['max_win']:.6g}]"
+        if "av_win" in fence:
+            line += f", target av_win {fence['av_win']:.6g}"
+        if "rtp_range" in fence:
+            line += f", achievable rtp [{fence['rtp_range'][0]:.6g}, {fence['rtp_range'][1]:.6g}]"
+        lines.append(line)
+        lines += [f"  ERROR: {error}" for error in fence["errors"]]
+        lines += [f"  WARNING: {warning}" for warning in fence["warnings"]]
+    return "\n".join(lines)
@@ -0,0 +1,145 @@
+"""Store optimization outputs for each bet mode, keyed by the content of the inputs used to produce them."""
+
+import os
+import re
+import json
+import shutil
+import hashlib
+from src.write_data.file_manifest import FileManifest
+
+OPTIMIZATION_CACHE_DIR = "optimization_cache"
+KEY_FILENAME = "cache_key.json"
+# Increment when the optimization program output changes for identical inputs
+OPTIMIZATION_CACHE_VERSION = 1
+
+
+def get_optimization_cache_path(library_path: str, mode: str) -> str:
+    """Folder of stored optimization outputs for a bet mode."""
+    return os.path.join(library_path, "optimization_files", OPTIMIZATION_CACHE_DIR, mode)
+
+
+def get_optimization_input_files(library_path: str, mode: str) -> list:
+    """Lookup table and force record read by the optimization program."""
+    return [
+        os.path.join(library_path, "lookup_tables", f"lookUpTable_{mode}.csv"),
+        os.path.join(library_path, "forces", f"force_record_{mode}.json"),
+    ]
+
+
+def get_optimization_output_files(library_path: str, mode: str) -> list:
+    """Optimized lookup table, followed by the trial distribution files of a bet mode."""
+    opt_path = os.path.join(library_path, "optimization_files")
+    trial_pattern = re.compile(rf"{re.escape(mode)}_0_(\d+)\.csv")
+    trial_files = []
+    if os.path.isdir(opt_path):
+        trial_files = sorted(
+            (f for f in os.listdir(opt_path) if trial_pattern.fullmatch(f)),
+            key=lambda f: int(trial_pattern.fullmatch(f).group(1)),
+        )
+    return [os.path.join(library_path, "publish_files", f"lookUpTable_{mode}_0.csv")] + [
+        os.path.join(opt_path, f) for f in trial_files
+    ]
+
+
+def get_mode_math_config(library_path: str, mode: str) -> list:
+    """Entries of math_config.json belonging to a bet mode."""
+    math_config_path = os.path.join(library_path, "configs", "math_config.json")
+    if not os.path.isfile(math_config_path):
+        return []
+    with open(math_config_path, "r", encoding="UTF-8") as f:
+        math_config = json.load(f)
+    return [
+        entry
+        for values in math_config.values()
+        if isinstance(values, list)
+        for entry in values
+        if isinstance(entry, dict) and entry.get("bet_mode") == mode
+    ]
+
+
+def get_optimization_cache_key(manifest: FileManifest, mode: str, opt_params: dict) -> str:
+    """SHA-256 of the mode's lookup table and force record hashes, optimization parameters and math config."""
+    key_object = {
+        "version": OPTIMIZATION_CACHE_VERSION,
+        "mode": mode,
+        "files": [
+            [os.path.basename(f), manifest.get(f)["sha256"]]
+            for f in get_optimization_input_files(manifest.library_path, mode)
+        ],
+        "opt_params": opt_params,
+        "math_config": get_mode_math_config(manifest.library_path, mode),
+    }
+    return hashlib.sha256(json.dumps(key_object, sort_keys=True, default=str).encode("UTF-8")).hexdigest()
+
+
+def load_cache_details(library_path: str, mode: str):
+    """Stored key and file details of a mode, or None if nothing is stored."""
+    key_file = os.path.join(get_optimization_cache_path(library_path, mode), KEY_FILENAME)
+    if not os.path.isfile(key_file):
+        return None
+    try:
+        with open(key_file, "r", encoding="UTF-8") as f:
+            return json.load(f)
+    except json.JSONDecodeError:
+        return None
+
+
+def save_optimization_results(manifest: FileManifest, mode: str, cache_key: str) -> None:
+    """Copy the optimized lookup table and trial results of a mode into the cache."""
+    library_path = manifest.library_path
+    cache_path = get_optimization_cache_path(library_path, mode)
+    temp_path = f"{cache_path}.{os.getpid()}.tmp"
+    if os.path.exists(temp_path):
+        shutil.rmtree(temp_path)
+    os.makedirs(temp_path)
+
+    files = []
+    for file_index, filename in enumerate(get_optimization_output_files(library_path, mode)):
+        shutil.copyfile(filename, os.path.join(temp_path, os.path.basename(filename)))
+        # Lookup table statistics of the optimized table are also stored, for use in config generation
+        details = manifest.get(filename, lookup=file_index == 0)
+        files.append(
+            {
+                "path": os.path.relpath(filename, library_path),
+                "details": {k: v for k, v in details.items() if k != "mtime_ns"},
+            }
+        )
+    with open(os.path.join(temp_path, KEY_FILENAME), "w", encoding="UTF-8") as f:
+        f.write(json.dumps({"key": cache_key, "files": files}, indent=4))
+
+    if os.path.exists(cache_path):
+        shutil.rmtree(cache_path)
+    os.replace(temp_path, cache_path)
+
+
+def restore_optimization_results(manifest: FileManifest, mode: str, cache_key: str) -> bool:
+    """
+    Restore stored outputs if they were produced from identical inputs. Files are copied alongside their
+    destination and renamed into place, with their stored details recorded in the manifest. Returns False if
+    nothing matching is stored.
+    """
+    library_path = manifest.library_path
+    cache_details = load_cache_details(library_path, mode)
+    if cache_details is None or cache_details["key"] != cache_key:
+        return False
+    cache_path = get_optimization_cache_path(library_path, mode)
+    for file_info in cache_details["files"]:
+        if not os.path.isfile(os.path.join(cache_path, os.path.basename(file_info["path"]))):
+            return False
+
+    # Remove trial results left by runs with different inputs
+    cached_files = set(os.path.join(library_path, file_info["path"]) for file_info in cache_details["files"])
+    for filename in get_optimization_output_files(library_path, mode)[1:]:
+        if filename not in cached_files:
+            os.remove(filename)
+
+    for file_info in cache_details["files"]:
+        filename = os.path.join(library_path, file_info["path"])
+        if not os.path.exists(os.path.dirname(filename)):
+            os.makedirs(os.path.dirname(filename))
+        temp_name = f"{filename}.{os.getpid()}.tmp"
+        shutil.copyfile(os.path.join(cache_path, os.path.basename(filename)), temp_name)
+        os.replace(temp_name, filename)
+        manifest.record(filename, file_info["details"])
+    return True
+
@@ -0,0 +1,210 @@
+"""
+Binary input bundle for the optimization program, replacing csv and indented JSON parsing of large bet modes.
+
+All values are little-endian:
+    magic (8 bytes), version (u32)
+    lookup table size and mtime_ns, force record size and mtime_ns (u64 each)
+    seed weight count s (u64), row count n (u64)
+    ids (u32[n]), weights (u64[n]), payouts in cents (u64[n]), criteria index (u16[n])
+    seed weights (u64[s]), where s is n for a warm started search (see `warm_start.py`) and otherwise 0
+    criteria count (u32), then for each name: byte length (u32) and UTF-8 bytes
+    (criteria are only used by the Python analysis; without simulation results or a segmented lookup table the
+    count is 0 and every row's criteria index is 0)
+    force count (u32), then for each force: search key count (u32), name and value strings for each key,
+    times triggered (u32), start and end (u64) of its book ids in the id list below
+    book id count (u64), book ids (u32[])
+The optimization program reads the csv and JSON inputs directly if the bundle is missing, or if the recorded source
+file sizes and modification times no longer match.
+"""
+
+import os
+import json
+import struct
+import numpy as np
+from src.write_data.sim_results import load_lookup_criteria
+from utils.analysis.lookup_table import load_lookup_table
+
+BUNDLE_MAGIC = b"PFRBUNDL"
+BUNDLE_VERSION = 2
+
+
+def get_bundle_path(library_path: str, mode: str) -> str:
+    """Location of a mode's bundle, read by the optimization program."""
+    return os.path.join(library_path, "optimization_files", f"optimizer_input_{mode}.bin")
+
+
+def get_bundle_sources(library_path: str, mode: str) -> list:
+    """Lookup table and force record summarised by the bundle, in header order."""
+    return [
+        os.path.join(library_path, "lookup_tables", f"lookUpTable_{mode}.csv"),
+        os.path.join(library_path, "forces", f"force_record_{mode}.json"),
+    ]
+
+
+def pack_string(value: str) -> bytes:
+    """Length prefixed UTF-8 string."""
+    encoded = str(value).encode("UTF-8")
+    return struct.pack("<I", len(encoded)) + encoded
+
+
+def unpack_string(data: bytes, offset: int) -> tuple:
+    """Read a length prefixed string, returning it with the offset of the following value."""
+    (length,) = struct.unpack_from("<I", data, offset)
+    offset += 4
+    return data[offset : offset + length].decode("UTF-8"), offset + length
+
+
+def is_bundle_current(library_path: str, mode: str) -> bool:
+    """
+    Whether a mode's bundle exists, has no seed weights and its header matches the current size and mtime of its
+    source files.
+    """
+    bundle_path = get_bundle_path(library_path, mode)
+    sources = get_bundle_sources(library_path, mode)
+    header_size = len(BUNDLE_MAGIC) + 4 + 16 * len(sources) + 8
+    try:
+        with open(bundle_path, "rb") as f:
+            header = f.read(header_size)
+        source_stats = [os.stat(filename) for filename in sources]
+    except OSError:
+        return False
+    if len(header) < header_size or header[: len(BUNDLE_MAGIC)] != BUNDLE_MAGIC:
+        return False
+    offset = len(BUNDLE_MAGIC)
+    if struct.unpack_from("<I", header, offset)[0] != BUNDLE_VERSION:
+        return False
+    offset += 4
+    if struct.unpack_from("<Q", header, offset + 16 * len(sources))[0] != 0:
+        return False
+    return all(
+        struct.unpack_from("<QQ", header, offset + 16 * idx) == (file_stat.st_size, file_stat.st_mtime_ns)
+        for idx, file_stat in enumerate(source_stats)
+    )
+
+
+def get_bundle_criteria(library_path: str, mode: str, lookup_table) -> tuple:
+    """Criteria names and each row's criteria index, or no criteria if neither source of criteria is available."""
+    try:
+        return load_lookup_criteria(
+            os.path.join(library_path, "sim_results", mode),
+            os.path.join(library_path, "lookup_tables", f"lookUpTableSegmented_{mode}.csv"),
+            lookup_table,
+        )
+    except FileNotFoundError:
+        return [], np.zeros(len(lookup_table), dtype=np.int64)
+
+
+def write_optimizer_bundle(library_path: str, mode: str, force: bool = False, seed_weights=None) -> str:
+    """
+    Write a mode's lookup table, criteria and force record to its bundle, returning the bundle path. An existing
+    bundle whose recorded source signatures still match is kept, unless `force` is set or `seed_weights` (one per
+    lookup table row) are given to seed the search.
+    """
+    if not force and seed_weights is None and is_bundle_current(library_path, mode):
+        return get_bundle_path(library_path, mode)
+    sources = get_bundle_sources(library_path, mode)
+    source_stats = [os.stat(filename) for filename in sources]
+    lookup_table = load_lookup_table(sources[0])
+    criteria_names, criteria_index = get_bundle_criteria(library_path, mode, lookup_table)
+    with open(sources[1], "r", encoding="UTF-8") as f:
+        force_record = json.load(f)
+
+    if len(lookup_table) > 0 and int(lookup_table.ids.max()) > np.iinfo(np.uint32).max:
+        raise ValueError(f"Simulation ids of mode {mode} do not fit in 32 bits.")
+    if len(criteria_names) > np.iinfo(np.uint16).max:
+        raise ValueError(f"Too many criteria in mode {mode}.")
+    if seed_weights is None:
+        seed_weights = np.zeros(0, dtype=np.uint64)
+    elif len(seed_weights) != len(lookup_table):
+        raise ValueError(f"Seed weights of mode {mode} do not match its lookup table rows.")
+
+    bundle_path = get_bundle_path(library_path, mode)
+    if not os.path.exists(os.path.dirname(bundle_path)):
+        os.makedirs(os.path.dirname(bundle_path))
+    temp_path = f"{bundle_path}.{os.getpid()}.tmp"
+    with open(temp_path, "wb") as f:
+        f.write(BUNDLE_MAGIC + struct.pack("<I", BUNDLE_VERSION))
+        for file_stat in source_stats:
+            f.write(struct.pack("<QQ", file_stat.st_size, file_stat.st_mtime_ns))
+        f.write(struct.pack("<QQ", len(seed_weights), len(lookup_table)))
+        f.write(np.ascontiguousarray(lookup_table.ids, dtype="<u4").tobytes())
+        f.write(np.ascontiguousarray(lookup_table.weights, dtype="<u8").tobytes())
+        f.write(np.ascontiguousarray(lookup_table.payouts, dtype="<u8").tobytes())
+        f.write(np.ascontiguousarray(criteria_index, dtype="<u2").tobytes())
+        f.write(np.ascontiguousarray(seed_weights, dtype="<u8").tobytes())
+
+        f.write(struct.pack("<I", len(criteria_names)))
+        f.write(b"".join(pack_string(name) for name in criteria_names))
+
+        f.write(struct.pack("<I", len(force_record)))
+        id_start = 0
+        for force in force_record:
+            f.write(struct.pack("<I", len(force["search"])))
+            f.write(b"".join(pack_string(key["name"]) + pack_string(key["value"]) for key in force["search"]))
+            id_end = id_start + len(force["bookIds"])
+            f.write(struct.pack("<IQQ", force["timesTriggered"], id_start, id_end))
+            id_start = id_end
+        f.write(struct.pack("<Q", id_start))
+        for force in force_record:
+            f.write(np.asarray(force["bookIds"], dtype="<u4").tobytes())
+    os.replace(temp_path, bundle_path)
+    return bundle_path
+
+
+def read_optimizer_bundle(bundle_path: str) -> dict:
+    """Read a bundle back into arrays and the force record structure it was written from."""
+    with open(bundle_path, "rb") as f:
+        data = f.read()
+    if data[: len(BUNDLE_MAGIC)] != BUNDLE_MAGIC:
+        raise ValueError(f"{bundle_path} is not an optimizer bundle.")
+    offset = len(BUNDLE_MAGIC)
+    (version,) = struct.unpack_from("<I", data, offset)
+    if version != BUNDLE_VERSION:
+        raise ValueError(f"Unsupported optimizer bundle version {version}.")
+    offset += 4
+    sources = [struct.unpack_from("<QQ", data, offset + 16 * idx) for idx in range(2)]
+    offset += 32
+
+    num_seed_weights, num_rows = struct.unpack_from("<QQ", data, offset)
+    offset += 16
+    columns = {}
+    for column, dtype in [("ids", "<u4"), ("weights", "<u8"), ("payouts", "<u8"), ("criteria", "<u2")]:
+        columns[column] = np.frombuffer(data, dtype=dtype, count=num_rows, offset=offset)
+        offset += num_rows * np.dtype(dtype).itemsize
+    seed_weights = np.frombuffer(data, dtype="<u8", count=num_seed_weights, offset=offset)
+    offset += num_seed_weights * 8
+
+    (num_criteria,) = struct.unpack_from("<I", data, offset)
+    offset += 4
+    criteria_names = []
+    for _ in range(num_criteria):
+        name, offset = unpack_string(data, offset)
+        criteria_names.append(name)
+
+    (num_forces,) = struct.unpack_from("<I", data, offset)
+    offset += 4
+    forces = []
+    for _ in range(num_forces):
+        (num_keys,) = struct.unpack_from("<I", data, offset)
+        offset += 4
+        search = []
+        for _ in range(num_keys):
+            name, offset = unpack_string(data, offset)
+            value, offset = unpack_string(data, offset)
+            search.append({"name": name, "value": value})
+        times_triggered, id_start, id_end = struct.unpack_from("<IQQ", data, offset)
+        offset += 20
+        forces.append((search, times_triggered, id_start, id_end))
+    (num_book_ids,) = struct.unpack_from("<Q", data, offset)
+    book_ids = np.frombuffer(data, dtype="<u4", count=num_book_ids, offset=offset + 8)
+
+    return {
+        "sources": sources,
+        **columns,
+        "seed_weights": seed_weights if num_seed_weights > 0 else None,
+        "criteria_names": criteria_names,
+        "force_record": [
+            {"search": search, "timesTriggered": times_triggered, "bookIds": book_ids[id_start:id_end].tolist()}
+            for search, times_triggered, id_start, id_end in forces
+        ],
+    }
@@ -1,7 +1,39 @@
 import json
 import subprocess
 import os
-from src.config.paths import PATH_TO_GAMES, SETUP_PATH, OPTIMIZATION_PATH, PROJECT_PATH
+import sys
+import time
+import threading
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from src.config.paths import PATH_TO_GAMES, OPTIMIZATION_PATH, PROJECT_PATH
+from src.write_data.file_manifest import FileManifest
+from optimization_program.fast_fit import fit_mode
+from optimization_program.feasibility import check_mode_feasibility, format_feasibility_report
+from optimization_program.optimizer_bundle import write_optimizer_bundle
+from optimization_program.warm_start import (
+    format_warm_start_report,
+    get_warm_start_report_path,
+    load_warm_start_report,
+    warm_start_mode,
+)
+from optimization_program.optimization_cache import (
+    get_optimization_cache_key,
+    restore_optimization_results,
+    save_optimization_results,
+)
+
+OPTIMIZER_NAME = "PigFarmRust"
+PRINT_LOCK = threading.Lock()
+
+
+def print_prefixed(prefix: str, text: str = "") -> None:
+    """Print each line with a prefix, without interleaving output from concurrently running modes."""
+    with PRINT_LOCK:
+        for line in text.splitlines() or [""]:
+            print(f"{prefix}{line}")
+        sys.stdout.flush()
 
 
 class OptimizationExecution:
@@ -15,118 +47,357 @@ class OptimizationExecution:
         return data
 
     @staticmethod
-    def run_opt_single_mode(game_config, mode, threads):
-        """Create setup txt file for a single mode and run Rust executable binary."""
-        import time
-        start_time = time.time()
-        
-        print(f"\n{'='*80}")
-        print(f"OPTIMIZATION STARTING: {mode}")
-        print(f"{'='*80}")
-        print(f"Game ID: {game_config.game_id}")
-        print(f"Rust Threads: {threads}")
-        
-        os.chdir(PROJECT_PATH)
-        filename = os.path.join(PATH_TO_GAMES, game_config.game_id, "library", "configs", "math_config.json")
-        opt_config = OptimizationExecution.load_math_config(filename)
-
-        opt_config = game_config.opt_params
+    def get_mode_params(game_config, mode) -> dict:
+        """Optimization parameters for a single mode."""
         params = None
-        for idx, obj in opt_config.items():
+        for idx, obj in game_config.opt_params.items():
             if idx == mode:
                 params = obj["parameters"]
-
         assert params is not None, "Could not load optimization parameters."
+        return params
+
+    @staticmethod
+    def get_setup_path(game_id: str, mode: str) -> str:
+        """Setup file for a single mode, so modes can be optimized at the same time."""
+        return os.path.join(PATH_TO_GAMES, game_id, "library", "optimization_files", f"setup_{mode}.txt")
+
+    @staticmethod
+    def write_setup_file(
+        game_config, mode, threads, params: dict = None, setup_path: str = None, path_to_games: str = None
+    ) -> str:
+        """
+        Create setup txt file for a single mode, returning its path. Parameters, setup file location and the games
+        folder the optimizer reads from and writes to default to those of the mode in the game's library.
+        """
+        if params is None:
+            params = OptimizationExecution.get_mode_params(game_config, mode)
+        if setup_path is None:
+            setup_path = OptimizationExecution.get_setup_path(game_config.game_id, mode)
+        if path_to_games is None:
+            path_to_games = PATH_TO_GAMES
+        if not os.path.exists(os.path.dirname(setup_path)):
+            os.makedirs(os.path.dirname(setup_path))
+        with open(setup_path, "w", encoding="UTF-8") as setup_file:
+            setup_file.write("game_name;" + game_config.game_id + "\n")
+            setup_file.write("bet_type;" + mode + "\n")
+            setup_file.write("num_show_pigs;" + str(params["num_show_pigs"]) + "\n")
+            setup_file.write("num_pigs_per_fence;" + str(params["num_pigs_per_fence"]) + "\n")
+            setup_file.write("threads_for_fence_construction;" + str(threads) + "\n")
+            setup_file.write("threads_for_show_construction;" + str(threads) + "\n")
+            setup_file.write("score_type;" + params["score_type"] + "\n")
+            setup_file.write("test_spins;" + str(params["test_spins"]).replace(" ", "") + "\n")
+            setup_file.write("test_spins_weights;" + str(params["test_spins_weights"]).replace(" ", "") + "\n")
+            setup_file.write("simulation_trials;" + str(params["simulation_trials"]) + "\n")
+            setup_file.write("graph_indexes;" + str(0) + "\n")
+            setup_file.write("run_1000_batch;" + str(False) + "\n")
+            setup_file.write("path_to_games;" + path_to_games + "\n")
+            setup_file.write("pmb_rtp;" + str(params["pmb_rtp"]) + "\n")
+            setup_file.write("min_mean_to_median;" + str(params["min_mean_to_median"]) + "\n")
+            setup_file.write("max_mean_to_median;" + str(params["max_mean_to_median"]) + "\n")
+        return setup_path
+
+    @staticmethod
+    def run_opt_single_mode(game_config, mode, threads, optimizer_path: str = None, seed_weights=None) -> int:
+        """
+        Create setup txt file and binary input bundle for a single mode and run Rust executable binary. The bundle
+        saves the optimizer from parsing the lookup table csv and force record JSON, and is only rewritten once
+        those files change. With `seed_weights` (see `warm_start_mode`), the bundle seeds the optimizer's search and
+        its report on the seed is printed.
+        """
+        start_time = time.time()
+        prefix = f"[{mode}] "
+        if optimizer_path is None:
+            os.chdir(PROJECT_PATH)
+            optimizer_path = OptimizationExecution.build_optimizer()
+
+        params = OptimizationExecution.get_mode_params(game_config, mode)
+        print_prefixed(
+            prefix,
+            f"{'='*80}\n"
+            f"OPTIMIZATION STARTING: {mode}\n"
+            f"{'='*80}\n"
+            f"Game ID: {game_config.game_id}\n"
+            f"Rust Threads: {threads}\n"
+            f"Optimization Parameters:\n"
+            + "".join(
+                f"  {key}: {params[key]}\n"
+                for key in [
+                    "num_show_pigs",
+                    "num_pigs_per_fence",
+                    "simulation_trials",
+                    "test_spins",
+                    "test_spins_weights",
+                    "pmb_rtp",
+                    "min_mean_to_median",
+                    "max_mean_to_median",
+                ]
+            ),
+        )
+        setup_path = OptimizationExecution.write_setup_file(game_config, mode, threads)
+        library_path = os.path.join(PATH_TO_GAMES, game_config.game_id, "library")
+        bundle_path = write_optimizer_bundle(library_path, mode, seed_weights=seed_weights)
+        if os.path.exists(get_warm_start_report_path(library_path, mode)):
+            os.remove(get_warm_start_report_path(library_path, mode))
+        print_prefixed(
+            prefix,
+            f"Setup file written to {setup_path}, input bundle to {bundle_path}. Starting Rust optimization...",
+        )
+
+        returncode = OptimizationExecution.run_optimizer(optimizer_path, setup_path, prefix)
+        warm_start_report = load_warm_start_report(library_path, mode) if seed_weights is not None else None
+        if warm_start_report is not None:
+            print_prefixed(prefix, format_warm_start_report(warm_start_report))
 
-        print(f"\nOptimization Parameters:")
-        print(f"  num_show_pigs: {params['num_show_pigs']}")
-        print(f"  num_pigs_per_fence: {params['num_pigs_per_fence']}")
-        print(f"  simulation_trials: {params['simulation_trials']}")
-        print(f"  test_spins: {params['test_spins']}")
-        print(f"  test_spins_weights: {params['test_spins_weights']}")
-        print(f"  pmb_rtp: {params['pmb_rtp']}")
-        print(f"  min_mean_to_median: {params['min_mean_to_median']}")
-        print(f"  max_mean_to_median: {params['max_mean_to_median']}")
-        
-        setup_file = open(SETUP_PATH, "w", encoding="UTF-8")
-        setup_file.write("game_name;" + game_config.game_id + "\n")
-        setup_file.write("bet_type;" + mode + "\n")
-        setup_file.write("num_show_pigs;" + str(params["num_show_pigs"]) + "\n")
-        setup_file.write("num_pigs_per_fence;" + str(params["num_pigs_per_fence"]) + "\n")
-        setup_file.write("threads_for_fence_construction;" + str(threads) + "\n")
-        setup_file.write("threads_for_show_construction;" + str(threads) + "\n")
-        setup_file.write("score_type;" + params["score_type"] + "\n")
-        setup_file.write("test_spins;" + str(params["test_spins"]).replace(" ", "") + "\n")
-        setup_file.write("test_spins_weights;" + str(params["test_spins_weights"]).replace(" ", "") + "\n")
-        setup_file.write("simulation_trials;" + str(params["simulation_trials"]) + "\n")
-        setup_file.write("graph_indexes;" + str(0) + "\n")
-        setup_file.write("run_1000_batch;" + str(False) + "\n")
-        setup_file.write("path_to_games;" + PATH_TO_GAMES + "\n")
-        setup_file.write("pmb_rtp;" + str(params["pmb_rtp"]) + "\n")
-        setup_file.write("min_mean_to_median;" + str(params["min_mean_to_median"]) + "\n")
-        setup_file.write("max_mean_to_median;" + str(params["max_mean_to_median"]) + "\n")
-        setup_file.close()
-        
-        print(f"\nSetup file written. Starting Rust optimization...")
-        print(f"{'='*80}\n")
-        
-        OptimizationExecution.run_rust_script()
-        
         elapsed = time.time() - start_time
-        print(f"\n{'='*80}")
-        print(f"OPTIMIZATION COMPLETED: {mode}")
-        print(f"Total Time: {elapsed:.2f} seconds ({elapsed/60:.2f} minutes)")
-        print(f"{'='*80}\n")
+        print_prefixed(
+            prefix,
+            f"{'='*80}\n"
+            f"OPTIMIZATION {'COMPLETED' if returncode == 0 else 'FAILED'}: {mode}\n"
+            f"Total Time: {elapsed:.2f} seconds ({elapsed/60:.2f} minutes)\n"
+            f"{'='*80}",
+        )
+        return returncode
+
+    @staticmethod
+    def get_thread_allocation(mode_rows: dict, total_threads: int) -> dict:
+        """
+        Split the thread budget between modes in proportion to lookup table size (largest remainder rounding).
+        Modes with less than a single thread's share are given one thread and the rest of the budget is re-split.
+        If there are more modes than threads, modes wait for threads to become available.
+        """
+        allocation = {}
+        mode_rows = {mode: max(rows, 1) for mode, rows in mode_rows.items()}
+        spare_threads = int(total_threads)
+        while len(mode_rows) > 0:
+            total_rows = sum(mode_rows.values())
+            small_modes = [mode for mode, rows in mode_rows.items() if spare_threads * rows / total_rows < 1]
+            if len(small_modes) == 0:
+                break
+            for mode in small_modes:
+                allocation[mode] = 1
+                spare_threads -= 1
+                del mode_rows[mode]
+
+        shares = {mode: spare_threads * rows / sum(mode_rows.values()) for mode, rows in mode_rows.items()}
+        allocation.update({mode: int(share) for mode, share in shares.items()})
+        remaining = spare_threads - sum(int(share) for share in shares.values())
+        for mode in sorted(shares, key=lambda m: shares[m] - int(shares[m]), reverse=True)[:remaining]:
+            allocation[mode] += 1
+        return allocation
+
+    @staticmethod
+    def run_all_modes(
+        game_config,
+        modes_to_run,
+        rust_threads,
+        max_concurrent_modes: int = None,
+        use_cache: bool = True,
+        warm_start: bool = False,
+        check_feasibility: bool = True,
+        raise_infeasible: bool = False,
+    ) -> dict:
+        """
+        Optimize modes concurrently. `rust_threads` is the total budget shared by all running modes, split in
+        proportion to each mode's lookup table size. Largest modes are started first. Modes whose lookup table,
+        force record and optimization parameters are unchanged since a previous run have their optimized table
+        and trial results restored instead. With `warm_start`, each mode's search is seeded with weights fitted from
+        its previous optimized table (see `warm_start_mode`), and the search iterations saved are reported. With
+        `check_feasibility`, each mode's conditions are checked against its simulations and a warning is given for
+        conditions which can not be met, or with `raise_infeasible` no mode is optimized. Returns the exit code of
+        each mode.
+        """
+        os.chdir(PROJECT_PATH)
+        library_path = os.path.join(PATH_TO_GAMES, game_config.game_id, "library")
+        manifest = FileManifest(library_path)
+        cache_keys, returncodes = {}, {}
+        for mode in modes_to_run:
+            cache_keys[mode] = get_optimization_cache_key(manifest, mode, game_config.opt_params[mode])
+            if use_cache and restore_optimization_results(manifest, mode, cache_keys[mode]):
+                print_prefixed(f"[{mode}] ", "Inputs unchanged, restored previous optimization results.")
+                returncodes[mode] = 0
+        modes_to_optimize = [mode for mode in modes_to_run if mode not in returncodes]
+        seed_weights = {}
+        if warm_start:
+            # Seeds are fitted from the previous published tables, before the search replaces them
+            for mode in modes_to_optimize:
+                seed_weights[mode] = OptimizationExecution.run_warm_start(game_config, mode, manifest)
+        manifest.save()
+        if len(modes_to_optimize) == 0:
+            return returncodes
+        if check_feasibility:
+            OptimizationExecution.run_feasibility_check(game_config, modes_to_optimize, raise_infeasible)
+
+        optimizer_path = OptimizationExecution.build_optimizer()
+        mode_rows = {
+            mode: manifest.get(os.path.join(library_path, "lookup_tables", f"lookUpTable_{mode}.csv"))["rows"]
+            for mode in modes_to_optimize
+        }
+        mode_threads = OptimizationExecution.get_thread_allocation(mode_rows, rust_threads)
+        run_order = sorted(modes_to_optimize, key=lambda mode: mode_rows[mode], reverse=True)
+        print_prefixed("[PYTHON] ", f"Thread allocation: {mode_threads}")
+
+        def run_mode(mode, threads):
+            returncode = OptimizationExecution.run_opt_single_mode(
+                game_config, mode, threads, optimizer_path, seed_weights.get(mode)
+            )
+            if returncode == 0:
+                save_optimization_results(manifest, mode, cache_keys[mode])
+            return returncode
+
+        returncodes.update(
+            OptimizationExecution.run_within_thread_budget(
+                {mode: partial(run_mode, mode) for mode in run_order}, mode_threads, rust_threads, max_concurrent_modes
+            )
+        )
+        manifest.save()
+
+        failed = [mode for mode, returncode in returncodes.items() if returncode != 0]
+        if len(failed) > 0:
+            print_prefixed("[PYTHON] ", f"ERROR: optimization failed for modes: {failed}")
+        return {mode: returncodes[mode] for mode in modes_to_run}
+
+    @staticmethod
+    def run_warm_start(game_config, mode, manifest: FileManifest):
+        """Fit a mode's warm start seed weights, reporting the rows matched. Returns None if no seed was fitted."""
+        prefix = f"[{mode}] "
+        report = warm_start_mode(game_config, mode, manifest)
+        if not report["seeded"]:
+            print_prefixed(prefix, f"Warm start not used: {report['reason']}.")
+            return None
+
+        matched = report["matched"]
+        print_prefixed(
+            prefix,
+            f"Warm start seed fitted from the previous optimized table.\n"
+            f"Rows matched by book id: {matched['by_id']}, payout: {matched['by_payout']}, "
+            f"payout bucket: {matched['by_bucket']}, unmatched: {matched['unmatched']}.",
+        )
+        return report["seed_weights"]
 
     @staticmethod
-    def run_all_modes(game_config, modes_to_run, rust_threads):
-        """Loop through all game modes to run"""
+    def run_feasibility_check(game_config, modes_to_run, raise_infeasible: bool = False) -> list:
+        """
+        Print each mode's achievable criteria average wins and RTPs, with any conditions its simulations can not
+        meet. Modes which can not be optimized are returned, after a warning or, with `raise_infeasible`, a
+        `ValueError`.
+        """
+        library_path = os.path.join(PATH_TO_GAMES, game_config.game_id, "library")
+        infeasible = []
         for mode in modes_to_run:
-            OptimizationExecution.run_opt_single_mode(game_config, mode, rust_threads)
+            report = check_mode_feasibility(game_config, mode, library_path)
+            print_prefixed(f"[{mode}] ", format_feasibility_report(report))
+            if not report["feasible"]:
+                infeasible.append(mode)
+        if len(infeasible) > 0:
+            message = f"Optimization conditions can not be met for modes: {infeasible}"
+            if raise_infeasible:
+                raise ValueError(message)
+            warnings.warn(message)
+        return infeasible
 
     @staticmethod
-    def run_rust_script():
-        """Run compiled binary and stream output to terminal in real-time."""
-        import time
-        import sys
-        start_time = time.time()
-        
-        print("[PYTHON] Starting Rust optimization binary...")
+    def run_fast_fit(game_config, modes_to_run) -> dict:
+        """
+        Fit lookup table weights to each mode's criteria RTP and hit-rate targets in Python, without the Rust
+        optimizer. Intended for quick iteration on game math, returns the achieved RTP of each criteria.
+        """
+        summaries = {}
+        for mode in modes_to_run:
+            start_time = time.time()
+            summaries[mode] = fit_mode(game_config, mode)
+            print_prefixed(
+                f"[{mode}] ",
+                "".join(
+                    f"{criteria}: rtp {values['rtp']:.5f}" + (f", hr {values['hr']:.4f}\n" if "hr" in values else "\n")
+                    for criteria, values in summaries[mode].items()
+                )
+                + f"Fast fit completed in {time.time() - start_time:.2f} seconds.",
+            )
+        return summaries
+
+    @staticmethod
+    def run_within_thread_budget(tasks: dict, task_threads: dict, total_threads, max_concurrent: int = None) -> dict:
+        """
+        Run tasks concurrently, each called with (and holding) its number of threads from a shared budget while
+        running. Tasks start in the given order, waiting for threads to be released. Returns each task's result.
+        """
+        available_threads = [max(int(total_threads), 1)]
+        threads_released = threading.Condition()
+
+        def run_task(name):
+            threads = min(task_threads[name], max(int(total_threads), 1))
+            with threads_released:
+                threads_released.wait_for(lambda: available_threads[0] >= threads)
+                available_threads[0] -= threads
+            try:
+                return tasks[name](threads)
+            finally:
+                with threads_released:
+                    available_threads[0] += threads
+                    threads_released.notify_all()
+
+        max_workers = max_concurrent if max_concurrent is not None else len(tasks)
+        with ThreadPoolExecutor(max_workers=max(max_workers, 1)) as executor:
+            return dict(zip(tasks, executor.map(run_task, list(tasks))))
+
+    @staticmethod
+    def get_optimizer_path() -> str:
+        """Location of the compiled release binary."""
+        binary_name = OPTIMIZER_NAME + (".exe" if os.name == "nt" else "")
+        return os.path.join(OPTIMIZATION_PATH, "target", "release", binary_name)
+
+    @staticmethod
+    def get_cargo_env() -> dict:
+        """Environment with the default cargo install location on the PATH."""
         cargo_bin_path = os.path.join(os.path.expanduser("~"), ".cargo", "bin")
-        updated_path = cargo_bin_path + os.pathsep + os.environ.get("PATH", "")
-        
-        print("[PYTHON] Executing: cargo run --release")
-        print("[PYTHON] Working directory:", OPTIMIZATION_PATH)
-        print("[PYTHON] Streaming output in real-time...\n")
-        sys.stdout.flush()
-        
-        # Use Popen to stream output in real-time
+        return {**os.environ, "PATH": cargo_bin_path + os.pathsep + os.environ.get("PATH", "")}
+
+    @staticmethod
+    def build_optimizer() -> str:
+        """Compile the optimizer once in release mode (a no-op if already up to date), returning the binary path."""
+        print_prefixed("[PYTHON] ", "Executing: cargo build --release")
+        returncode = OptimizationExecution.stream_process(
+            ["cargo", "build", "--release"], "[cargo] ", OptimizationExecution.get_cargo_env()
+        )
+        if returncode != 0:
+            raise RuntimeError(f"Failed to build optimization program, cargo exited with code {returncode}.")
+        return OptimizationExecution.get_optimizer_path()
+
+    @staticmethod
+    def run_optimizer(optimizer_path: str, setup_path: str, prefix: str = "") -> int:
+        """Run compiled binary on a setup file, streaming prefixed output to terminal in real-time."""
+        start_time = time.time()
+        returncode = OptimizationExecution.stream_process([optimizer_path, setup_path], prefix)
+        elapsed = time.time() - start_time
+        if returncode == 0:
+            print_prefixed(
+                prefix,
+                f"[PYTHON] Rust binary completed successfully in {elapsed:.2f} seconds ({elapsed/60:.2f} minutes)",
+            )
+        else:
+            print_prefixed(prefix, f"[PYTHON] ERROR: Rust binary failed with exit code {returncode}")
+            print_prefixed(prefix, f"[PYTHON] Time elapsed: {elapsed:.2f} seconds")
+        return returncode
+
+    @staticmethod
+    def stream_process(command: list, prefix: str, env: dict = None) -> int:
+        """Run a command from the optimization folder, printing each output line with a prefix."""
         process = subprocess.Popen(
-            ["cargo", "run", "--release"],
+            command,
             stdout=subprocess.PIPE,
             stderr=subprocess.STDOUT,  # Combine stderr into stdout
             text=True,
             bufsize=1,  # Line buffered
             cwd=OPTIMIZATION_PATH,
-            env={**os.environ, "PATH": updated_path},
+            env=env,
         )
-        
-        # Stream output line by line
         try:
             for line in process.stdout:
-                print(line, end='')  # Print immediately
-                sys.stdout.flush()
-            
+                print_prefixed(prefix, line.rstrip("\n"))
             process.wait()
-            elapsed = time.time() - start_time
-            
-            if process.returncode == 0:
-                print(f"\n[PYTHON] Rust binary completed successfully in {elapsed:.2f} seconds ({elapsed/60:.2f} minutes)")
-            else:
-                print(f"\n[PYTHON] ERROR: Rust binary failed with exit code {process.returncode}")
-                print(f"[PYTHON] Time elapsed: {elapsed:.2f} seconds")
         except KeyboardInterrupt:
-            print("\n[PYTHON] Interrupted by user. Terminating Rust process...")
+            print_prefixed(prefix, "[PYTHON] Interrupted by user. Terminating Rust process...")
             process.terminate()
             process.wait()
             raise
+        return process.returncode
@@ -2,8 +2,10 @@ use csv::ReaderBuilder;
 use serde::{Deserialize, Serialize};
 use serde_json;
 use std::error::Error;
-use std::path::{Path};
-use std::{collections::HashMap, fs::File};
+use std::io::{BufReader, Read};
+use std::path::{Path, PathBuf};
+use std::time::UNIX_EPOCH;
+use std::{collections::HashMap, fs, fs::File};
 
 ////////////////////////////////////
 /// JSON STRUCTS
@@ -99,6 +101,257 @@ pub(crate) struct LookUpTableInput {
     pub win: u64,
 }
 
+// BINARY INPUT BUNDLE (written by optimization_program/optimizer_bundle.py)
+const BUNDLE_MAGIC: &[u8; 8] = b"PFRBUNDL";
+const BUNDLE_VERSION: u32 = 2;
+// Magic, version, two (size, mtime) source signatures, the seed weight count and the row count
+const BUNDLE_HEADER_SIZE: usize = 8 + 4 + 2 * 16 + 8 + 8;
+// Bytes per lookup table row: id (u32), weight (u64), payout (u64) and criteria index (u16)
+const BUNDLE_ROW_SIZE: usize = 4 + 8 + 8 + 2;
+
+struct BundleReader<'a> {
+    data: &'a [u8],
+    pos: usize,
+}
+
+impl<'a> BundleReader<'a> {
+    fn take(&mut self, len: usize) -> Result<&'a [u8], Box<dyn Error>> {
+        if len > self.data.len() - self.pos {
+            return Err("unexpected end of bundle".into());
+        }
+        let bytes = &self.data[self.pos..self.pos + len];
+        self.pos += len;
+        Ok(bytes)
+    }
+
+    fn read_u32(&mut self) -> Result<u32, Box<dyn Error>> {
+        Ok(u32::from_le_bytes(self.take(4)?.try_into()?))
+    }
+
+    fn read_u64(&mut self) -> Result<u64, Box<dyn Error>> {
+        Ok(u64::from_le_bytes(self.take(8)?.try_into()?))
+    }
+
+    fn read_string(&mut self) -> Result<String, Box<dyn Error>> {
+        let len = self.read_u32()? as usize;
+        Ok(String::from_utf8(self.take(len)?.to_vec())?)
+    }
+
+    fn read_array(&mut self, count: usize, item_size: usize) -> Result<&'a [u8], Box<dyn Error>> {
+        let len = count.checked_mul(item_size).ok_or("bundle array length overflow")?;
+        self.take(len)
+    }
+}
+
+// File size and modification time (ns), matching Python's os.stat st_size and st_mtime_ns
+fn file_signature(path: &Path) -> Option<(u64, u64)> {
+    let metadata = fs::metadata(path).ok()?;
+    let mtime = metadata.modified().ok()?.duration_since(UNIX_EPOCH).ok()?.as_nanos() as u64;
+    Some((metadata.len(), mtime))
+}
+
+// Opens a bundle after checking its header, returning the file positioned at the first row, the row count and the
+// number of warm start seed weights (zero, or one per row)
+fn open_optimizer_bundle(
+    bundle_path: &Path,
+    sources: &[PathBuf],
+) -> Result<(BufReader<File>, usize, usize), Box<dyn Error>> {
+    let mut file = BufReader::new(File::open(bundle_path)?);
+    let mut header = [0u8; BUNDLE_HEADER_SIZE];
+    file.read_exact(&mut header)
+        .map_err(|_| "unexpected end of bundle")?;
+    let mut reader = BundleReader { data: &header, pos: 0 };
+    if reader.take(BUNDLE_MAGIC.len())? != BUNDLE_MAGIC {
+        return Err("not an optimizer bundle".into());
+    }
+    let version = reader.read_u32()?;
+    if version != BUNDLE_VERSION {
+        return Err(format!("unsupported bundle version {}", version).into());
+    }
+    for source in sources {
+        let recorded = (reader.read_u64()?, reader.read_u64()?);
+        if file_signature(source) != Some(recorded) {
+            return Err(format!("{} changed since the bundle was written", source.display()).into());
+        }
+    }
+    let num_seed_weights = reader.read_u64()? as usize;
+    let num_rows = reader.read_u64()? as usize;
+    if num_seed_weights != 0 && num_seed_weights != num_rows {
+        return Err("seed weights do not match the lookup table rows".into());
+    }
+    Ok((file, num_rows, num_seed_weights))
+}
+
+fn read_bundle_bytes(
+    file: &mut BufReader<File>,
+    count: usize,
+    item_size: usize,
+) -> Result<Vec<u8>, Box<dyn Error>> {
+    let len = count.checked_mul(item_size).ok_or("bundle array length overflow")?;
+    let mut bytes = vec![0u8; len];
+    file.read_exact(&mut bytes)
+        .map_err(|_| "unexpected end of bundle")?;
+    Ok(bytes)
+}
+
+// Only the id, weight and payout columns are read, the criteria and force sections are not needed for the table
+fn parse_bundle_lookup_table(
+    bundle_path: &Path,
+    sources: &[PathBuf],
+) -> Result<HashMap<u32, LookUpTableEntry>, Box<dyn Error>> {
+    let (mut file, num_rows, _) = open_optimizer_bundle(bundle_path, sources)?;
+    let ids = read_bundle_bytes(&mut file, num_rows, 4)?;
+    let weights = read_bundle_bytes(&mut file, num_rows, 8)?;
+    let payouts = read_bundle_bytes(&mut file, num_rows, 8)?;
+    let mut lookup_table: HashMap<u32, LookUpTableEntry> = HashMap::with_capacity(num_rows);
+    for ((id, weight), payout) in ids
+        .chunks_exact(4)
+        .zip(weights.chunks_exact(8))
+        .zip(payouts.chunks_exact(8))
+    {
+        let id = u32::from_le_bytes(id.try_into()?);
+        lookup_table.insert(
+            id,
+            LookUpTableEntry {
+                id: id,
+                weight: u64::from_le_bytes(weight.try_into()?),
+                win: u64::from_le_bytes(payout.try_into()?) as f64 / 100.0,
+            },
+        );
+    }
+    Ok(lookup_table)
+}
+
+// Seed weights of a warm started search by book id, or None if the bundle was written without a seed
+fn parse_bundle_seed_weights(
+    bundle_path: &Path,
+    sources: &[PathBuf],
+) -> Result<Option<HashMap<u32, u64>>, Box<dyn Error>> {
+    let (mut file, num_rows, num_seed_weights) = open_optimizer_bundle(bundle_path, sources)?;
+    if num_seed_weights == 0 {
+        return Ok(None);
+    }
+    let ids = read_bundle_bytes(&mut file, num_rows, 4)?;
+    // Weight, payout and criteria columns come between the ids and the seed weights
+    let columns_len = num_rows.checked_mul(BUNDLE_ROW_SIZE - 4).ok_or("bundle array length overflow")?;
+    file.seek_relative(i64::try_from(columns_len)?)?;
+    let seed_weights = read_bundle_bytes(&mut file, num_seed_weights, 8)?;
+    let mut seed: HashMap<u32, u64> = HashMap::with_capacity(num_rows);
+    for (id, weight) in ids.chunks_exact(4).zip(seed_weights.chunks_exact(8)) {
+        seed.insert(u32::from_le_bytes(id.try_into()?), u64::from_le_bytes(weight.try_into()?));
+    }
+    Ok(Some(seed))
+}
+
+// Skips over the lookup table rows and seed weights, so force options are read without loading the table
+fn parse_bundle_force_options(
+    bundle_path: &Path,
+    sources: &[PathBuf],
+) -> Result<Vec<SearchResult>, Box<dyn Error>> {
+    let (mut file, num_rows, num_seed_weights) = open_optimizer_bundle(bundle_path, sources)?;
+    let rows_len = num_rows
+        .checked_mul(BUNDLE_ROW_SIZE)
+        .and_then(|len| len.checked_add(num_seed_weights.checked_mul(8)?))
+        .ok_or("bundle array length overflow")?;
+    file.seek_relative(i64::try_from(rows_len)?)?;
+    let mut data: Vec<u8> = Vec::new();
+    file.read_to_end(&mut data)?;
+    let mut reader = BundleReader { data: &data, pos: 0 };
+
+    // Criteria names are only used by the Python analysis
+    let num_criteria = reader.read_u32()? as usize;
+    for _ in 0..num_criteria {
+        let len = reader.read_u32()? as usize;
+        reader.take(len)?;
+    }
+
+    // Search keys of each force, with the range of its book ids in the shared id list
+    let num_forces = reader.read_u32()? as usize;
+    let mut force_ranges: Vec<(Vec<SearchKey>, u32, usize, usize)> = Vec::with_capacity(num_forces);
+    for _ in 0..num_forces {
+        let num_keys = reader.read_u32()? as usize;
+        let mut search: Vec<SearchKey> = Vec::with_capacity(num_keys);
+        for _ in 0..num_keys {
+            let name = reader.read_string()?;
+            let value = reader.read_string()?;
+            search.push(SearchKey { name, value });
+        }
+        let times_triggered = reader.read_u32()?;
+        let start = reader.read_u64()? as usize;
+        let end = reader.read_u64()? as usize;
+        force_ranges.push((search, times_triggered, start, end));
+    }
+    let num_book_ids = reader.read_u64()? as usize;
+    let book_ids: Vec<u32> = reader
+        .read_array(num_book_ids, 4)?
+        .chunks_exact(4)
+        .map(|value| u32::from_le_bytes([value[0], value[1], value[2], value[3]]))
+        .collect();
+    if reader.pos != data.len() {
+        return Err("unexpected data at end of bundle".into());
+    }
+
+    let mut force_options: Vec<SearchResult> = Vec::with_capacity(num_forces);
+    for (search, times_triggered, start, end) in force_ranges {
+        if start > end || end > book_ids.len() {
+            return Err("force book id range outside of bundle".into());
+        }
+        force_options.push(SearchResult {
+            search: search,
+            timesTriggered: times_triggered,
+            bookIds: book_ids[start..end].to_vec(),
+        });
+    }
+    Ok(force_options)
+}
+
+// Reads one section of a mode's bundle, returning None if there is no bundle, or it is out of date, so the csv
+// and json inputs are read instead
+// Location of a mode's bundle and of the source files it summarises, in header order
+fn get_bundle_paths(game_name: &str, bet_type: &str, path_to_games: &str) -> (PathBuf, [PathBuf; 2]) {
+    let library_path = Path::new(path_to_games).join(game_name).join("library");
+    let bundle_path = library_path
+        .join("optimization_files")
+        .join(format!("optimizer_input_{}.bin", bet_type));
+    let sources = [
+        library_path
+            .join("lookup_tables")
+            .join(format!("lookUpTable_{}.csv", bet_type)),
+        library_path
+            .join("forces")
+            .join(format!("force_record_{}.json", bet_type)),
+    ];
+    (bundle_path, sources)
+}
+
+fn read_optimizer_bundle<T>(
+    game_name: &str,
+    bet_type: &str,
+    path_to_games: &str,
+    section: &str,
+    parse: fn(&Path, &[PathBuf]) -> Result<T, Box<dyn Error>>,
+) -> Option<T> {
+    let (bundle_path, sources) = get_bundle_paths(game_name, bet_type, path_to_games);
+    if !bundle_path.is_file() {
+        return None;
+    }
+    match parse(&bundle_path, &sources) {
+        Ok(value) => {
+            println!("[RUST] Loaded {} from input bundle {}", section, bundle_path.display());
+            Some(value)
+        }
+        Err(err) => {
+            println!(
+                "[RUST] Input bundle {} not used for {} ({}), reading csv and json files",
+                bundle_path.display(),
+                section,
+                err
+            );
+            None
+        }
+    }
+}
+
 ////////////////////////////////////
 /// FUNCTIONS TO LOAD CONFIG FILES
 ////////////////////////////////////
@@ -108,6 +361,15 @@ pub(crate) fn load_force_options(
     bet_type: &str,
     path_to_games: String,
 ) -> Vec<SearchResult> {
+    if let Some(force_options) = read_optimizer_bundle(
+        game_name,
+        bet_type,
+        &path_to_games,
+        "force options",
+        parse_bundle_force_options,
+    ) {
+        return force_options;
+    }
     let file_path = Path::new(&path_to_games)
         .join(game_name)
         .join("library")
@@ -121,6 +383,37 @@ pub(crate) fn load_force_options(
     return search_results;
 }
 
+// Weights of the previous optimized table, written to the bundle by a warm started run
+pub(crate) fn load_seed_weights(
+    game_name: &str,
+    bet_type: &str,
+    path_to_games: String,
+) -> Option<HashMap<u32, u64>> {
+    let (bundle_path, sources) = get_bundle_paths(game_name, bet_type, &path_to_games);
+    if !bundle_path.is_file() {
+        return None;
+    }
+    match parse_bundle_seed_weights(&bundle_path, &sources) {
+        Ok(Some(seed_weights)) => {
+            println!(
+                "[RUST] Loaded warm start seed weights of {} books from input bundle {}",
+                seed_weights.len(),
+                bundle_path.display()
+            );
+            Some(seed_weights)
+        }
+        Ok(None) => None,
+        Err(err) => {
+            println!(
+                "[RUST] Warm start seed weights not read from input bundle {} ({})",
+                bundle_path.display(),
+                err
+            );
+            None
+        }
+    }
+}
+
 pub(crate) fn load_config_data(game_name: &str, path_to_games: String) -> ConfigData {
     let file_path = Path::new(&path_to_games)
         .join(game_name)
@@ -139,6 +432,15 @@ pub(crate) fn read_look_up_table(
     bet_type: &str,
     path_to_games: String,
 ) -> Result<HashMap<u32, LookUpTableEntry>, Box<dyn Error>> {
+    if let Some(lookup_table) = read_optimizer_bundle(
+        game_name,
+        bet_type,
+        &path_to_games,
+        "lookup table",
+        parse_bundle_lookup_table,
+    ) {
+        return Ok(lookup_table);
+    }
     let file_path = Path::new(&path_to_games)
         .join(game_name)
         .join("library")
@@ -16,8 +16,8 @@ use std::{
 
 mod exes;
 use exes::{
-    load_config_data, load_force_options, read_look_up_table, DressJson, FenceJson,
-    LookUpTableEntry, SearchResult
+    load_config_data, load_force_options, load_seed_weights, read_look_up_table, DressJson,
+    FenceJson, LookUpTableEntry, SearchResult
 }; // Import the functions
 // use flame;
 
@@ -308,6 +308,7 @@ fn run_farm(
                     random_seeds: vec![0],
                     random_weights: vec![0.0],
                     random_apply_params: vec![],
+                    fixed_weights: vec![],
                 }]);
             } else {
 
@@ -357,6 +358,13 @@ fn run_farm(
         }
     }
 
+    // A warm started run adds the previous optimized distribution of each fence to its pen, and the first show pig
+    // is built from them
+    let seed_pig_indexes = match load_seed_weights(game_name, bet_type, path_to_games.to_string()) {
+        Some(seed_weights) => add_seed_pigs(&fences, &mut pig_pens, &seed_weights),
+        None => None,
+    };
+
     sorted_wins.sort_by(|a, b| a.partial_cmp(&b).unwrap());
 
     let sorted_wins_array = Array1::from_vec(sorted_wins);
@@ -397,6 +405,7 @@ fn run_farm(
                     min_mean_to_median,
                     max_mean_to_median,
                     pmb_rtp,
+                    seed_pig_indexes.as_ref(),
                 );
                 let thread_elapsed = thread_start.elapsed();
                 println!("[RUST] Thread {}: Completed {} show pigs in {:.2?}", 
@@ -416,6 +425,16 @@ fn run_farm(
     println!("[RUST] ========================================\n");
     
     show_pigs.sort_by(|a, b| b.success_score.partial_cmp(&a.success_score).unwrap());
+    if seed_pig_indexes.is_some() {
+        write_warm_start_report(
+            &show_pigs,
+            num_show_pigs / threads_for_show_construction,
+            threads_for_show_construction,
+            game_name,
+            bet_type,
+            path_to_games,
+        );
+    }
 
     print_information(
         &show_pigs,
@@ -703,17 +722,10 @@ fn recreate_show_pig(
 
             let pig_index = show_pig.pig_indexes[non_win_type_count];
             let random_pig = &pig_pens[non_win_type_count][pig_index];
-            get_weights(
+            get_pig_weights(
                 &wins_for_fences[non_win_type_count],
                 &mut weights_from_pigs[non_win_type_count],
-                &random_pig.amps,
-                &random_pig.mus,
-                &random_pig.stds,
-                &random_pig.params,
-                &random_pig.apply_parms,
-                &random_pig.random_seeds,
-                &random_pig.random_weights,
-                &random_pig.random_apply_params,
+                random_pig,
                 &mut random_weights_to_apply[non_win_type_count],
             );
 
@@ -747,6 +759,141 @@ fn recreate_show_pig(
     return (success, weights, wins_for_fences, weights_from_pigs);
 }
 
+// Adds a pig to each pen with fixed weights, the seed weights of the fence's books summed by win. Returns the index
+// of each fence's seed pig, or None if the books of a fence have no seed weight
+fn add_seed_pigs(
+    fences: &Vec<Fence>,
+    pig_pens: &mut Vec<Vec<Pig>>,
+    seed_weights: &HashMap<u32, u64>,
+) -> Option<Vec<usize>> {
+    let mut fence_weights: Vec<(Vec<f64>, f64)> = Vec::new();
+    for fence in fences {
+        if fence.win_type {
+            continue;
+        }
+        let mut win_weights: Vec<(f64, f64)> = Vec::with_capacity(fence.win_dist.len());
+        for (win, book_ids) in &fence.win_dist {
+            let weight: u64 = book_ids
+                .iter()
+                .map(|book_id| seed_weights.get(book_id).copied().unwrap_or(0))
+                .sum();
+            win_weights.push((win.0, weight as f64));
+        }
+        win_weights.sort_by(|a, b| a.0.partial_cmp(&b.0).unwrap());
+        let total_weight: f64 = win_weights.iter().map(|(_, weight)| weight).sum();
+        if !win_weights.is_empty() && total_weight <= 0.0 {
+            println!(
+                "[RUST] Warm start not used: fence {} has no seed weight",
+                fence.name
+            );
+            return None;
+        }
+        let weights: Vec<f64> = win_weights
+            .iter()
+            .map(|(_, weight)| weight / total_weight)
+            .collect();
+        let rtp: f64 = win_weights
+            .iter()
+            .map(|(win, weight)| win * weight / total_weight)
+            .sum();
+        fence_weights.push((weights, rtp));
+    }
+
+    let mut seed_pig_indexes: Vec<usize> = Vec::with_capacity(pig_pens.len());
+    for (pen, (weights, rtp)) in pig_pens.iter_mut().zip(fence_weights) {
+        if weights.is_empty() {
+            // Fences without wins only have their default pig
+            seed_pig_indexes.push(0);
+            continue;
+        }
+        pen.push(Pig {
+            amps: vec![],
+            mus: vec![],
+            stds: vec![],
+            params: vec![],
+            apply_parms: vec![],
+            rtp,
+            sum_dist: 1.0,
+            random_seeds: vec![],
+            random_weights: vec![],
+            random_apply_params: vec![],
+            fixed_weights: weights,
+        });
+        seed_pig_indexes.push(pen.len() - 1);
+    }
+    println!(
+        "[RUST] Added warm start pigs to {} pig pens",
+        seed_pig_indexes.len()
+    );
+    Some(seed_pig_indexes)
+}
+
+// Weights of a pig over its fence's sorted wins, either its fixed warm start weights or from its distributions
+fn get_pig_weights(
+    wins: &Vec<f64>,
+    weights: &mut Vec<f64>,
+    pig: &Pig,
+    random_weights_to_apply: &mut Vec<Vec<f64>>,
+) {
+    if !pig.fixed_weights.is_empty() {
+        weights.copy_from_slice(&pig.fixed_weights);
+        return;
+    }
+    get_weights(
+        wins,
+        weights,
+        &pig.amps,
+        &pig.mus,
+        &pig.stds,
+        &pig.params,
+        &pig.apply_parms,
+        &pig.random_seeds,
+        &pig.random_weights,
+        &pig.random_apply_params,
+        random_weights_to_apply,
+    );
+}
+
+// Compares the warm start show pig with the searched ones. Each thread only keeps show pigs improving on its best
+// score, so the first kept show pig reaching the warm start score is where the random search caught up with it
+fn write_warm_start_report(
+    show_pigs: &Vec<ShowPig>,
+    pigs_per_thread: u32,
+    threads: u32,
+    game_name: &str,
+    bet_type: &str,
+    path_to_games: &str,
+) {
+    let seed_index = show_pigs.iter().position(|pig| pig.warm_start);
+    let seed_score = seed_index.map(|index| show_pigs[index].success_score);
+    let matched_after = seed_score.and_then(|score| {
+        show_pigs
+            .iter()
+            .filter(|pig| !pig.warm_start && pig.success_score >= score)
+            .map(|pig| pig.iteration + 1)
+            .min()
+    });
+    let report = serde_json::json!({
+        "score": seed_score,
+        "rank": seed_index.map(|index| index + 1),
+        "show_pigs": show_pigs.len(),
+        "pigs_per_thread": pigs_per_thread,
+        "threads": threads,
+        "matched_after": matched_after,
+    });
+    let file_path = Path::new(path_to_games)
+        .join(game_name)
+        .join("library")
+        .join("optimization_files")
+        .join(format!("warm_start_{}.json", bet_type));
+    fs::write(file_path, serde_json::to_string_pretty(&report).unwrap())
+        .expect("Failed to write warm start report");
+    match seed_score {
+        Some(score) => println!("[RUST] Warm start show pig scored {:.6}", score),
+        None => println!("[RUST] Warm start show pig failed the simulation criteria"),
+    }
+}
+
 fn create_show_pigs(
     fences: &Vec<Fence>,
     num_pigs: u32,
@@ -761,6 +908,7 @@ fn create_show_pigs(
     min_mean_to_median: f64,
     max_mean_to_median: f64,
     pmb_rtp: f64,
+    seed_pig_indexes: Option<&Vec<usize>>,
 ) -> Vec<ShowPig> {
     println!("[RUST] Thread {}: Creating {} Initial Distributions", process_id, num_pigs);
     println!("[RUST] Thread {}: Parameters - trials={}, bet={}, rtp={}, pmb_rtp={}", 
@@ -805,6 +953,8 @@ fn create_show_pigs(
         }
 
         pig_indexes = Vec::new();
+        // The first show pig of the first thread scores the warm start pigs
+        let warm_start = p == 0 && process_id == 0 && seed_pig_indexes.is_some();
         let progress_interval = (num_pigs / 10).max(1); // Log every 10% or at least every pig
         if (p + 1) % progress_interval == 0 || p == 0 {
             let elapsed = create_start.elapsed();
@@ -839,20 +989,16 @@ fn create_show_pigs(
                     ]);
                 }
 
-                let pig_index = rng.gen_range(0..=pig_pens[non_win_type_count].len() - 1) as usize;
+                let pig_index = match seed_pig_indexes {
+                    Some(seed_indexes) if warm_start => seed_indexes[non_win_type_count],
+                    _ => rng.gen_range(0..=pig_pens[non_win_type_count].len() - 1) as usize,
+                };
                 pig_indexes.push(pig_index);
                 let random_pig = &pig_pens[non_win_type_count][pig_index];
-                get_weights(
+                get_pig_weights(
                     &wins_for_fences[non_win_type_count],
                     &mut weights_from_pigs[non_win_type_count],
-                    &random_pig.amps,
-                    &random_pig.mus,
-                    &random_pig.stds,
-                    &random_pig.params,
-                    &random_pig.apply_parms,
-                    &random_pig.random_seeds,
-                    &random_pig.random_weights,
-                    &random_pig.random_apply_params,
+                    random_pig,
                     &mut random_weights_to_apply[non_win_type_count],
                 );
 
@@ -896,6 +1042,8 @@ fn create_show_pigs(
             show_pigs.push(ShowPig {
                 pig_indexes: pig_indexes,
                 success_score: score,
+                iteration: p,
+                warm_start,
             });
             if show_pigs.len() % 10 == 0 {
                 println!("[RUST] Thread {}: {} valid show pigs found (best score: {:.6})", 
@@ -1154,6 +1302,8 @@ pub struct Pig {
     pub random_seeds: Vec<u32>,
     pub random_weights: Vec<f64>,
     pub random_apply_params: Vec<Vec<usize>>,
+    // Weights over the fence's sorted wins, only set for a warm start pig
+    pub fixed_weights: Vec<f64>,
 }
 pub enum ScaleFactor {
     Factor(f64),
@@ -1293,6 +1443,7 @@ fn create_ancestors(
             random_seeds: random_seed,
             random_weights: random_weight,
             random_apply_params: Vec::new(),
+            fixed_weights: Vec::new(),
             rtp: 0.0,
             sum_dist: 0.0,
         };
@@ -1633,6 +1784,7 @@ fn breed_pigs(pos_pig: &Pig, neg_pig: &Pig, pig_heaven: &PigHeaven) -> Pig {
         random_seeds: new_random_seeds,
         random_weights: new_random_weights,
         random_apply_params: new_random_apply_params,
+        fixed_weights: Vec::new(),
     };
 }
 
@@ -1878,4 +2030,6 @@ impl Hash for F64Wrapper {
 struct ShowPig {
     pub pig_indexes: Vec<usize>,
     pub success_score: f64,
+    pub iteration: u32,
+    pub warm_start: bool,
 }
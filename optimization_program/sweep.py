@@ -0,0 +1,197 @@
+"""
+Optimize bet modes with a grid of candidate optimization parameters, comparing the resulting tables.
+
+Each candidate runs in its own folder, `library/optimization_sweeps/<sweep_name>/<candidate>/`, holding a games
+folder whose library links to the game's lookup tables, forces and configs, and receives its own optimization
+outputs. Candidates run concurrently, sharing a thread budget.
+"""
+
+import os
+import csv
+import json
+import shutil
+import itertools
+from functools import partial
+import numpy as np
+from src.config.paths import PROJECT_PATH
+from optimization_program import run_script
+from optimization_program.run_script import OptimizationExecution, print_prefixed
+from optimization_program.fast_fit import get_mode_cost, load_mode_lookup
+from optimization_program.optimizer_bundle import get_bundle_path, write_optimizer_bundle
+from utils.analysis.distribution_functions import WinDistribution
+from utils.analysis.lookup_table import load_lookup_table
+from utils.analysis.player_experience import score_lookup_table
+
+SWEEP_DIR = "optimization_sweeps"
+COMPARISON_FILENAME = "comparison.csv"
+
+
+def expand_grid(grid: dict) -> list:
+    """Every combination of the parameter values in `grid`, as a list of {parameter: value} dictionaries."""
+    names = list(grid.keys())
+    return [dict(zip(names, values)) for values in itertools.product(*(grid[name] for name in names))]
+
+
+def link_path(source: str, destination: str) -> None:
+    """Symlink a file or folder, copying it (with its modification time) where symlinks are not supported."""
+    try:
+        os.symlink(source, destination, target_is_directory=os.path.isdir(source))
+    except OSError:
+        if os.path.isdir(source):
+            shutil.copytree(source, destination)
+        else:
+            shutil.copy2(source, destination)
+
+
+def create_candidate_library(library_path: str, candidate_path: str, game_id: str, mode: str) -> str:
+    """Games folder of a single candidate, sharing the game's simulation outputs. Returns the games folder."""
+    if os.path.exists(candidate_path):
+        shutil.rmtree(candidate_path)
+    games_path = os.path.join(candidate_path, "games")
+    candidate_library = os.path.join(games_path, game_id, "library")
+    for folder in ["publish_files", "optimization_files"]:
+        os.makedirs(os.path.join(candidate_library, folder))
+    for folder in ["lookup_tables", "forces", "configs", "sim_results"]:
+        if os.path.exists(os.path.join(library_path, folder)):
+            link_path(os.path.join(library_path, folder), os.path.join(candidate_library, folder))
+    link_path(get_bundle_path(library_path, mode), get_bundle_path(candidate_library, mode))
+    return games_path
+
+
+def get_candidate_stats(lut_file: str, cost: float, params: dict, lookup_table, criteria_names, criteria_index):
+    """
+    RTP, hit-rate, prob_less_bet and player experience score of an optimized table, with the hit-rate and
+    mean-to-median ratio of each criteria. prob_less_bet is the scorer's estimate (non-zero wins below the bet), the
+    value the score is penalised by.
+    """
+    table = load_lookup_table(lut_file, use_cache=False)
+    win_dist = WinDistribution.from_lookup_table(table)
+    score = score_lookup_table(lut_file, cost, params, seed=0)
+    stats = {
+        "rtp": win_dist.get_rtp(cost),
+        "non_zero_hr": win_dist.get_non_zero_hitrate(),
+        "prob_less_bet": score["prob_less_bet"],
+        "score": score["score"],
+    }
+    row_index = lookup_table.get_id_index(table.ids)
+    if np.any(row_index < 0):
+        raise ValueError(f"{lut_file} contains ids missing from the simulated lookup table.")
+    table_criteria = criteria_index[row_index]
+    for criteria_idx, criteria in enumerate(criteria_names):
+        rows = table_criteria == criteria_idx
+        if not rows.any():
+            continue
+        criteria_dist = WinDistribution(table.payouts[rows], table.weights[rows], payout_scale=100)
+        median = criteria_dist.get_median()
+        stats[f"{criteria}_hr"] = win_dist.get_ratio(win_dist.total_weight, criteria_dist.total_weight)
+        stats[f"{criteria}_m2m"] = criteria_dist.get_average() / median if median > 0 else None
+    return stats
+
+
+def sort_comparison(rows: list, mode_order: list) -> list:
+    """Candidate results ordered by mode, then by descending score, with failed runs (no score) last."""
+    return sorted(
+        rows, key=lambda row: (mode_order.index(row["mode"]), row.get("score") is None, -(row.get("score") or 0.0))
+    )
+
+
+def write_comparison(filename: str, rows: list) -> None:
+    """Write candidate results as csv, with columns in order of first appearance."""
+    columns = list(dict.fromkeys(column for row in rows for column in row))
+    with open(filename, "w", encoding="UTF-8", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=columns)
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def format_comparison(rows: list) -> str:
+    """Aligned text table of candidate results."""
+    columns = list(dict.fromkeys(column for row in rows for column in row))
+    cells = [columns] + [
+        [f"{row[column]:.6g}" if isinstance(row.get(column), float) else str(row.get(column, "")) for column in columns]
+        for row in rows
+    ]
+    widths = [max(len(line[idx]) for line in cells) for idx in range(len(columns))]
+    return "\n".join("  ".join(cell.rjust(width) for cell, width in zip(line, widths)) for line in cells)
+
+
+def run_sweep(
+    game_config,
+    mode_grids: dict,
+    total_threads: int,
+    threads_per_run: int = None,
+    sweep_name: str = "sweep",
+    max_concurrent_runs: int = None,
+    check_feasibility: bool = True,
+    raise_infeasible: bool = False,
+) -> list:
+    """
+    Optimize each mode once per combination of its parameter grid, e.g.
+    `{"base": {"min_mean_to_median": [2, 4], "pmb_rtp": [0.9, 1.0]}}` runs four base mode candidates. Grid values
+    replace the mode's `ConstructParameters` values. Returns one row of statistics per candidate, ordered by mode
+    and score, which are also written to `comparison.csv` in the sweep folder. Conditions are first checked as in
+    `run_all_modes`, with `check_feasibility` and `raise_infeasible`.
+    """
+    os.chdir(PROJECT_PATH)
+    library_path = os.path.join(run_script.PATH_TO_GAMES, game_config.game_id, "library")
+    sweep_path = os.path.join(library_path, SWEEP_DIR, sweep_name)
+
+    candidates = {}
+    for mode, grid in mode_grids.items():
+        mode_params = OptimizationExecution.get_mode_params(game_config, mode)
+        unknown = [name for name in grid if name not in mode_params]
+        if len(unknown) > 0:
+            raise ValueError(f"Unknown optimization parameters for mode {mode}: {unknown}")
+        write_optimizer_bundle(library_path, mode)
+        for idx, swept in enumerate(expand_grid(grid)):
+            candidates[f"{mode}_{idx:03d}"] = (mode, swept, {**mode_params, **swept})
+    if len(candidates) == 0:
+        return []
+    if check_feasibility:
+        OptimizationExecution.run_feasibility_check(game_config, list(mode_grids), raise_infeasible)
+
+    optimizer_path = OptimizationExecution.build_optimizer()
+    if threads_per_run is None:
+        threads_per_run = max(int(total_threads) // len(candidates), 1)
+
+    def run_candidate(candidate, threads):
+        mode, swept, params = candidates[candidate]
+        candidate_path = os.path.join(sweep_path, candidate)
+        games_path = create_candidate_library(library_path, candidate_path, game_config.game_id, mode)
+        with open(os.path.join(candidate_path, "parameters.json"), "w", encoding="UTF-8") as f:
+            f.write(json.dumps({"mode": mode, "parameters": params}, indent=4))
+        candidate_library = os.path.join(games_path, game_config.game_id, "library")
+        setup_path = OptimizationExecution.write_setup_file(
+            game_config,
+            mode,
+            threads,
+            params=params,
+            setup_path=os.path.join(candidate_library, "optimization_files", f"setup_{mode}.txt"),
+            path_to_games=games_path,
+        )
+        print_prefixed(f"[{candidate}] ", f"Optimizing {mode} with {swept}, {threads} threads.")
+        return OptimizationExecution.run_optimizer(optimizer_path, setup_path, f"[{candidate}] ")
+
+    returncodes = OptimizationExecution.run_within_thread_budget(
+        {candidate: partial(run_candidate, candidate) for candidate in candidates},
+        {candidate: threads_per_run for candidate in candidates},
+        total_threads,
+        max_concurrent_runs,
+    )
+
+    rows, mode_lookups = [], {}
+    for candidate, (mode, swept, params) in candidates.items():
+        row = {"candidate": candidate, "mode": mode, **swept, "returncode": returncodes[candidate]}
+        lut_file = os.path.join(
+            sweep_path, candidate, "games", game_config.game_id, "library", "publish_files", f"lookUpTable_{mode}_0.csv"
+        )
+        if returncodes[candidate] == 0 and os.path.isfile(lut_file):
+            if mode not in mode_lookups:
+                mode_lookups[mode] = load_mode_lookup(library_path, mode)
+            row.update(get_candidate_stats(lut_file, get_mode_cost(game_config, mode), params, *mode_lookups[mode]))
+        rows.append(row)
+
+    rows = sort_comparison(rows, list(mode_grids))
+    write_comparison(os.path.join(sweep_path, COMPARISON_FILENAME), rows)
+    print_prefixed("[PYTHON] ", format_comparison(rows))
+    return rows
@@ -0,0 +1,187 @@
+"""
+Warm start of a bet mode's optimization from its previously published lookup table.
+
+Weights of the previous `lookUpTable_<mode>_0.csv` are carried over to the new simulations, by book id where the
+payout is unchanged and otherwise by the average weight of the same payout (or payout bucket). The carried over
+weights are scaled by the mode's scaling rules and adjusted as little as possible (minimum relative entropy) to meet
+each criteria's targets. If each criteria's mean to median ratio is within the optimization parameters' bounds, the
+result seeds the optimization program's search: it is written to the mode's input bundle, and the optimizer scores
+the show pig built from it before its random search. The optimizer records how that show pig compares with the
+searched ones in `library/optimization_files/warm_start_<mode>.json`.
+"""
+
+import os
+import json
+import numpy as np
+from optimization_program.fast_fit import FIT_TOTAL_WEIGHT, fit_weights, get_mode_cost, load_mode_lookup
+from src.write_data.file_manifest import FileManifest
+from utils.analysis.lookup_table import load_lookup_table
+
+# Payout buckets per doubling of the payout, for rows without a previous payout to match
+BUCKETS_PER_OCTAVE = 2
+
+
+def get_warm_start_report_path(library_path: str, mode: str) -> str:
+    """Location of the optimizer's report on a mode's warm start."""
+    return os.path.join(library_path, "optimization_files", f"warm_start_{mode}.json")
+
+
+def get_payout_buckets(payouts: np.ndarray) -> np.ndarray:
+    """Logarithmic bucket index of payouts (cents)."""
+    return np.floor(np.log2(payouts.astype(np.float64) + 1) * BUCKETS_PER_OCTAVE).astype(np.int64)
+
+
+def get_group_means(keys: np.ndarray, values: np.ndarray, query: np.ndarray) -> tuple:
+    """Mean of `values` sharing each query key, with a mask of queries which have a matching key."""
+    unique_keys, inverse = np.unique(keys, return_inverse=True)
+    means = np.bincount(inverse, weights=values) / np.bincount(inverse)
+    positions = np.minimum(np.searchsorted(unique_keys, query), max(len(unique_keys) - 1, 0))
+    found = (unique_keys[positions] == query) if len(unique_keys) > 0 else np.zeros(len(query), dtype=bool)
+    return np.where(found, means[positions], 0.0), found
+
+
+def get_seed_weights(lookup_table, previous_table) -> tuple:
+    """
+    Weights of the previous optimized table carried over to each row of the new lookup table, with counts of
+    rows matched by book id, by payout, by payout bucket, and given the average weight.
+    """
+    previous_weights = previous_table.weights.astype(np.float64)
+    payouts = lookup_table.payouts
+    seed = np.zeros(len(lookup_table), dtype=np.float64)
+
+    previous_index = previous_table.get_id_index(lookup_table.ids)
+    by_id = previous_index >= 0
+    by_id[by_id] = previous_table.payouts[previous_index[by_id]] == payouts[by_id]
+    seed[by_id] = previous_weights[previous_index[by_id]]
+
+    payout_means, by_payout = get_group_means(previous_table.payouts, previous_weights, payouts)
+    by_payout &= ~by_id
+    seed[by_payout] = payout_means[by_payout]
+
+    bucket_means, by_bucket = get_group_means(
+        get_payout_buckets(previous_table.payouts), previous_weights, get_payout_buckets(payouts)
+    )
+    by_bucket &= ~(by_id | by_payout)
+    seed[by_bucket] = bucket_means[by_bucket]
+
+    unmatched = ~(by_id | by_payout | by_bucket)
+    seed[unmatched] = previous_weights.mean() if len(previous_weights) > 0 else 1.0
+    counts = {
+        "by_id": int(by_id.sum()),
+        "by_payout": int(by_payout.sum()),
+        "by_bucket": int(by_bucket.sum()),
+        "unmatched": int(unmatched.sum()),
+    }
+    return seed, counts
+
+
+def get_mean_to_median(payouts: np.ndarray, probs: np.ndarray) -> tuple:
+    """
+    Mean and median payout of row probabilities. As in the optimization program, the median is the smallest payout
+    whose cumulative probability reaches one half.
+    """
+    unique_payouts, inverse = np.unique(payouts, return_inverse=True)
+    payout_probs = np.bincount(inverse, weights=probs) / probs.sum()
+    median_index = min(int(np.searchsorted(np.cumsum(payout_probs), 0.5)), len(unique_payouts) - 1)
+    return float(payout_probs @ unique_payouts), float(unique_payouts[median_index])
+
+
+def check_mean_to_median(payouts, probs, criteria_names, criteria_index, params: dict) -> list:
+    """
+    Criteria whose mean to median ratio is outside (`min_mean_to_median`, `max_mean_to_median`), the bounds each
+    distribution of the optimization program's search is held to.
+    """
+    min_ratio = params.get("min_mean_to_median", 0)
+    max_ratio = params.get("max_mean_to_median", 10)
+    outside = []
+    for criteria in np.unique(criteria_index):
+        rows = criteria_index == criteria
+        if len(np.unique(payouts[rows])) < 2 or probs[rows].sum() == 0:
+            continue
+        mean, median = get_mean_to_median(payouts[rows], probs[rows])
+        if median > 0 and not min_ratio < mean / median < max_ratio:
+            outside.append(f"{criteria_names[criteria]} ({mean / median:.3g})")
+    return outside
+
+
+def warm_start_mode(
+    game_config,
+    mode: str,
+    manifest: FileManifest,
+    min_id_match: float = 0.5,
+    total_weight: int = FIT_TOTAL_WEIGHT,
+) -> dict:
+    """
+    Fit seed weights for the optimizer's search from the previous optimized table, if at least `min_id_match` of
+    rows keep their book id and payout, and every criteria's mean to median ratio is within bounds. Returns a report
+    of the rows matched and the integer `seed_weights` of each lookup table row, or the reason no seed was fitted.
+    """
+    library_path = manifest.library_path
+    previous_file = os.path.join(library_path, "publish_files", f"lookUpTable_{mode}_0.csv")
+    report = {"seeded": False}
+    if not os.path.isfile(previous_file):
+        report["reason"] = "no previous optimized table"
+        return report
+
+    cost = get_mode_cost(game_config, mode)
+    params = game_config.opt_params[mode]["parameters"]
+    lookup_table, criteria_names, criteria_index = load_mode_lookup(library_path, mode)
+    previous_table = load_lookup_table(previous_file, use_cache=False)
+    seed_weights, report["matched"] = get_seed_weights(lookup_table, previous_table)
+    if report["matched"]["by_id"] < min_id_match * len(lookup_table):
+        report["reason"] = "too few unchanged simulations"
+        return report
+
+    # Criteria the previous table gave no weight are fitted from the simulated weights instead
+    for criteria in np.unique(criteria_index):
+        rows = criteria_index == criteria
+        if seed_weights[rows].sum() == 0:
+            seed_weights[rows] = lookup_table.weights[rows]
+    payouts = lookup_table.payouts / 100
+    try:
+        probs, _ = fit_weights(
+            payouts, seed_weights, criteria_names, criteria_index, game_config.opt_params[mode], cost
+        )
+    except ValueError as exc:
+        report["reason"] = str(exc)
+        return report
+    outside = check_mean_to_median(payouts, probs, criteria_names, criteria_index, params)
+    if len(outside) > 0:
+        report["reason"] = f"mean to median ratio out of bounds for criteria {', '.join(outside)}"
+        return report
+
+    report["seed_weights"] = np.rint(probs * total_weight).astype(np.uint64)
+    report["seeded"] = True
+    return report
+
+
+def load_warm_start_report(library_path: str, mode: str) -> dict:
+    """The optimizer's report on a mode's warm start, or None if its last run was not seeded."""
+    try:
+        with open(get_warm_start_report_path(library_path, mode), "r", encoding="UTF-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def format_warm_start_report(report: dict) -> str:
+    """
+    Summary of the optimizer's warm start report. Each optimizer thread only keeps show pigs improving on its best
+    score, so the first kept show pig reaching the warm start score is where the random search caught up with it.
+    """
+    if report["score"] is None:
+        return "Warm start distribution failed the optimizer's simulation criteria."
+    summary = (
+        f"Warm start distribution score {report['score']:.6f}, ranked {report['rank']} of {report['show_pigs']} "
+        f"show pigs kept"
+    )
+    pigs_per_thread = report["pigs_per_thread"]
+    if report["matched_after"] is None:
+        return (
+            f"{summary}; the random search did not match it in {pigs_per_thread} show pigs per thread "
+            f"(at least {pigs_per_thread} saved)."
+        )
+    return (
+        f"{summary}; the random search first matched it after {report['matched_after']} of {pigs_per_thread} show "
+        f"pigs per thread ({report['matched_after'] - 1} saved)."
+    )
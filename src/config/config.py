@@ -49,6 +49,10 @@ class Config:
         self.padding_reels = {}  # symbol configuration displayed before the board reveal
 
         self.write_event_list = True
+        self.books_per_frame = 1000  # compressed books are written as independent zstd frames of this many books
+        self.compression_dictionary = False  # train a zstd dictionary per bet mode for compressing books
+        self.publish_with_dictionary = False  # dictionary-compressed published books are not supported by the RGS
+        self.dictionary_size = 112640
 
         self.bet_modes = []
         self.opt_params = {None: None}
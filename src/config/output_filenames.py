@@ -27,6 +27,7 @@ class OutputFiles:
         self.config_path = os.path.join(self.library_path, "configs")
         self.force_path = os.path.join(self.library_path, "forces")
         self.book_path = os.path.join(self.library_path, "books")
+        self.book_index_path = os.path.join(self.library_path, "book_index")
         self.lookup_path = os.path.join(self.library_path, "lookup_tables")
         self.publish_path = os.path.join(self.library_path, "publish_files")
         self.optimization_path = os.path.join(self.library_path, "optimization_files")
@@ -34,10 +35,12 @@ class OutputFiles:
         self.compressed_path = self.publish_path  # Required RGS files
         self.final_lookup_path = self.publish_path  # Required RGS files
         self.optimization_result_path = os.path.join(self.optimization_path, "trial_results")
+        self.sim_results_path = os.path.join(self.library_path, "sim_results")
 
         all_paths = [
             "library_path",
             "book_path",
+            "book_index_path",
             "compressed_path",
             "lookup_path",
             "config_path",
@@ -46,6 +49,7 @@ class OutputFiles:
             "optimization_path",
             "optimization_result_path",
             "publish_path",
+            "sim_results_path",
         ]
         for p in all_paths:
             self.check_folder_exists(getattr(self, p))
@@ -84,10 +88,14 @@ class OutputFiles:
                 "names": {
                     "books_uncompressed": books_name + ext_name,
                     "books_compressed": books_name + ".jsonl.zst",
+                    "books_index": books_name + ".index.npz",
+                    "books_dictionary": books_name + ".dict",
                 },
                 "paths": {
                     "books_uncompressed": os.path.join(self.book_path, books_name + ext_name),
                     "books_compressed": os.path.join(self.compressed_path, books_name + ".jsonl.zst"),
+                    "books_index": os.path.join(self.book_index_path, books_name + ".index.npz"),
+                    "books_dictionary": os.path.join(self.book_index_path, books_name + ".dict"),
                 },
             }
 
@@ -144,6 +152,14 @@ class OutputFiles:
         """Naming convention for temp force files."""
         return os.path.join(self.temp_path, f"force_{betmode}_{thread_index}_{repeat_count}.json")
 
+    def get_temp_event_name(self, betmode: str, thread_index: int, repeat_count: int):
+        """Naming convention for temp unique-event files."""
+        return os.path.join(self.temp_path, f"events_{betmode}_{thread_index}_{repeat_count}.json")
+
+    def get_temp_sim_results_name(self, betmode: str, thread_index: int, repeat_count: int):
+        """Naming convention for temp columnar simulation results."""
+        return os.path.join(self.temp_path, f"sim_results_{betmode}_{thread_index}_{repeat_count}.npz")
+
     def get_final_book_name(self, betmode: str, compress: bool):
         """Returns final simulation books output name."""
         if compress:
@@ -167,3 +183,7 @@ class OutputFiles:
     def get_final_segmented_name(self, betmode: str):
         """Final csv segmented wins lookup table name."""
         return os.path.join(self.lookup_path, f"lookUpTableSegmented_{betmode}.csv")
+
+    def get_sim_results_path(self, betmode: str):
+        """Directory containing columnar per-simulation results."""
+        return os.path.join(self.sim_results_path, betmode)
@@ -1,6 +1,7 @@
 "Handles independent simulation events and details."
 
 from copy import deepcopy
+from src.events.event_constants import EventConstants
 
 
 class Book:
@@ -14,16 +15,25 @@ class Book:
         self.criteria = criteria
         self.basegame_wins = 0.0
         self.freegame_wins = 0.0
+        self.tumble_count = 0
 
     def add_event(self, event: dict):
         "Append event to book."
         self.events.append(deepcopy(event))
+        if event["type"] == EventConstants.TUMBLE_BOARD.value:
+            self.tumble_count += 1
 
     def append_book_items(self, event_id: int, appended_info: dict):
         "Modify an existing book event at position 'event_id'"
         for k, v in appended_info.items():
             self.events[event_id][k] = v
 
+    def record_unique_events(self, unique_events: dict):
+        "Add the first example of each event type not yet in 'unique_events'."
+        for event in self.events:
+            if event["type"] not in unique_events:
+                unique_events[event["type"]] = {key: val for key, val in event.items() if key != "index"}
+
     def to_json(self):
         "Return JSON-ready object."
         # Convert to cents and round to increments of 10 to match RGS requirements
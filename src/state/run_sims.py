@@ -1,3 +1,4 @@
+import os
 import time
 import random
 from multiprocessing import Process, Manager
@@ -7,7 +8,7 @@ import shutil
 import asyncio
 from typing import Dict
 
-from src.write_data.write_data import output_lookup_and_force_files
+from src.write_data.write_data import output_lookup_and_force_files, make_book_dictionary
 
 
 def create_books(
@@ -30,6 +31,9 @@ def create_books(
     if not compress and sum(num_sim_args.values()) > 1e4:
         warn("Generating large number of uncompressed books!")
 
+    if compress and config.compression_dictionary and config.publish_with_dictionary:
+        warn("Books published with a compression dictionary can not be read by the RGS, use for local analysis only!")
+
     if profiling and threads > 1:
         raise RuntimeError("Multithread profiling not supported, threads must = 1 with profiling enabled")
 
@@ -133,6 +137,12 @@ def run_multi_process_sims(
         print(f"Distributing {remainder} remainder sims across threads in last repeat")
     num_sims_criteria = get_sim_splits(gamestate, num_sims, betmode)
     sim_allocation = assign_sim_criteria(num_sims_criteria, num_sims)
+
+    # Dictionaries are trained from the first batch, so remove any stale dictionary from previous runs
+    gamestate.book_dictionary = None
+    dictionary_path = gamestate.output_files.books[betmode]["paths"]["books_dictionary"]
+    if os.path.isfile(dictionary_path):
+        os.remove(dictionary_path)
     for repeat in range(num_repeats):
         print("Batch", repeat + 1, "of", num_repeats)
         processes = []
@@ -219,3 +229,6 @@ def run_multi_process_sims(
             print("Finished joining threads.")
             gamestate.combine(all_betmode_configs, betmode)
             gamestate.get_betmode(betmode).lock_force_keys()
+
+        if all([compress, gamestate.config.compression_dictionary, repeat == 0, not profiling]):
+            make_book_dictionary(gamestate, betmode, threads, repeat)
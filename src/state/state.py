@@ -13,8 +13,9 @@ from src.write_data.write_data import (
     make_lookup_tables,
     write_json,
     make_lookup_pay_split,
-    write_library_events,
+    write_temp_library_events,
 )
+from src.write_data.sim_results import write_temp_sim_results
 
 
 class GeneralGameState(ABC):
@@ -25,6 +26,9 @@ class GeneralGameState(ABC):
         self.output_files = OutputFiles(self.config)
         self.win_manager = WinManager(self.config.basegame_type, self.config.freegame_type)
         self.library = {}
+        self.sim_results = {}
+        self.unique_events = {}
+        self.book_dictionary = None
         self.recorded_events = {}
         self.special_symbol_functions = {}
         self.temp_wins = []
@@ -180,6 +184,14 @@ class GeneralGameState(ABC):
                 }
         self.temp_wins = []
         self.library[self.sim + 1] = copy(self.book.to_json())
+        if self.unique_events is not None:
+            self.book.record_unique_events(self.unique_events)
+        self.sim_results[self.sim + 1] = (
+            self.repeat_count,
+            self.book.tumble_count,
+            self.fs,
+            self.wincap_triggered,
+        )
         self.win_manager.update_end_round_wins()
 
     def update_final_win(self) -> None:
@@ -246,7 +258,12 @@ class GeneralGameState(ABC):
         """Assigns criteria and runs individual simulations. Results are stored in temporary file to be combined when all threads are finished."""
         self.win_manager = WinManager(self.config.basegame_type, self.config.freegame_type)
         self.library = {}
+        self.sim_results = {}
+        self.unique_events = {} if write_event_list else None
         self.betmode = betmode
+        self.criteria_index = {
+            d._criteria: idx for idx, d in enumerate(self.get_betmode(betmode).get_distributions())
+        }
         self.num_sims = num_sims
         # Use start_sim if provided (for variable sims_per_thread), otherwise calculate from thread_index
         if start_sim is not None:
@@ -278,7 +295,10 @@ class GeneralGameState(ABC):
         print_recorded_wins(self, self.output_files.get_temp_force_name(betmode, thread_index, repeat_count))
         make_lookup_tables(self, self.output_files.get_temp_lookup_name(betmode, thread_index, repeat_count))
         make_lookup_pay_split(self, self.output_files.get_temp_segmented_name(betmode, thread_index, repeat_count))
+        write_temp_sim_results(self, self.output_files.get_temp_sim_results_name(betmode, thread_index, repeat_count))
 
         if write_event_list:
-            write_library_events(self, list(self.library.values()), betmode)
+            write_temp_library_events(
+                self, self.output_files.get_temp_event_name(betmode, thread_index, repeat_count)
+            )
         betmode_copy_list.append(self.config.bet_modes)
@@ -0,0 +1,152 @@
+"""Record hash, size and lookup-table statistics of output files as they are written.
+
+Entries are keyed by path relative to the library folder and store the file size and modification time at the
+point of writing. An entry is only reused if the file on disk still matches, so files modified afterwards (for
+example by the optimization algorithm) are detected and re-read.
+"""
+
+import os
+import json
+import hashlib
+import numpy as np
+from utils.analysis.lookup_table import parse_lookup_text
+
+MANIFEST_FILENAME = "file_manifest.json"
+
+
+def get_lookup_stats(data: bytes) -> dict:
+    """Exact summed weight of each payout (cents) from complete `id,weight,payout` lookup table rows."""
+    stats = {"payout_weights": {}}
+    if len(data.strip()) == 0:
+        return stats
+    values = parse_lookup_text(data)
+    payouts, inverse = np.unique(values[:, 2], return_inverse=True)
+    weights = np.zeros(len(payouts), dtype=np.uint64)
+    np.add.at(weights, inverse, values[:, 1])
+    # JSON object keys are strings
+    stats["payout_weights"] = {str(payout): weight for payout, weight in zip(payouts.tolist(), weights.tolist())}
+    return stats
+
+
+def combine_lookup_stats(stats: dict, new_stats: dict) -> dict:
+    """Accumulate lookup table statistics from consecutive rows."""
+    payout_weights = stats.setdefault("payout_weights", {})
+    for payout, weight in new_stats["payout_weights"].items():
+        payout_weights[payout] = payout_weights.get(payout, 0) + weight
+    return stats
+
+
+class FileDetails:
+    """Accumulate SHA-256, size, row count and (optionally) lookup table statistics from consecutive data."""
+
+    def __init__(self, lookup: bool = False):
+        self.lookup = lookup
+        self.sha256 = hashlib.sha256()
+        self.size = 0
+        self.rows = 0
+        self.stats = {}
+        self.partial_row = b""
+
+    def update(self, data: bytes) -> None:
+        """Add the next block of file data."""
+        self.sha256.update(data)
+        self.size += len(data)
+        self.rows += data.count(b"\n")
+        if self.lookup:
+            data = self.partial_row + data
+            split_index = data.rfind(b"\n") + 1
+            self.partial_row = data[split_index:]
+            combine_lookup_stats(self.stats, get_lookup_stats(data[:split_index]))
+
+    def finish(self) -> dict:
+        """Return details stored in the manifest, including a final row with no trailing newline."""
+        if len(self.partial_row.strip()) > 0:
+            self.rows += 1
+            combine_lookup_stats(self.stats, get_lookup_stats(self.partial_row))
+            self.partial_row = b""
+        details = {"sha256": self.sha256.hexdigest(), "size": self.size, "rows": self.rows}
+        if self.lookup:
+            details["lookup_stats"] = self.stats
+        return details
+
+
+class HashingFileWriter:
+    """Write a file while computing its details, so the output never needs to be re-read."""
+
+    def __init__(self, filename: str, lookup: bool = False):
+        self.filename = filename
+        self.file = open(filename, "wb")
+        self.file_details = FileDetails(lookup)
+        self.details = None
+
+    def write(self, data) -> None:
+        """Write str or bytes data."""
+        if isinstance(data, str):
+            data = data.encode("UTF-8")
+        self.file.write(data)
+        self.file_details.update(data)
+
+    def close(self) -> dict:
+        """Close the file and return its details."""
+        self.file.close()
+        self.details = self.file_details.finish()
+        return self.details
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def get_file_details(filename: str, lookup: bool = False) -> dict:
+    """Compute file details with a single read of an existing file."""
+    file_details = FileDetails(lookup)
+    with open(filename, "rb") as f:
+        while True:
+            data = f.read(1 << 20)
+            if not data:
+                break
+            file_details.update(data)
+    return file_details.finish()
+
+
+class FileManifest:
+    """Cached file details for a game library, stored in `library/file_manifest.json`."""
+
+    def __init__(self, library_path: str):
+        self.library_path = library_path
+        self.filename = os.path.join(library_path, MANIFEST_FILENAME)
+        self.entries = {}
+        if os.path.isfile(self.filename):
+            with open(self.filename, "r", encoding="UTF-8") as f:
+                self.entries = json.load(f)
+
+    def get_key(self, filename: str) -> str:
+        """Manifest key for a file."""
+        return os.path.relpath(os.path.abspath(filename), os.path.abspath(self.library_path))
+
+    def record(self, filename: str, details: dict) -> None:
+        """Store details for a file which has just been written."""
+        file_stat = os.stat(filename)
+        assert file_stat.st_size == details["size"], f"File size does not match written data: {filename}"
+        self.entries[self.get_key(filename)] = dict(details, mtime_ns=file_stat.st_mtime_ns)
+
+    def get(self, filename: str, lookup: bool = False) -> dict:
+        """Return file details, re-reading the file only if it has changed since being recorded."""
+        entry = self.entries.get(self.get_key(filename))
+        file_stat = os.stat(filename)
+        if (
+            entry is None
+            or entry["size"] != file_stat.st_size
+            or entry["mtime_ns"] != file_stat.st_mtime_ns
+            or (lookup and "payout_weights" not in entry.get("lookup_stats", {}))
+        ):
+            entry = dict(get_file_details(filename, lookup), mtime_ns=file_stat.st_mtime_ns)
+            self.entries[self.get_key(filename)] = entry
+        return entry
+
+    def save(self) -> None:
+        """Write manifest to disk."""
+        with open(self.filename, "w", encoding="UTF-8") as f:
+            f.write(json.dumps(self.entries, indent=4))
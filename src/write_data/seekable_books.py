@@ -0,0 +1,224 @@
+"""Write and read compressed books as independent zstd frames with a book-id index.
+
+Concatenated zstd frames form a valid standard zstd stream, so the published file is unchanged for the RGS.
+The sidecar index maps each book-id to the frame containing it, allowing single books to be read without
+decompressing the entire file.
+"""
+
+import io
+import os
+import re
+import json
+import numpy as np
+import zstandard as zstd
+from src.write_data.file_manifest import FileDetails
+
+BOOK_ID_PATTERN = re.compile(rb'^\{"id":\s*(\d+)')
+# Sidecar files of published books are kept out of the RGS upload folder, in this folder of the library
+PUBLISH_DIR = "publish_files"
+BOOK_INDEX_DIR = "book_index"
+
+
+def get_books_stem(books_filename: str) -> str:
+    """Books filename without its compression extension."""
+    for ext in [".jsonl.zst", ".jsonl.zstd", ".zst"]:
+        if books_filename.endswith(ext):
+            return books_filename[: -len(ext)]
+    return books_filename
+
+
+def get_sidecar_stem(books_filename: str) -> str:
+    """Books filename stem for sidecar files, moved to `library/book_index/` for published books."""
+    folder, name = os.path.split(get_books_stem(books_filename))
+    if os.path.basename(os.path.normpath(folder)) == PUBLISH_DIR:
+        folder = os.path.join(os.path.dirname(os.path.normpath(folder)), BOOK_INDEX_DIR)
+    return os.path.join(folder, name)
+
+
+def get_book_index_name(books_filename: str) -> str:
+    """Sidecar index filename for a compressed books file."""
+    return get_sidecar_stem(books_filename) + ".index.npz"
+
+
+def get_book_id(line: bytes) -> int:
+    """Return the book-id from a single JSONL book, avoiding a full parse where possible."""
+    match = BOOK_ID_PATTERN.match(line)
+    if match is not None:
+        return int(match.group(1))
+    return int(json.loads(line)["id"])
+
+
+def get_book_dictionary_name(books_filename: str) -> str:
+    """Trained compression dictionary filename for a compressed books file."""
+    return get_sidecar_stem(books_filename) + ".dict"
+
+
+def get_book_decompressor(books_filename: str) -> zstd.ZstdDecompressor:
+    """Return a decompressor, loading the trained dictionary of the books if it exists."""
+    dictionary_name = get_book_dictionary_name(books_filename)
+    if os.path.isfile(dictionary_name):
+        with open(dictionary_name, "rb") as f:
+            return zstd.ZstdDecompressor(dict_data=zstd.ZstdCompressionDict(f.read()))
+    return zstd.ZstdDecompressor()
+
+
+def train_book_dictionary(book_files: list, dict_size: int = 112640, max_samples: int = 20000) -> bytes:
+    """Train a zstd dictionary from a sample of books spread evenly over the given files."""
+    samples_per_file = max(max_samples // max(len(book_files), 1), 1)
+    samples = []
+    for filename in book_files:
+        for count, line in enumerate(iter_book_lines(filename, zstd.ZstdDecompressor())):
+            if count >= samples_per_file:
+                break
+            samples.append(line)
+    return zstd.train_dictionary(dict_size, samples).as_bytes()
+
+
+def iter_book_lines(books_filename: str, decompressor: zstd.ZstdDecompressor = None):
+    """Yield each (non-empty) book line as bytes, reading across all zstd frames."""
+    if decompressor is None:
+        decompressor = get_book_decompressor(books_filename)
+    with open(books_filename, "rb") as f:
+        with decompressor.stream_reader(f, read_across_frames=True) as reader:
+            for line in io.BufferedReader(reader):
+                if line.strip():
+                    yield line
+
+
+def read_all_books(books_filename: str, decompressor: zstd.ZstdDecompressor = None) -> bytes:
+    """Decompress every frame of a compressed books file."""
+    if decompressor is None:
+        decompressor = get_book_decompressor(books_filename)
+    with open(books_filename, "rb") as f:
+        with decompressor.stream_reader(f, read_across_frames=True) as reader:
+            return reader.read()
+
+
+class SeekableBookWriter:
+    """Compress books into independently decompressible frames of `books_per_frame` books."""
+
+    def __init__(self, filename: str, books_per_frame: int = 1000, compressor: zstd.ZstdCompressor = None):
+        assert books_per_frame > 0, "books_per_frame must be a positive integer."
+        self.filename = filename
+        self.index_filename = get_book_index_name(filename)
+        self.books_per_frame = books_per_frame
+        self.compressor = compressor if compressor is not None else zstd.ZstdCompressor()
+        self.file = open(filename, "wb")
+        self.frame_lines = []
+        self.frame_length = 0
+        self.book_ids, self.book_frames, self.book_offsets, self.book_lengths = [], [], [], []
+        self.frame_offsets, self.frame_sizes = [], []
+        self.bytes_written = 0
+        self.file_details = FileDetails()
+
+    def write_book(self, line: bytes) -> None:
+        """Append a single JSONL book (newline terminated) to the current frame."""
+        if not line.endswith(b"\n"):
+            line += b"\n"
+        self.book_ids.append(get_book_id(line))
+        self.book_frames.append(len(self.frame_offsets))
+        self.book_offsets.append(self.frame_length)
+        self.book_lengths.append(len(line))
+        self.frame_lines.append(line)
+        self.frame_length += len(line)
+        if len(self.frame_lines) >= self.books_per_frame:
+            self.flush_frame()
+
+    def flush_frame(self) -> None:
+        """Compress and write all pending books as a single zstd frame."""
+        if len(self.frame_lines) == 0:
+            return
+        frame = self.compressor.compress(b"".join(self.frame_lines))
+        self.file.write(frame)
+        self.file_details.update(frame)
+        self.frame_offsets.append(self.bytes_written)
+        self.frame_sizes.append(len(frame))
+        self.bytes_written += len(frame)
+        self.frame_lines = []
+        self.frame_length = 0
+
+    def close(self) -> None:
+        """Write final frame and the sidecar book-id index."""
+        self.flush_frame()
+        self.file.close()
+        os.makedirs(os.path.dirname(os.path.abspath(self.index_filename)), exist_ok=True)
+        np.savez(
+            self.index_filename,
+            books_per_frame=np.array([self.books_per_frame], dtype=np.uint64),
+            book_ids=np.array(self.book_ids, dtype=np.uint64),
+            book_frames=np.array(self.book_frames, dtype=np.uint32),
+            book_offsets=np.array(self.book_offsets, dtype=np.uint64),
+            book_lengths=np.array(self.book_lengths, dtype=np.uint64),
+            frame_offsets=np.array(self.frame_offsets, dtype=np.uint64),
+            frame_sizes=np.array(self.frame_sizes, dtype=np.uint64),
+        )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class SeekableBookReader:
+    """Retrieve arbitrary books from a framed books file using its sidecar index."""
+
+    def __init__(self, books_filename: str, index_filename: str = None, decompressor: zstd.ZstdDecompressor = None):
+        self.books_filename = books_filename
+        if index_filename is None:
+            index_filename = get_book_index_name(books_filename)
+        if not os.path.isfile(index_filename):
+            raise FileNotFoundError(f"Book index not found: {index_filename}. Re-run simulations to generate it.")
+        self.decompressor = decompressor if decompressor is not None else get_book_decompressor(books_filename)
+        with np.load(index_filename) as index:
+            self.book_ids = index["book_ids"]
+            self.book_frames = index["book_frames"]
+            self.book_offsets = index["book_offsets"]
+            self.book_lengths = index["book_lengths"]
+            self.frame_offsets = index["frame_offsets"]
+            self.frame_sizes = index["frame_sizes"]
+        self.sort_order = np.argsort(self.book_ids, kind="stable")
+        self.sorted_ids = self.book_ids[self.sort_order]
+        self.cached_frame_index, self.cached_frame = None, None
+
+    def __len__(self):
+        return len(self.book_ids)
+
+    def get_frame(self, frame_index: int) -> bytes:
+        """Decompress a single frame, keeping the most recent frame in memory."""
+        if frame_index != self.cached_frame_index:
+            with open(self.books_filename, "rb") as f:
+                f.seek(int(self.frame_offsets[frame_index]))
+                data = f.read(int(self.frame_sizes[frame_index]))
+            self.cached_frame = self.decompressor.decompress(data)
+            self.cached_frame_index = frame_index
+        return self.cached_frame
+
+    def find_book_rows(self, book_ids) -> np.ndarray:
+        """Return index positions of requested book-ids."""
+        book_ids = np.asarray(book_ids, dtype=np.uint64)
+        positions = np.searchsorted(self.sorted_ids, book_ids)
+        positions = np.minimum(positions, len(self.sorted_ids) - 1)
+        missing = self.sorted_ids[positions] != book_ids
+        if np.any(missing):
+            raise KeyError(f"Book-ids not found: {book_ids[missing][:10].tolist()}")
+        return self.sort_order[positions]
+
+    def get_raw_books(self, book_ids) -> list:
+        """Return uncompressed JSON strings for the requested book-ids, in the order requested."""
+        rows = self.find_book_rows(book_ids)
+        raw_books = [None] * len(rows)
+        for request_index in np.argsort(self.book_frames[rows], kind="stable"):
+            row = rows[request_index]
+            frame = self.get_frame(int(self.book_frames[row]))
+            start = int(self.book_offsets[row])
+            raw_books[request_index] = frame[start : start + int(self.book_lengths[row])].decode("UTF-8")
+        return raw_books
+
+    def get_books(self, book_ids) -> list:
+        """Return parsed books for the requested book-ids."""
+        return [json.loads(book) for book in self.get_raw_books(book_ids)]
+
+    def get_book(self, book_id: int) -> dict:
+        """Return a single parsed book."""
+        return self.get_books([book_id])[0]
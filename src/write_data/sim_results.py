@@ -0,0 +1,84 @@
+"""Columnar per-simulation results, stored as memory-mappable .npy arrays for each bet mode."""
+
+import os
+import json
+import numpy as np
+from utils.game_analytics.get_pay_splits import read_split_file
+
+SIM_RESULT_COLUMNS = {
+    "id": np.uint64,
+    "payout": np.uint64,
+    "criteria": np.uint16,
+    "basegame_wins": np.float64,
+    "freegame_wins": np.float64,
+    "repeat_count": np.uint32,
+    "tumble_count": np.uint32,
+    "freespins": np.uint32,
+    "wincap": np.bool_,
+}
+CRITERIA_FILENAME = "criteria.json"
+
+
+def write_temp_sim_results(gamestate: object, name: str):
+    """Write the per-simulation results of a single thread to a temporary .npz file."""
+    sims = sorted(gamestate.library.keys())
+    columns = {col: np.empty(len(sims), dtype=dtype) for col, dtype in SIM_RESULT_COLUMNS.items()}
+    for row, sim in enumerate(sims):
+        book = gamestate.library[sim]
+        columns["id"][row] = book["id"]
+        columns["payout"][row] = book["payoutMultiplier"]
+        columns["criteria"][row] = gamestate.criteria_index[book["criteria"]]
+        columns["basegame_wins"][row] = book["baseGameWins"]
+        columns["freegame_wins"][row] = book["freeGameWins"]
+        (
+            columns["repeat_count"][row],
+            columns["tumble_count"][row],
+            columns["freespins"][row],
+            columns["wincap"][row],
+        ) = gamestate.sim_results[sim]
+    with open(name, "wb") as f:
+        np.savez(f, **columns)
+
+
+def merge_sim_results(file_list: list, output_path: str, criteria_names: list):
+    """Combine temporary thread results into a single .npy file per column."""
+    if not os.path.exists(output_path):
+        os.makedirs(output_path)
+    chunks = {col: [] for col in SIM_RESULT_COLUMNS}
+    for filename in file_list:
+        with np.load(filename) as data:
+            for col in SIM_RESULT_COLUMNS:
+                chunks[col].append(data[col])
+    for col, dtype in SIM_RESULT_COLUMNS.items():
+        values = np.concatenate(chunks[col]) if len(chunks[col]) > 0 else np.empty(0, dtype=dtype)
+        np.save(os.path.join(output_path, f"{col}.npy"), values.astype(dtype, copy=False))
+    with open(os.path.join(output_path, CRITERIA_FILENAME), "w", encoding="UTF-8") as f:
+        f.write(json.dumps(criteria_names, indent=4))
+
+
+def load_sim_results(output_path: str, mmap: bool = True) -> dict:
+    """Return all stored columns, memory-mapped by default, along with the criteria names."""
+    columns = {}
+    for col in SIM_RESULT_COLUMNS:
+        columns[col] = np.load(os.path.join(output_path, f"{col}.npy"), mmap_mode="r" if mmap else None)
+    with open(os.path.join(output_path, CRITERIA_FILENAME), "r", encoding="UTF-8") as f:
+        columns["criteria_names"] = json.load(f)
+    return columns
+
+
+def load_lookup_criteria(sim_results_path: str, segmented_path: str, lookup_table) -> tuple:
+    """
+    Criteria names and the index into these names for each lookup table row. Stored simulation results are used
+    where they cover every row of the table, otherwise criteria are read from the segmented lookup table.
+    """
+    if os.path.isfile(os.path.join(sim_results_path, "criteria.npy")):
+        sim_results = load_sim_results(sim_results_path)
+        row_index = lookup_table.get_id_index(sim_results["id"])
+        if len(row_index) == len(lookup_table) and np.all(row_index >= 0):
+            criteria_index = np.empty(len(lookup_table), dtype=np.int64)
+            criteria_index[row_index] = sim_results["criteria"]
+            return sim_results["criteria_names"], criteria_index
+    criteria_names, criteria_index, _, _ = read_split_file(segmented_path, base_mode_name="0")
+    if len(criteria_index) != len(lookup_table):
+        raise ValueError(f"Segmented table {segmented_path} does not match lookup table length.")
+    return criteria_names, criteria_index
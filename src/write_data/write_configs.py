@@ -5,35 +5,27 @@ import os
 import shutil
 import warnings
 from collections import defaultdict
-from utils.get_file_hash import get_hash
-from utils.analysis.distribution_functions import (
-    make_win_distribution,
-    get_lookup_length,
-    get_distribution_moments,
-)
-
-
-def copy_and_rename_csv(filepath: str) -> None:
-    """If no optimization has been run, initialise the lookup table."""
-    file_location = os.path.dirname(filepath)
-    new_filepath = os.path.join(file_location, os.path.splitext(os.path.basename(filepath))[0] + "_0.csv")
-    shutil.copy(filepath, new_filepath)
+from src.write_data.file_manifest import FileManifest, HashingFileWriter
+from utils.analysis.distribution_functions import WinDistribution
 
 
 def generate_configs(gamestate: object, json_padding: bool = True, assign_properties: bool = True):
     """Construct frontend, backend and optimization-required configuration files."""
+    # File details are shared across configs, only files changed since they were last recorded are re-read
+    manifest = FileManifest(gamestate.output_files.library_path)
     make_fe_config(
         gamestate=gamestate,
         json_padding=json_padding,
         assign_properties=assign_properties,
+        manifest=manifest,
     )
-    make_be_config(gamestate)
+    be_info = make_be_config(gamestate, manifest=manifest)
     make_temp_math_config(gamestate)
-    make_index_config(gamestate)
+    make_index_config(gamestate, be_info)
     # make_math_config(gamestate)
 
 
-def make_index_config(gamestate: object):
+def make_index_config(gamestate: object, be_info: dict = None):
     """
     RGS config file list verification
     This file is used to locate all published math files from AWS. Custom directory structures can be uplaoded
@@ -46,8 +38,11 @@ def make_index_config(gamestate: object):
         cost_map[bclass._name] = float(bclass._cost)
 
     with open(gamestate.output_files.configs["paths"]["manifest"], "w", encoding="UTF-8") as f:
-        with open(gamestate.output_files.configs["paths"]["be_config"], "r", encoding="UTF-8") as f2:
-            config_json = json.load(f2)
+        if be_info is not None:
+            config_json = be_info
+        else:
+            with open(gamestate.output_files.configs["paths"]["be_config"], "r", encoding="UTF-8") as f2:
+                config_json = json.load(f2)
 
         for bm in config_json["bookShelfConfig"]:
             mode_obj = defaultdict(str)
@@ -233,7 +228,7 @@ def make_math_config(gamestate):
             file.close()
 
 
-def make_fe_config(gamestate, json_padding=True, assign_properties=True, **kwargs):
+def make_fe_config(gamestate, json_padding=True, assign_properties=True, manifest: FileManifest = None, **kwargs):
     """
     json_padding formats symbols the same as the board {'name': symbol} (default), alternatively an array of strings ['H1',...] is passed
     assign_properties will invoke a symbol attribute
@@ -295,16 +290,19 @@ def make_fe_config(gamestate, json_padding=True, assign_properties=True, **kwarg
         json_info["paddingReels"] = gamestate.config.paddingReels
 
     f_name = os.path.join(gamestate.output_files.config_path, f"config_fe_{gamestate.config.game_id}.json")
-    fe_json = open(f_name, "w", encoding="UTF-8")
-    fe_json.write(json.dumps(json_info, indent=4))
-    fe_json.close()
+    with HashingFileWriter(f_name) as fe_json:
+        fe_json.write(json.dumps(json_info, indent=4))
+    if manifest is not None:
+        manifest.record(f_name, fe_json.details)
 
 
-def make_be_config(gamestate):
+def make_be_config(gamestate, manifest: FileManifest = None):
     """ "Generate config.json for RGS to retrieve game details and hash-values."""
     config = gamestate.config
+    if manifest is None:
+        manifest = FileManifest(gamestate.output_files.library_path)
 
-    fe_config_sha = get_hash(gamestate.output_files.configs["paths"]["fe_config"])
+    fe_config_sha = manifest.get(gamestate.output_files.configs["paths"]["fe_config"])["sha256"]
     available_bm = gamestate.config.bet_modes
 
     # General game data
@@ -325,7 +323,7 @@ def make_be_config(gamestate):
     be_info["providerNumber"] = int(config.provider_number)
     be_info["standardForceFile"] = {
         "file": "force.json",
-        "sha256": get_hash(os.path.join(gamestate.output_files.force_path, "force.json")),
+        "sha256": manifest.get(os.path.join(gamestate.output_files.force_path, "force.json"))["sha256"],
     }
 
     # Betmode specific data
@@ -335,13 +333,14 @@ def make_be_config(gamestate):
         if not (os.path.exists(lut_table)):
             print(f"File does not exist: {lut_table}, \n Generating lut_0 file.")
             base_table = gamestate.output_files.lookups[bet.get_name()]["paths"]["base_lookup"]
-            copy_and_rename_csv(base_table)
+            shutil.copy(base_table, lut_table)
+            manifest.record(lut_table, manifest.get(base_table, lookup=True))
 
-        lut_sha_value = get_hash(lut_table)
-        dist = make_win_distribution(lut_table)
-        _, std_val, _, _ = get_distribution_moments(dist)
+        lut_details = manifest.get(lut_table, lookup=True)
+        lut_sha_value = lut_details["sha256"]
+        _, std_val, _, _ = WinDistribution.from_lookup_stats(lut_details["lookup_stats"]).get_moments()
         std_val = round(std_val / bet.get_cost(), 2)
-        booklength = get_lookup_length(lut_table)
+        booklength = lut_details["rows"]
 
         _, lut_nme = os.path.split(lut_table)
         dic = {
@@ -358,13 +357,13 @@ def make_be_config(gamestate):
         }
         data_loc = gamestate.output_files.books[bet.get_name()]["paths"]["books_compressed"]
         try:
-            data_sha = get_hash(data_loc)
+            data_sha = manifest.get(data_loc)["sha256"]
         except FileNotFoundError:
             data_sha = ""
             warnings.warn("Compressed books file not found. Hash is empty.")
 
         force_loc = gamestate.output_files.force[bet.get_name()]["paths"]["force_record"]
-        force_sha = get_hash(force_loc)
+        force_sha = manifest.get(force_loc)["sha256"]
 
         dic["booksFile"] = {
             "file": gamestate.output_files.books[bet.get_name()]["names"]["books_compressed"],
@@ -379,3 +378,6 @@ def make_be_config(gamestate):
     file = open(gamestate.output_files.configs["paths"]["be_config"], "w", encoding="UTF-8")
     file.write(json.dumps(be_info, indent=4))
     file.close()
+    manifest.save()
+
+    return be_info
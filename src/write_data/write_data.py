@@ -1,30 +1,13 @@
 """Handles writing all game game files"""
 
 from collections import defaultdict
-from warnings import warn
-import shutil
 import os
-import hashlib
 import json
 import ast
 import zstandard as zstd
-
-
-def get_sha_256(file_to_hash: str):
-    """Get human readable hash of file."""
-    try:
-        with open(file_to_hash, "rb") as f:
-            sha256_file = hashlib.sha256()
-            while True:
-                data = f.read(65536)
-                if not data:
-                    break
-                sha256_file.update(data)
-        sha256_hexRep = sha256_file.hexdigest()
-    except FileNotFoundError:
-        warn(f"{file_to_hash} is empty.\nCould not create hash")
-        sha256_hexRep = ""
-    return sha256_hexRep
+from src.write_data.sim_results import merge_sim_results
+from src.write_data.file_manifest import FileManifest, HashingFileWriter
+from src.write_data.seekable_books import SeekableBookWriter, iter_book_lines, train_book_dictionary
 
 
 def make_force_json(gamestate: object):
@@ -106,18 +89,20 @@ def make_lookup_pay_split(gamestate: object, name: str):
     file.close()
 
 
-def write_library_events(gamestate: object, library: list, gametype: str):
+def write_temp_library_events(gamestate: object, name: str):
+    """Temporary file of unique events recorded by a single thread."""
+    with open(name, "w", encoding="UTF-8") as f:
+        f.write(json.dumps(gamestate.unique_events))
+
+
+def write_library_events(gamestate: object, file_list: list, gametype: str):
     """Write all unique events within a given mode - with one example application."""
-    unique_event = []
     event_items = {}
-    for event in library:
-        for instance in event["events"]:
-            lib_event = instance["type"]
-            if lib_event not in unique_event:
-                unique_event.append(lib_event)
-                item_keys = instance.keys()
-                dict_details = {key: instance[key] for key in item_keys if key != "index"}
-                event_items[lib_event] = dict_details
+    for filename in file_list:
+        with open(filename, "r", encoding="UTF-8") as f:
+            for lib_event, dict_details in json.load(f).items():
+                if lib_event not in event_items:
+                    event_items[lib_event] = dict_details
     json_object = json.dumps(event_items, indent=4)
     with open(
         os.path.join(gamestate.output_files.config_path, f"event_config_{gametype}.json"),
@@ -127,6 +112,18 @@ def write_library_events(gamestate: object, library: list, gametype: str):
         f.write(json_object)
 
 
+def make_book_dictionary(gamestate: object, betmode: str, threads: int, repeat_index: int):
+    """Train a compression dictionary from a completed batch and store it in the library, outside the publish files."""
+    file_list = [
+        gamestate.output_files.get_temp_multi_thread_name(betmode, thread, repeat_index, True)
+        for thread in range(threads)
+    ]
+    gamestate.book_dictionary = train_book_dictionary(file_list, gamestate.config.dictionary_size)
+    dictionary_path = gamestate.output_files.books[betmode]["paths"]["books_dictionary"]
+    with open(dictionary_path, "wb") as f:
+        f.write(gamestate.book_dictionary)
+
+
 def output_lookup_and_force_files(
     threads: int,
     batching_size: int,
@@ -138,6 +135,7 @@ def output_lookup_and_force_files(
 ):
     """Combine temporary lookup tables and force files into a single output."""
     print("Saving books for ", game_id, "in", betmode)
+    manifest = FileManifest(gamestate.output_files.library_path)
     num_repeats = max(int(round(num_sims / threads / batching_size, 0)), 1)
     file_list = []
     for repeat_index in range(num_repeats):
@@ -147,18 +145,20 @@ def output_lookup_and_force_files(
             )
 
     if compress:
-        temp_book_output_path = os.path.join(gamestate.output_files.book_path, "temp_book_output.json")
-        with open(temp_book_output_path, "w", encoding="UTF-8") as outfile:
-            for fname in file_list:
-                with open(fname, "rb") as infile:
-                    decompressed = zstd.ZstdDecompressor().decompress(infile.read())
-                    outfile.write(decompressed.decode("UTF-8"))
-
         final_out = gamestate.output_files.get_final_book_name(betmode, True)
-        with open(temp_book_output_path, "rb") as f_in, open(final_out, "wb") as f_out:
-            f_out.write(zstd.ZstdCompressor().compress(f_in.read()))
-
-        os.remove(temp_book_output_path)
+        decompressor, compressor = zstd.ZstdDecompressor(), zstd.ZstdCompressor()
+        if gamestate.book_dictionary is not None:
+            book_dictionary = zstd.ZstdCompressionDict(gamestate.book_dictionary)
+            decompressor = zstd.ZstdDecompressor(dict_data=book_dictionary)
+            if gamestate.config.publish_with_dictionary:
+                compressor = zstd.ZstdCompressor(dict_data=book_dictionary)
+        with SeekableBookWriter(
+            final_out, books_per_frame=gamestate.config.books_per_frame, compressor=compressor
+        ) as book_writer:
+            for fname in file_list:
+                for line in iter_book_lines(fname, decompressor):
+                    book_writer.write_book(line)
+        manifest.record(final_out, book_writer.file_details.finish())
     else:
         with open(
             gamestate.output_files.get_final_book_name(betmode, False),
@@ -180,6 +180,27 @@ def output_lookup_and_force_files(
                         else:
                             outfile.write("," + file_data[1::])  # dont write first '[', write last ']'
 
+    event_file_list = []
+    for repeat_index in range(num_repeats):
+        for thread in range(threads):
+            event_file_list.append(gamestate.output_files.get_temp_event_name(betmode, thread, repeat_index))
+    event_file_list = [f for f in event_file_list if os.path.isfile(f)]
+    if len(event_file_list) > 0:
+        write_library_events(gamestate, event_file_list, betmode)
+
+    print("Saving simulation results for", game_id, "in", betmode)
+    sim_results_file_list = []
+    for repeat_index in range(num_repeats):
+        for thread in range(threads):
+            sim_results_file_list.append(
+                gamestate.output_files.get_temp_sim_results_name(betmode, thread, repeat_index)
+            )
+    merge_sim_results(
+        sim_results_file_list,
+        gamestate.output_files.get_sim_results_path(betmode),
+        [d._criteria for d in gamestate.get_betmode(betmode).get_distributions()],
+    )
+
     print("Saving force files for", game_id, "in", betmode)
     force_results_dict = {}
     file_list = []
@@ -212,8 +233,9 @@ def output_lookup_and_force_files(
 
     json_object_for_rob = json.dumps(force_results_dict_just_for_rob, indent=4)
     force_record_path = os.path.join(gamestate.output_files.force_path, f"force_record_{betmode}.json")
-    with open(force_record_path, "w", encoding="UTF-8") as file:
+    with HashingFileWriter(force_record_path) as file:
         file.write(json_object_for_rob)
+    manifest.record(force_record_path, file.details)
 
     forceResultKeys = get_force_options(force_results_dict)
     json_file_path = os.path.join(gamestate.output_files.force_path, "force.json")
@@ -224,8 +246,9 @@ def output_lookup_and_force_files(
         data = {}
     data[gamestate.get_current_betmode().get_name()] = forceResultKeys
     json_object = json.dumps(data, indent=4)
-    with open(json_file_path, "w", encoding="UTF-8") as file:
+    with HashingFileWriter(json_file_path) as file:
         file.write(json_object)
+    manifest.record(json_file_path, file.details)
 
     weights_plus_wins_file_list = []
     segmented_lut_file_list = []
@@ -239,29 +262,35 @@ def output_lookup_and_force_files(
                 gamestate.output_files.get_temp_segmented_name(betmode, thread, repeat_index)
             ]
 
-    with open(
-        gamestate.output_files.get_final_lookup_name(betmode),
-        "w",
-        encoding="UTF-8",
-    ) as outfile:
-        for filename in weights_plus_wins_file_list:
-            with open(filename, "r", encoding="UTF-8") as infile:
-                outfile.write(infile.read())
-
-    # Always copy final lookup table to _0 file (overwrite if exists)
+    # The final lookup table is always also written to the _0 file (overwrite if exists)
     # This ensures the _0 file matches the newly generated books
-    shutil.copy(
-        gamestate.output_files.get_final_lookup_name(betmode),
-        gamestate.output_files.get_optimized_lookup_name(betmode),
-    )
-    with open(
-        gamestate.output_files.get_final_segmented_name(betmode),
-        "w",
-        encoding="UTF-8",
-    ) as outfile:
+    final_lookup_name = gamestate.output_files.get_final_lookup_name(betmode)
+    optimized_lookup_name = gamestate.output_files.get_optimized_lookup_name(betmode)
+    with HashingFileWriter(final_lookup_name, lookup=True) as outfile, open(optimized_lookup_name, "wb") as optfile:
+        for filename in weights_plus_wins_file_list:
+            for data in iter_file_chunks(filename):
+                outfile.write(data)
+                optfile.write(data)
+    manifest.record(final_lookup_name, outfile.details)
+    manifest.record(optimized_lookup_name, outfile.details)
+
+    segmented_name = gamestate.output_files.get_final_segmented_name(betmode)
+    with HashingFileWriter(segmented_name) as outfile:
         for filename in segmented_lut_file_list:
-            with open(filename, "r", encoding="UTF-8") as infile:
-                outfile.write(infile.read())
+            for data in iter_file_chunks(filename):
+                outfile.write(data)
+    manifest.record(segmented_name, outfile.details)
+    manifest.save()
+
+
+def iter_file_chunks(filename: str, chunk_size: int = 1 << 20):
+    """Yield file contents in fixed size blocks."""
+    with open(filename, "rb") as f:
+        while True:
+            data = f.read(chunk_size)
+            if not data:
+                break
+            yield data
 
 
 def write_json(gamestate, filename: str):
@@ -273,7 +302,10 @@ def write_json(gamestate, filename: str):
     combined_data = "\n".join(json_objects) + "\n"
 
     if filename.endswith(".zst"):
-        compressor = zstd.ZstdCompressor()
+        if gamestate.book_dictionary is not None:
+            compressor = zstd.ZstdCompressor(dict_data=zstd.ZstdCompressionDict(gamestate.book_dictionary))
+        else:
+            compressor = zstd.ZstdCompressor()
         compressed_data = compressor.compress(combined_data.encode("UTF-8"))
         with open(filename, "wb") as f:
             f.write(compressed_data)
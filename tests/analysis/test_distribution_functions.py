@@ -0,0 +1,46 @@
+"""Test distribution statistics computed by WinDistribution and the function wrappers."""
+
+import numpy as np
+from utils.analysis.lookup_table import write_lookup_table
+from utils.analysis.distribution_functions import (
+    WinDistribution,
+    make_win_distribution,
+    get_distribution_moments,
+    get_distribution_median,
+    calculate_rtp,
+    prob_less_than_bet,
+    min_dist_difference,
+)
+
+
+def reference_moments(payouts, weights):
+    """Direct weighted moment calculation."""
+    probs = np.array(weights, dtype=float) / sum(weights)
+    payouts = np.array(payouts, dtype=float)
+    mean = np.dot(payouts, probs)
+    var = np.dot((payouts - mean) ** 2, probs)
+    skew = np.dot((payouts - mean) ** 3, probs) / var**1.5
+    kurt = np.dot((payouts - mean) ** 4, probs) / var**2 - 3
+    return mean, var, skew, kurt
+
+
+def test_exact_and_dict_statistics_match(tmp_path):
+    """Integer lookup-table distributions and normalized dictionaries should agree."""
+    filename = str(tmp_path / "lookUpTable_base_0.csv")
+    rows = [[1, 50, 0], [2, 30, 50], [3, 12, 200], [4, 7, 1000], [5, 1, 50000], [6, 10, 50]]
+    write_lookup_table(filename, np.array(rows, dtype=np.uint64))
+
+    exact = WinDistribution.from_file(filename)
+    dist = make_win_distribution(filename)
+    mean, var, skew, kurt = reference_moments([0, 0.5, 2, 10, 500], [50, 40, 12, 7, 1])
+
+    assert exact.exact and exact.total_weight == 110
+    assert abs(exact.get_rtp(1.0) - mean) < 1e-12
+    assert abs(calculate_rtp(dist, 1.0, 110) - mean) < 1e-12
+    for moments in [exact.get_moments(), get_distribution_moments(dist)]:
+        assert np.allclose(moments, [var, var**0.5, skew, kurt], rtol=1e-9)
+
+    assert exact.get_median() == get_distribution_median(dist) == 0.5
+    assert abs(prob_less_than_bet(dist, 1.0) - 90 / 110) < 1e-12
+    assert exact.get_maxwin_hitrate() == 110
+    assert min_dist_difference(dist) == exact.get_min_difference() == 50
@@ -0,0 +1,55 @@
+"""Test the shared lookup table reader and its binary cache."""
+
+import os
+import numpy as np
+import pytest
+from utils.analysis.lookup_table import LOOKUP_CACHE_DIR, load_lookup_table, parse_lookup_text, write_lookup_table
+from utils.analysis.distribution_functions import make_win_distribution
+
+
+def test_parse_and_distribution(tmp_path):
+    """Parsed columns and win distribution should match the csv rows."""
+    filename = str(tmp_path / "lookUpTable_base.csv")
+    rows = [[1, 3, 0], [2, 1, 150], [3, 2, 150], [4, 18446744073709551, 2500]]
+    write_lookup_table(filename, np.array(rows, dtype=np.uint64))
+
+    lookup_table = load_lookup_table(filename)
+    assert lookup_table.ids.tolist() == [1, 2, 3, 4]
+    assert lookup_table.weights.tolist() == [3, 1, 2, 18446744073709551]
+    assert lookup_table.total_weight == 18446744073709557
+    assert make_win_distribution(filename, normalize=False) == {0.0: 3.0, 1.5: 3.0, 25.0: 18446744073709551.0}
+    assert lookup_table.get_id_index([3, 7]).tolist() == [2, -1]
+
+    with pytest.raises(ValueError):
+        parse_lookup_text("1,1,10\n2,1,2.5\n")
+    for malformed in ["1,1,10,2,1,20\n", "1,1\n2,1\n", "1,1,10\n2,1\n"]:
+        with pytest.raises(ValueError):
+            parse_lookup_text(malformed)
+
+
+def test_cache_reused_until_file_changes(tmp_path):
+    """Cached arrays are memory-mapped and replaced when the csv contents change."""
+    filename = str(tmp_path / "lookUpTable_base.csv")
+    write_lookup_table(filename, np.array([[1, 1, 10], [2, 1, 20]], dtype=np.uint64))
+    first = load_lookup_table(filename)
+    second = load_lookup_table(filename)
+    assert isinstance(second.table, np.memmap)
+    assert second.sha256 == first.sha256
+
+    write_lookup_table(filename, np.array([[1, 5, 10], [2, 1, 20], [3, 1, 0]], dtype=np.uint64))
+    os.utime(filename, ns=(0, 0))
+    updated = load_lookup_table(filename)
+    assert updated.weights.tolist() == [5, 1, 1]
+    assert len(os.listdir(tmp_path / LOOKUP_CACHE_DIR)) == 2
+
+
+def test_library_cache_outside_publish_files(tmp_path):
+    """Tables within a library are cached under the library, keyed by their relative path."""
+    publish_path = tmp_path / "library" / "publish_files"
+    publish_path.mkdir(parents=True)
+    filename = str(publish_path / "lookUpTable_base_0.csv")
+    write_lookup_table(filename, np.array([[1, 1, 10], [2, 1, 20]], dtype=np.uint64))
+    load_lookup_table(filename)
+    assert isinstance(load_lookup_table(filename).table, np.memmap)
+    assert os.listdir(publish_path) == ["lookUpTable_base_0.csv"]
+    assert len(os.listdir(tmp_path / "library" / LOOKUP_CACHE_DIR / "publish_files")) == 2
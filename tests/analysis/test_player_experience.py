@@ -0,0 +1,47 @@
+"""Test the sampled player experience score of lookup tables."""
+
+import numpy as np
+from utils.analysis.lookup_table import write_lookup_table
+from utils.analysis.player_experience import (
+    AliasTable,
+    get_prob_less_bet_penalty,
+    score_distribution,
+    score_lookup_table,
+)
+
+PARAMS = {"test_spins": [1, 3], "test_spins_weights": [0.4, 0.6], "pmb_rtp": 1.0, "simulation_trials": 20000}
+
+
+def test_alias_table_frequencies():
+    """Sampled outcome frequencies follow the given probabilities."""
+    probabilities = np.array([0.5, 0.0, 0.125, 0.25, 0.125])
+    alias_table = AliasTable(probabilities * 8)
+    samples = alias_table.sample(np.random.default_rng(1), 200000)
+    assert np.allclose(np.bincount(samples, minlength=5) / 200000, probabilities, atol=0.005)
+    assert not np.any(samples == 1)
+
+
+def test_score_matches_exact_probabilities():
+    """Success probabilities match the exact values for a two outcome distribution, regardless of chunk size."""
+    payouts, probabilities = [0.0, 0.5, 3.0], [0.5, 0.2, 0.3]
+    # One spin succeeds on a 3x win, three spins succeed unless all three fall short of 3x in total
+    exact_success = [0.3, 1 - 0.7**3]
+    exact_less_bet = 0.2
+
+    score = score_distribution(payouts, probabilities, 1.0, [1, 3], [0.4, 0.6], 1.0, 40000, seed=3)
+    assert np.allclose(score["success_probs"], exact_success, atol=0.01)
+    assert np.isclose(score["prob_less_bet"], exact_less_bet, atol=0.01)
+    assert np.isclose(score["score"], score["success_score"] * get_prob_less_bet_penalty(score["prob_less_bet"]))
+
+    chunked = score_distribution(payouts, probabilities, 1.0, [1, 3], [0.4, 0.6], 1.0, 40000, seed=3, max_chunk_spins=7)
+    assert np.allclose(chunked["success_probs"], exact_success, atol=0.01)
+
+
+def test_score_lookup_table(tmp_path):
+    """Lookup table payouts are scored as multipliers of the bet cost."""
+    filename = str(tmp_path / "lookUpTable_base_0.csv")
+    write_lookup_table(filename, np.array([[1, 1, 0], [2, 1, 200], [3, 2, 400]], dtype=np.uint64))
+    score = score_lookup_table(filename, 2.0, PARAMS, seed=0)
+    assert np.isclose(score["success_probs"][0], 0.75, atol=0.02)
+    assert score["prob_less_bet"] == 0
+    assert get_prob_less_bet_penalty(0.9) == 0.001
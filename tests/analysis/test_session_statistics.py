@@ -0,0 +1,51 @@
+"""Test exact session statistics from convolution of the payout distribution."""
+
+import numpy as np
+from utils.analysis.lookup_table import write_lookup_table
+from utils.analysis.session_statistics import (
+    convolve_capped,
+    get_lookup_session_statistics,
+    get_payout_step,
+    get_session_pmf,
+    get_session_score,
+)
+
+
+def direct_session_pmf(spin_pmf, spins):
+    """Repeated direct convolution, without capping."""
+    session_pmf = np.ones(1)
+    for _ in range(spins):
+        session_pmf = np.convolve(session_pmf, spin_pmf)
+    return session_pmf
+
+
+def test_session_pmf_matches_direct_convolution():
+    """Binary exponentiation with FFTs matches direct convolution below the cap, with the tail in the final bin."""
+    spin_pmf = np.array([0.55, 0.2, 0.0, 0.15, 0.0, 0.0, 0.07, 0.0, 0.0, 0.0, 0.03])
+    expected = direct_session_pmf(spin_pmf, 13)
+    session_pmf = get_session_pmf(spin_pmf, 13, 40)
+    assert np.allclose(session_pmf[:40], expected[:40], rtol=1e-9, atol=1e-15)
+    assert np.isclose(session_pmf[40], expected[40:].sum())
+
+    uncapped = get_session_pmf(spin_pmf, 13, len(expected))
+    assert np.allclose(uncapped[: len(expected)], expected, atol=1e-15)
+    assert np.allclose(convolve_capped(spin_pmf, spin_pmf, 100)[:21], np.convolve(spin_pmf, spin_pmf))
+
+
+def test_lookup_session_statistics(tmp_path):
+    """Success probabilities and quantiles of a lookup table match exact values."""
+    filename = str(tmp_path / "lookUpTable_base_0.csv")
+    write_lookup_table(filename, np.array([[1, 5, 0], [2, 2, 50], [3, 3, 300]], dtype=np.uint64))
+    assert get_payout_step([0, 50, 300]) == 50
+
+    statistics = get_lookup_session_statistics(filename, 1.0, test_spins=[1, 3], quantiles=[0.5, 0.9])
+    # Three spins return the bet unless there is no 3x win
+    assert np.isclose(statistics["1"]["success_prob"], 0.3)
+    assert np.isclose(statistics["3"]["success_prob"], 1 - 0.7**3)
+    assert statistics["1"]["rtp_quantiles"] == {"0.5": 0.0, "0.9": 3.0}
+    # P(total < 3x) = 0.7^3 and P(total <= 3x) = 0.7^3 + 3 * 0.3 * 0.5^2, so the median session returns the bet
+    assert np.isclose(statistics["3"]["rtp_quantiles"]["0.5"], 1.0)
+    assert np.isclose(get_session_score(statistics, [0.5, 0.5]), (0.3 + 1 - 0.7**3) / 2)
+
+    capped = get_lookup_session_statistics(filename, 1.0, test_spins=[1], quantiles=[0.9], max_session_rtp=1.0)
+    assert capped["1"]["rtp_quantiles"]["0.9"] is None
@@ -0,0 +1,86 @@
+"""Shared game library and placeholder optimizer for optimization driver tests."""
+
+import os
+import sys
+from types import SimpleNamespace
+import pytest
+from optimization_program import run_script
+from optimization_program.run_script import OptimizationExecution
+
+MODE_PARAMS = {
+    "num_show_pigs": 10,
+    "num_pigs_per_fence": 100,
+    "score_type": "rtp",
+    "test_spins": [10, 20],
+    "test_spins_weights": [0.5, 0.5],
+    "simulation_trials": 5,
+    "pmb_rtp": 1.0,
+    "min_mean_to_median": 4,
+    "max_mean_to_median": 8,
+}
+CONDITIONS = {"0": {"rtp": 0, "av_win": 0, "hr": "x"}}
+
+# Prints its setup file and writes a trial file and the optimized table, formatted with the setup values. A warm
+# start report is written when the input bundle has seed weights
+OPTIMIZER_SCRIPT = """import json, os, sys
+setup = dict(line.strip().split(";") for line in open(sys.argv[1]) if ";" in line)
+library_path = os.path.join(setup["path_to_games"], setup["game_name"], "library")
+mode = setup["bet_type"]
+print(open(sys.argv[1]).read())
+with open(os.path.join(library_path, "optimization_files", f"optimizer_input_{mode}.bin"), "rb") as f:
+    if int.from_bytes(f.read(52)[44:], "little") > 0:
+        report = {"score": 0.5, "rank": 1, "show_pigs": 2, "pigs_per_thread": 5, "threads": 2, "matched_after": None}
+        with open(os.path.join(library_path, "optimization_files", f"warm_start_{mode}.json"), "w") as g:
+            json.dump(report, g)
+with open(os.path.join(library_path, "publish_files", f"lookUpTable_{mode}_0.csv"), "w") as f:
+    f.write(open(os.path.join(os.path.dirname(sys.argv[0]), "optimized_table.txt")).read().format(**setup))
+with open(os.path.join(library_path, "optimization_files", f"{mode}_0_1.csv"), "w") as f:
+    f.write("Name,Pig1\\n")
+"""
+
+
+@pytest.fixture
+def optimizer_game(tmp_path, monkeypatch):
+    """
+    Factory of a game's simulation outputs, given the (payout in cents, criteria) of each simulation of each mode,
+    with a placeholder optimizer writing `optimized_table`. PATH_TO_GAMES and the built optimizer are replaced.
+    """
+
+    def create_game(mode_books: dict, optimized_table: str = "1,7,0\n", conditions: dict = None, **params):
+        games_path = os.path.join(tmp_path, "games")
+        library_path = os.path.join(games_path, "test_game", "library")
+        for folder in ["lookup_tables", "forces", "publish_files", "optimization_files"]:
+            os.makedirs(os.path.join(library_path, folder))
+        for mode, books in mode_books.items():
+            lookup_path = os.path.join(library_path, "lookup_tables")
+            with open(os.path.join(lookup_path, f"lookUpTable_{mode}.csv"), "w", encoding="UTF-8") as f:
+                f.write("".join(f"{idx},1,{payout}\n" for idx, (payout, _) in enumerate(books, 1)))
+            with open(os.path.join(lookup_path, f"lookUpTableSegmented_{mode}.csv"), "w", encoding="UTF-8") as f:
+                f.write(
+                    "".join(f"{idx},{criteria},{payout / 100},0.0\n" for idx, (payout, criteria) in enumerate(books, 1))
+                )
+            with open(os.path.join(library_path, "forces", f"force_record_{mode}.json"), "w", encoding="UTF-8") as f:
+                f.write("[]")
+
+        optimizer_path = os.path.join(tmp_path, "optimizer.py")
+        with open(optimizer_path, "w", encoding="UTF-8") as f:
+            f.write(f"#!{sys.executable}\n" + OPTIMIZER_SCRIPT)
+        os.chmod(optimizer_path, 0o755)
+        with open(os.path.join(tmp_path, "optimized_table.txt"), "w", encoding="UTF-8") as f:
+            f.write(optimized_table)
+        monkeypatch.setattr(run_script, "PATH_TO_GAMES", games_path)
+        monkeypatch.setattr(OptimizationExecution, "build_optimizer", staticmethod(lambda: optimizer_path))
+
+        game_config = SimpleNamespace(
+            game_id="test_game",
+            bet_modes=[SimpleNamespace(get_name=lambda mode=mode: mode, get_cost=lambda: 1.0) for mode in mode_books],
+            opt_params={
+                mode: {"conditions": conditions or CONDITIONS, "parameters": {**MODE_PARAMS, **params}}
+                for mode in mode_books
+            },
+        )
+        return SimpleNamespace(
+            games_path=games_path, library_path=library_path, optimizer_path=optimizer_path, game_config=game_config
+        )
+
+    return create_game
@@ -0,0 +1,89 @@
+"""Test Python lookup table weight fitting against criteria targets."""
+
+import os
+from types import SimpleNamespace
+import numpy as np
+import pytest
+from src.write_data.file_manifest import FileManifest
+from utils.analysis.lookup_table import load_lookup_table
+from optimization_program import fast_fit
+from optimization_program.fast_fit import fit_weights, tilt_weights
+
+CONDITIONS = {
+    "0": {"rtp": 0, "av_win": 0, "hr": "x"},
+    "basegame": {"rtp": 0.6, "hr": 4},
+    "freegame": {"rtp": 0.37, "hr": 500},
+}
+
+
+def test_tilt_weights_mean():
+    """Tilted probabilities keep their order within equal payouts and meet the target mean."""
+    payouts = np.array([0.5, 1.0, 1.0, 3.0, 10.0])
+    weights = np.array([4.0, 1.0, 3.0, 2.0, 1.0])
+    for target in [0.6, 2.4, 9.5]:
+        probs = tilt_weights(payouts, weights, target)
+        assert np.isclose(probs.sum(), 1)
+        assert np.isclose(probs @ payouts, target)
+        assert np.isclose(probs[2] / probs[1], 3)
+    with pytest.raises(ValueError):
+        tilt_weights(payouts, weights, 11.0)
+
+
+def test_fit_weights_targets():
+    """Criteria probabilities follow their hit-rates, with the remaining probability given to zero wins."""
+    payouts = np.array([0, 0, 1.0, 2.0, 5.0, 20.0, 100.0, 300.0])
+    weights = np.array([10, 5, 4, 3, 2, 1, 2, 1], dtype=np.uint64)
+    criteria_index = np.array([0, 0, 1, 1, 1, 1, 2, 2])
+    opt_params = {
+        "conditions": CONDITIONS,
+        "scaling": [{"criteria": "basegame", "scale_factor": 3.0, "win_range": (1, 2), "probability": 0.5}],
+    }
+    probs, summary = fit_weights(payouts, weights, ["0", "basegame", "freegame"], criteria_index, opt_params, 1.0)
+
+    assert np.isclose(probs.sum(), 1)
+    assert np.isclose(probs[:2].sum(), 1 - 1 / 4 - 1 / 500)
+    assert np.isclose(probs[2:6].sum(), 1 / 4)
+    assert np.isclose(probs @ payouts, 0.97)
+    assert np.isclose(summary["freegame"]["rtp"], 0.37)
+    assert np.isclose(probs[1] / probs[0], 0.5)
+    # Scaling doubles the expected weight of 1x and 2x wins, the tilt is then linear in payout on a log scale
+    tilt = np.log(probs[2:6] / (np.array([4, 3, 2, 1]) * [2, 2, 1, 1]))
+    assert np.allclose(np.diff(tilt) / np.diff(payouts[2:6]), (tilt[1] - tilt[0]) / 1.0)
+
+    with pytest.raises(ValueError):
+        fit_weights(payouts, weights, ["0", "basegame", "wincap"], criteria_index, opt_params, 1.0)
+
+
+def test_fit_mode_writes_table(tmp_path, monkeypatch):
+    """The fitted table is published with the same ids and payouts, and recorded in the manifest."""
+    library_path = os.path.join(tmp_path, "test_game", "library")
+    for folder in ["lookup_tables", "publish_files"]:
+        os.makedirs(os.path.join(library_path, folder))
+    rows = [
+        (1, 0, "0"),
+        (2, 0, "0"),
+        (3, 150, "basegame"),
+        (4, 400, "basegame"),
+        (5, 12000, "freegame"),
+        (6, 40000, "freegame"),
+    ]
+    with open(os.path.join(library_path, "lookup_tables", "lookUpTable_base.csv"), "w", encoding="UTF-8") as f:
+        f.write("".join(f"{sim_id},1,{payout}\n" for sim_id, payout, _ in rows))
+    segmented_file = os.path.join(library_path, "lookup_tables", "lookUpTableSegmented_base.csv")
+    with open(segmented_file, "w", encoding="UTF-8") as f:
+        f.write("".join(f"{sim_id},{criteria},{payout / 100},0.0\n" for sim_id, payout, criteria in rows))
+    monkeypatch.setattr(fast_fit, "PATH_TO_GAMES", str(tmp_path))
+
+    bet_mode = SimpleNamespace(get_name=lambda: "base", get_cost=lambda: 1.0)
+    game_config = SimpleNamespace(
+        game_id="test_game", bet_modes=[bet_mode], opt_params={"base": {"conditions": CONDITIONS}}
+    )
+    summary = fast_fit.fit_mode(game_config, "base")
+    assert np.isclose(summary["total"]["rtp"], 0.97)
+
+    lut_file = os.path.join(library_path, "publish_files", "lookUpTable_base_0.csv")
+    table = load_lookup_table(lut_file, use_cache=False)
+    assert table.ids.tolist() == [1, 2, 3, 4, 5, 6]
+    assert table.payouts.tolist() == [payout for _, payout, _ in rows]
+    assert np.isclose(table.weights @ table.payouts / 100 / table.weights.sum(), 0.97)
+    assert FileManifest(library_path).entries[os.path.join("publish_files", "lookUpTable_base_0.csv")]["rows"] == 6
@@ -0,0 +1,84 @@
+"""Test checking optimization conditions against simulated books."""
+
+import numpy as np
+from utils.analysis.lookup_table import LookupTable
+from utils.search_tool.force_index import ForceIndex
+from optimization_program.feasibility import check_feasibility, get_fence_rows
+
+# Books 1-2 win nothing, 3-5 are base game wins and 6-8 trigger the free game
+LOOKUP_TABLE = LookupTable(
+    np.array(
+        [[1, 1, 0], [2, 1, 0], [3, 1, 100], [4, 1, 200], [5, 1, 500], [6, 1, 1000], [7, 1, 4000], [8, 1, 500000]],
+        dtype=np.uint64,
+    )
+)
+FORCE_INDEX = ForceIndex(
+    [
+        {
+            "search": [{"name": "symbol", "value": "scatter"}, {"name": "kind", "value": "3"}],
+            "timesTriggered": 2,
+            "bookIds": [6, 7],
+        },
+        {
+            "search": [{"name": "symbol", "value": "scatter"}, {"name": "kind", "value": "4"}],
+            "timesTriggered": 1,
+            "bookIds": [8],
+        },
+    ]
+)
+CRITERIA_NAMES = ["0", "basegame", "freegame", "wincap"]
+CRITERIA_INDEX = np.array([0, 0, 1, 1, 1, 2, 2, 3])
+
+
+def test_fence_rows():
+    """Exact payouts and force searches take their books in order, a criteria without search takes the rest."""
+    conditions = {
+        "wincap": {"search_range": (5000, 5000), "force_search": {}},
+        "0": {"search_range": (0, 0), "force_search": {}},
+        "freegame": {"search_range": (-1, -1), "force_search": {"symbol": "scatter", "kind": "None"}},
+        "basegame": {"search_range": (-1, -1), "force_search": {}},
+    }
+    fence_rows, warnings = get_fence_rows(conditions, LOOKUP_TABLE, FORCE_INDEX)
+    assert {criteria: np.flatnonzero(rows).tolist() for criteria, rows in fence_rows.items()} == {
+        "wincap": [7],
+        "0": [0, 1],
+        "freegame": [5, 6],
+        "basegame": [2, 3, 4],
+    }
+    assert all(len(criteria_warnings) == 0 for criteria_warnings in warnings.values())
+
+
+def test_feasible_conditions():
+    """Targets within each criteria's payout range are feasible, with the achievable RTP range reported."""
+    conditions = {
+        "0": {"rtp": 0, "av_win": 0, "search_range": (0, 0), "force_search": {}},
+        "freegame": {"rtp": 0.2, "hr": 100, "search_range": (-1, -1), "force_search": {"symbol": "scatter"}},
+        "basegame": {"rtp": 0.6, "hr": 4, "search_range": (-1, -1), "force_search": {}},
+    }
+    report = check_feasibility(conditions, 1.0, LOOKUP_TABLE, FORCE_INDEX, CRITERIA_NAMES, CRITERIA_INDEX, 2)
+    assert report["feasible"]
+    basegame = report["criteria"]["basegame"]
+    assert basegame["books"] == 3 and basegame["av_win"] == 2.4
+    assert np.allclose(basegame["rtp_range"], (0.25, 1.25))
+    # The wincap book is found by the free game search
+    assert report["criteria"]["freegame"]["warnings"] == ["1 books were simulated under other criteria"]
+
+
+def test_infeasible_conditions():
+    """Average wins outside the payout range and hit-rates above one are errors, searches without books warnings."""
+    conditions = {
+        "freegame": {"rtp": 6, "hr": 1000, "search_range": (-1, -1), "force_search": {"symbol": "scatter"}},
+        "bigwin": {"rtp": 0.1, "hr": 1.2, "search_range": (-1, -1), "force_search": {"symbol": "wild"}},
+        "basegame": {"rtp": 0.6, "hr": 2, "search_range": (-1, -1), "force_search": {}},
+        "0": {"rtp": 0, "av_win": 0, "hr": "x", "search_range": (-1, -1), "force_search": {}},
+    }
+    report = check_feasibility(conditions, 1.0, LOOKUP_TABLE, FORCE_INDEX)
+    assert not report["feasible"]
+    assert report["errors"] == ["Criteria ['0'] have no remaining probability, hit-rates sum to more than 1."]
+    assert report["criteria"]["freegame"]["errors"] == ["av_win 6000 is outside the payout range [10, 5000]"]
+    # The optimization program continues with default values for a criteria without books
+    assert report["criteria"]["bigwin"]["errors"] == []
+    assert report["criteria"]["bigwin"]["warnings"] == [
+        "search conditions match no books, the optimization program uses default values"
+    ]
+    assert report["criteria"]["basegame"]["errors"] == []
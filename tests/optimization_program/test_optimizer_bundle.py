@@ -0,0 +1,104 @@
+"""Test the binary lookup table and force record bundle read by the optimization program."""
+
+import os
+import json
+import numpy as np
+import pytest
+from optimization_program.optimizer_bundle import is_bundle_current, read_optimizer_bundle, write_optimizer_bundle
+
+FORCE_RECORD = [
+    {
+        "search": [{"name": "symbol", "value": "scatter"}, {"name": "kind", "value": "3"}],
+        "timesTriggered": 4,
+        "bookIds": [2, 4],
+    },
+    {"search": [], "timesTriggered": 1, "bookIds": []},
+    {"search": [{"name": "gameType", "value": "freegame"}], "timesTriggered": 2, "bookIds": [4, 1, 3]},
+]
+
+
+def setup_library(root):
+    """Simulation lookup tables and force record of a single mode."""
+    library_path = os.path.join(root, "library")
+    for folder in ["lookup_tables", "forces"]:
+        os.makedirs(os.path.join(library_path, folder))
+    rows = [(1, 5, 0, "0"), (2, 1, 1500, "freegame"), (3, 3, 20, "basegame"), (4, 2**40, 4000000, "freegame")]
+    with open(os.path.join(library_path, "lookup_tables", "lookUpTable_base.csv"), "w", encoding="UTF-8") as f:
+        f.write("".join(f"{sim_id},{weight},{payout}\n" for sim_id, weight, payout, _ in rows))
+    with open(
+        os.path.join(library_path, "lookup_tables", "lookUpTableSegmented_base.csv"), "w", encoding="UTF-8"
+    ) as f:
+        f.write("".join(f"{sim_id},{criteria},{payout / 100},0.0\n" for sim_id, _, payout, criteria in rows))
+    with open(os.path.join(library_path, "forces", "force_record_base.json"), "w", encoding="UTF-8") as f:
+        f.write(json.dumps(FORCE_RECORD, indent=4))
+    return library_path
+
+
+def test_bundle_round_trip(tmp_path):
+    """Arrays, criteria and force book ids read back unchanged, with the source file signatures."""
+    library_path = setup_library(tmp_path)
+    bundle = read_optimizer_bundle(write_optimizer_bundle(library_path, "base"))
+
+    assert bundle["ids"].tolist() == [1, 2, 3, 4]
+    assert bundle["weights"].tolist() == [5, 1, 3, 2**40]
+    assert bundle["payouts"].tolist() == [0, 1500, 20, 4000000]
+    assert [bundle["criteria_names"][idx] for idx in bundle["criteria"]] == ["0", "freegame", "basegame", "freegame"]
+    assert bundle["force_record"] == FORCE_RECORD
+    lut_stat = os.stat(os.path.join(library_path, "lookup_tables", "lookUpTable_base.csv"))
+    assert bundle["sources"][0] == (lut_stat.st_size, lut_stat.st_mtime_ns)
+
+
+def test_bundle_without_criteria(tmp_path):
+    """Criteria are optional, the optimization program only reads the table and force record."""
+    library_path = setup_library(tmp_path)
+    os.remove(os.path.join(library_path, "lookup_tables", "lookUpTableSegmented_base.csv"))
+    bundle = read_optimizer_bundle(write_optimizer_bundle(library_path, "base"))
+    assert bundle["criteria_names"] == []
+    assert bundle["criteria"].tolist() == [0, 0, 0, 0]
+    assert bundle["weights"].tolist() == [5, 1, 3, 2**40]
+    assert bundle["force_record"] == FORCE_RECORD
+
+
+def test_bundle_rewritten_when_sources_change(tmp_path):
+    """An up to date bundle is kept, and rewritten once a source file changes."""
+    library_path = setup_library(tmp_path)
+    bundle_path = write_optimizer_bundle(library_path, "base")
+    assert is_bundle_current(library_path, "base")
+    os.utime(bundle_path, ns=(0, 0))
+    write_optimizer_bundle(library_path, "base")
+    assert os.stat(bundle_path).st_mtime_ns == 0
+
+    force_record = os.path.join(library_path, "forces", "force_record_base.json")
+    with open(force_record, "w", encoding="UTF-8") as f:
+        f.write(json.dumps(FORCE_RECORD[:1]))
+    assert not is_bundle_current(library_path, "base")
+    assert read_optimizer_bundle(write_optimizer_bundle(library_path, "base"))["force_record"] == FORCE_RECORD[:1]
+    assert os.stat(bundle_path).st_mtime_ns != 0
+
+
+def test_bundle_seed_weights(tmp_path):
+    """Seed weights are written after the lookup table columns, and a seeded bundle is never reused."""
+    library_path = setup_library(tmp_path)
+    bundle = read_optimizer_bundle(write_optimizer_bundle(library_path, "base"))
+    assert bundle["seed_weights"] is None
+
+    bundle = read_optimizer_bundle(write_optimizer_bundle(library_path, "base", seed_weights=[7, 0, 2**50, 1]))
+    assert bundle["seed_weights"].tolist() == [7, 0, 2**50, 1]
+    assert bundle["ids"].tolist() == [1, 2, 3, 4]
+    assert bundle["force_record"] == FORCE_RECORD
+    assert not is_bundle_current(library_path, "base")
+    assert read_optimizer_bundle(write_optimizer_bundle(library_path, "base"))["seed_weights"] is None
+    with pytest.raises(ValueError):
+        write_optimizer_bundle(library_path, "base", seed_weights=[1, 2])
+
+
+def test_bundle_rejects_large_ids(tmp_path):
+    """Ids beyond the optimizer's 32 bit range are not written."""
+    library_path = setup_library(tmp_path)
+    with open(os.path.join(library_path, "lookup_tables", "lookUpTable_base.csv"), "a", encoding="UTF-8") as f:
+        f.write(f"{2**32},1,0\n")
+    with open(os.path.join(library_path, "lookup_tables", "lookUpTableSegmented_base.csv"), "a", encoding="UTF-8") as f:
+        f.write(f"{2**32},0,0.0,0.0\n")
+    with pytest.raises(ValueError):
+        write_optimizer_bundle(library_path, "base")
+    assert not os.path.exists(os.path.join(library_path, "optimization_files", "optimizer_input_base.bin"))
@@ -0,0 +1,115 @@
+"""Test concurrent multi-mode optimization driver."""
+
+import os
+import pytest
+from src.write_data.file_manifest import FileManifest
+from optimization_program.optimizer_bundle import get_bundle_path, read_optimizer_bundle
+from optimization_program.run_script import OptimizationExecution
+
+
+def test_thread_allocation():
+    """Threads are split in proportion to lookup table rows, with at least one thread per mode."""
+    assert OptimizationExecution.get_thread_allocation({"base": 3000, "bonus": 1000}, 8) == {"base": 6, "bonus": 2}
+    assert OptimizationExecution.get_thread_allocation({"a": 500, "b": 300, "c": 200, "d": 1}, 10) == {
+        "a": 4,
+        "b": 3,
+        "c": 2,
+        "d": 1,
+    }
+    assert OptimizationExecution.get_thread_allocation({"base": 10, "bonus": 10, "super": 10}, 2) == {
+        "base": 1,
+        "bonus": 1,
+        "super": 1,
+    }
+
+
+# Two modes of zero-win simulations, each with a single criteria
+MODE_BOOKS = {"base": [(0, "0")] * 3, "bonus": [(0, "0")]}
+
+
+def test_run_all_modes(optimizer_game, capsys):
+    """Each mode runs the optimizer with its own setup file and a share of the thread budget."""
+    game = optimizer_game(MODE_BOOKS)
+    games_path, game_config = game.games_path, game.game_config
+    assert OptimizationExecution.run_all_modes(game_config, ["bonus", "base"], 4) == {"bonus": 0, "base": 0}
+
+    output = capsys.readouterr().out
+    assert "[base] threads_for_fence_construction;3" in output
+    assert "[bonus] threads_for_fence_construction;1" in output
+    assert "[bonus] bet_type;bonus" in output
+    for mode in ["base", "bonus"]:
+        assert os.path.isfile(OptimizationExecution.get_setup_path("test_game", mode))
+        assert os.path.isfile(get_bundle_path(os.path.join(games_path, "test_game", "library"), mode))
+
+
+def test_unchanged_modes_restored(optimizer_game, capsys):
+    """Only modes with changed inputs are optimized again, other modes have their outputs restored."""
+    game = optimizer_game(MODE_BOOKS)
+    library_path, game_config = game.library_path, game.game_config
+    OptimizationExecution.run_all_modes(game_config, ["base", "bonus"], 2)
+    base_table = os.path.join(library_path, "publish_files", "lookUpTable_base_0.csv")
+    with open(base_table, "w", encoding="UTF-8") as f:
+        f.write("1,1,0\n")
+    capsys.readouterr()
+
+    game_config.opt_params["bonus"]["parameters"]["pmb_rtp"] = 0.5
+    assert OptimizationExecution.run_all_modes(game_config, ["base", "bonus"], 2) == {"base": 0, "bonus": 0}
+    output = capsys.readouterr().out
+    assert "[base] Inputs unchanged" in output
+    assert "[bonus] bet_type;bonus" in output and "[base] bet_type;base" not in output
+    with open(base_table, "r", encoding="UTF-8") as f:
+        assert f.read() == "1,7,0\n"
+    assert FileManifest(library_path).entries[os.path.join("publish_files", "lookUpTable_base_0.csv")]["rows"] == 1
+
+    with open(os.path.join(library_path, "forces", "force_record_base.json"), "w", encoding="UTF-8") as f:
+        f.write('[{"search": [], "timesTriggered": 1, "bookIds": [1]}]')
+    OptimizationExecution.run_all_modes(game_config, ["base", "bonus"], 2)
+    output = capsys.readouterr().out
+    assert "[base] bet_type;base" in output and "[bonus] Inputs unchanged" in output
+
+
+def test_warm_start_seed(optimizer_game, capsys):
+    """Seed weights are passed to the optimizer in the input bundle, and its report on the seed is printed."""
+    game = optimizer_game(MODE_BOOKS)
+    library_path, game_config = game.library_path, game.game_config
+    OptimizationExecution.run_all_modes(game_config, ["base", "bonus"], 2)
+    capsys.readouterr()
+
+    returncodes = OptimizationExecution.run_all_modes(
+        game_config, ["base", "bonus"], 2, use_cache=False, warm_start=True
+    )
+    assert returncodes == {"base": 0, "bonus": 0}
+    output = capsys.readouterr().out
+    # The placeholder optimizer output only keeps the first of the three base simulations
+    assert "[base] Warm start not used: too few unchanged simulations." in output
+    assert "[bonus] Warm start seed fitted from the previous optimized table." in output
+    assert "[base] bet_type;base" in output and "[bonus] bet_type;bonus" in output
+    assert (
+        "[bonus] Warm start distribution score 0.500000, ranked 1 of 2 show pigs kept; the random search did not "
+        "match it in 5 show pigs per thread (at least 5 saved)." in output
+    )
+    assert "[base] Warm start distribution" not in output
+    assert read_optimizer_bundle(get_bundle_path(library_path, "bonus"))["seed_weights"].tolist() == [2**50]
+    assert read_optimizer_bundle(get_bundle_path(library_path, "base"))["seed_weights"] is None
+
+    OptimizationExecution.run_all_modes(game_config, ["bonus"], 2, use_cache=False)
+    assert "Warm start" not in capsys.readouterr().out
+    assert read_optimizer_bundle(get_bundle_path(library_path, "bonus"))["seed_weights"] is None
+
+
+def test_infeasible_conditions(optimizer_game, capsys):
+    """Conditions which can not be met are reported, and only stop optimization with `raise_infeasible`."""
+    game = optimizer_game(MODE_BOOKS)
+    library_path, game_config = game.library_path, game.game_config
+    game_config.opt_params["bonus"]["conditions"] = {"0": {"rtp": 0.5, "hr": 2}}
+    with pytest.raises(ValueError, match="bonus"):
+        OptimizationExecution.run_all_modes(game_config, ["base", "bonus"], 2, raise_infeasible=True)
+    output = capsys.readouterr().out
+    assert "[bonus]   ERROR: av_win 1 is outside the payout range [0, 0]" in output
+    assert "bet_type" not in output
+    assert not os.path.exists(os.path.join(library_path, "publish_files", "lookUpTable_base_0.csv"))
+
+    with pytest.warns(UserWarning, match="bonus"):
+        returncodes = OptimizationExecution.run_all_modes(game_config, ["base", "bonus"], 2)
+    assert returncodes == {"base": 0, "bonus": 0}
+    assert "[bonus] bet_type;bonus" in capsys.readouterr().out
@@ -0,0 +1,76 @@
+"""Test optimizing a mode with a grid of candidate parameters."""
+
+import os
+import csv
+import pytest
+from optimization_program.sweep import SWEEP_DIR, COMPARISON_FILENAME, expand_grid, run_sweep, sort_comparison
+
+CONDITIONS = {
+    "0": {"rtp": 0, "av_win": 0, "search_range": (0, 0)},
+    "basegame": {"rtp": 1.5, "hr": 2},
+}
+MODE_BOOKS = {"base": [(0, "0"), (200, "basegame"), (500, "basegame")]}
+# Weights the winning row by min_mean_to_median, so each candidate publishes a different table
+OPTIMIZED_TABLE = "1,10,0\n2,{min_mean_to_median},200\n3,1,500\n"
+
+
+def test_expand_grid():
+    """Every combination of values is a candidate."""
+    assert expand_grid({"a": [1, 2], "b": [3]}) == [{"a": 1, "b": 3}, {"a": 2, "b": 3}]
+
+
+def test_run_sweep(optimizer_game, capsys):
+    """Candidates run with their own parameters and outputs, and are compared in a single table."""
+    game = optimizer_game(MODE_BOOKS, OPTIMIZED_TABLE, CONDITIONS, simulation_trials=200)
+    library_path = game.library_path
+
+    rows = run_sweep(game.game_config, {"base": {"min_mean_to_median": [1, 9], "pmb_rtp": [0.5]}}, 4)
+    assert sorted(row["min_mean_to_median"] for row in rows) == [1, 9]
+    assert all(row["returncode"] == 0 for row in rows)
+    assert rows[0]["score"] >= rows[1]["score"]
+    assert "[base_000] threads_for_fence_construction;2" in capsys.readouterr().out
+
+    by_candidate = {row["candidate"]: row for row in rows}
+    assert by_candidate["base_000"]["rtp"] == pytest.approx((1 * 2 + 5) / 12)
+    assert by_candidate["base_001"]["rtp"] == pytest.approx((9 * 2 + 5) / 20)
+    assert by_candidate["base_001"]["basegame_hr"] == pytest.approx(2.0)
+    assert by_candidate["base_001"]["basegame_m2m"] == pytest.approx((23 / 10) / 2)
+    # Only non-zero wins below the bet count, as in the score
+    assert by_candidate["base_001"]["prob_less_bet"] == 0.0
+
+    sweep_path = os.path.join(library_path, SWEEP_DIR, "sweep")
+    with open(os.path.join(sweep_path, COMPARISON_FILENAME), "r", encoding="UTF-8") as f:
+        assert [row["candidate"] for row in csv.DictReader(f)] == [row["candidate"] for row in rows]
+    # Outputs of the game itself are untouched
+    assert not os.path.exists(os.path.join(library_path, "publish_files", "lookUpTable_base_0.csv"))
+
+
+def test_sort_comparison():
+    """A score of zero is still ranked above failed runs."""
+    rows = [
+        {"candidate": "bonus_000", "mode": "bonus", "score": 0.5},
+        {"candidate": "base_000", "mode": "base", "returncode": 1},
+        {"candidate": "base_001", "mode": "base", "score": 0.0},
+        {"candidate": "base_002", "mode": "base", "score": 0.25},
+    ]
+    ordered = [row["candidate"] for row in sort_comparison(rows, ["base", "bonus"])]
+    assert ordered == ["base_002", "base_001", "base_000", "bonus_000"]
+
+
+def test_sweep_feasibility_check(optimizer_game, recwarn):
+    """Infeasible conditions are a warning, and the check can be skipped."""
+    game = optimizer_game(MODE_BOOKS, OPTIMIZED_TABLE, {"0": {"rtp": 10, "hr": 2}})
+    grid = {"base": {"min_mean_to_median": [1]}}
+    assert run_sweep(game.game_config, grid, 2, check_feasibility=False)[0]["returncode"] == 0
+    assert len([w for w in recwarn if issubclass(w.category, UserWarning)]) == 0
+    with pytest.warns(UserWarning, match="base"):
+        run_sweep(game.game_config, grid, 2)
+    with pytest.raises(ValueError, match="base"):
+        run_sweep(game.game_config, grid, 2, raise_infeasible=True)
+
+
+def test_unknown_parameter(optimizer_game):
+    """Grids may only vary existing optimization parameters."""
+    game = optimizer_game(MODE_BOOKS, OPTIMIZED_TABLE, CONDITIONS)
+    with pytest.raises(ValueError):
+        run_sweep(game.game_config, {"base": {"min_mean_to_mediam": [1]}}, 2)
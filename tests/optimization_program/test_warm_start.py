@@ -0,0 +1,117 @@
+"""Test warm starting a mode from its previous optimized table."""
+
+import os
+from types import SimpleNamespace
+import numpy as np
+from src.write_data.file_manifest import FileManifest
+from utils.analysis.lookup_table import LookupTable, write_lookup_table
+from optimization_program.warm_start import format_warm_start_report, get_seed_weights, warm_start_mode
+
+PARAMS = {
+    "num_show_pigs": 50,
+    "num_pigs_per_fence": 100,
+    "test_spins": [10, 50],
+    "test_spins_weights": [0.5, 0.5],
+    "simulation_trials": 2000,
+    "pmb_rtp": 1.0,
+    "min_mean_to_median": 1,
+    "max_mean_to_median": 8,
+}
+CONDITIONS = {"0": {"rtp": 0, "av_win": 0, "hr": "x"}, "basegame": {"rtp": 0.96, "hr": 3}}
+
+
+def test_seed_weights_matching():
+    """Rows take the previous weight of their book id, then of their payout, then of their payout bucket."""
+    previous = LookupTable(np.array([[1, 10, 0], [2, 20, 100], [3, 30, 100], [4, 40, 5000]], dtype=np.uint64))
+    current = LookupTable(
+        np.array([[1, 1, 0], [2, 1, 100], [3, 1, 120], [5, 1, 100], [6, 1, 5100], [7, 1, 10**7]], dtype=np.uint64)
+    )
+    seed, counts = get_seed_weights(current, previous)
+    assert seed.tolist() == [10, 20, 25, 25, 40, 25]
+    assert counts == {"by_id": 2, "by_payout": 1, "by_bucket": 2, "unmatched": 1}
+
+
+def setup_mode(root, previous_payouts):
+    """Simulated tables of a single mode, and a previous optimized table with the given payouts."""
+    library_path = os.path.join(root, "library")
+    for folder in ["lookup_tables", "publish_files"]:
+        os.makedirs(os.path.join(library_path, folder))
+    payouts = [0] * 6 + [50, 100, 150, 200, 400, 800]
+    write_lookup_table(
+        os.path.join(library_path, "lookup_tables", "lookUpTable_base.csv"),
+        np.array([[idx + 1, 1, payout] for idx, payout in enumerate(payouts)], dtype=np.uint64),
+    )
+    with open(
+        os.path.join(library_path, "lookup_tables", "lookUpTableSegmented_base.csv"), "w", encoding="UTF-8"
+    ) as f:
+        f.write("".join(f"{idx + 1},{'basegame' if p > 0 else '0'},{p / 100},0.0\n" for idx, p in enumerate(payouts)))
+    previous_weights = [1000] * 6 + [300, 250, 200, 150, 100, 20]
+    previous_rows = [[idx + 1, w, p] for idx, (w, p) in enumerate(zip(previous_weights, previous_payouts))]
+    write_lookup_table(
+        os.path.join(library_path, "publish_files", "lookUpTable_base_0.csv"), np.array(previous_rows, dtype=np.uint64)
+    )
+    bet_mode = SimpleNamespace(get_name=lambda: "base", get_cost=lambda: 1.0)
+    game_config = SimpleNamespace(
+        bet_modes=[bet_mode], opt_params={"base": {"conditions": CONDITIONS, "parameters": PARAMS}}
+    )
+    return library_path, game_config, payouts
+
+
+def test_warm_start_seed(tmp_path):
+    """A previous table with the same simulations is refitted to the targets as seed weights of each row."""
+    library_path, game_config, payouts = setup_mode(tmp_path, [0] * 6 + [50, 100, 150, 200, 400, 800])
+    published = os.path.join(library_path, "publish_files", "lookUpTable_base_0.csv")
+    with open(published, "r", encoding="UTF-8") as f:
+        previous = f.read()
+    report = warm_start_mode(game_config, "base", FileManifest(library_path))
+    assert report["seeded"]
+    assert report["matched"]["by_id"] == len(payouts)
+    with open(published, "r", encoding="UTF-8") as f:
+        assert f.read() == previous
+
+    seed_weights = report["seed_weights"]
+    assert seed_weights.dtype == np.uint64 and len(seed_weights) == len(payouts)
+    probs = seed_weights / seed_weights.sum()
+    assert np.isclose(probs @ np.array(payouts) / 100, 0.96)
+    assert np.isclose(probs[6:].sum(), 1 / 3)
+    # Within the zero-win criteria the previous (equal) weights are kept
+    assert len(np.unique(seed_weights[:6])) == 1
+
+
+def test_warm_start_scaling_and_mean_to_median(tmp_path):
+    """Scaling rules are applied to the carried over weights, and the mean to median bounds are enforced."""
+    library_path, game_config, _ = setup_mode(tmp_path, [0] * 6 + [50, 100, 150, 200, 400, 800])
+    unscaled = warm_start_mode(game_config, "base", FileManifest(library_path))["seed_weights"]
+    game_config.opt_params["base"]["scaling"] = [
+        {"criteria": "basegame", "scale_factor": 5.0, "win_range": (1.5, 2), "probability": 1.0}
+    ]
+    scaled = warm_start_mode(game_config, "base", FileManifest(library_path))["seed_weights"]
+    assert scaled[8:10].sum() > unscaled[8:10].sum()
+
+    game_config.opt_params["base"]["parameters"] = {**PARAMS, "max_mean_to_median": 1.1}
+    report = warm_start_mode(game_config, "base", FileManifest(library_path))
+    assert not report["seeded"]
+    assert report["reason"].startswith("mean to median ratio out of bounds for criteria basegame")
+
+
+def test_warm_start_rejected_for_changed_simulations(tmp_path):
+    """Previous tables whose book ids no longer give the same payouts are not used."""
+    library_path, game_config, _ = setup_mode(tmp_path, [10] * 6 + [51, 101, 151, 201, 401, 801])
+    report = warm_start_mode(game_config, "base", FileManifest(library_path))
+    assert not report["seeded"]
+    assert report["reason"] == "too few unchanged simulations"
+
+
+def test_warm_start_report():
+    """The optimizer's report gives the show pigs per thread the random search needed to match the seed."""
+    report = {"score": 0.25, "rank": 3, "show_pigs": 40, "pigs_per_thread": 100, "threads": 4, "matched_after": 12}
+    assert format_warm_start_report(report) == (
+        "Warm start distribution score 0.250000, ranked 3 of 40 show pigs kept; the random search first matched it "
+        "after 12 of 100 show pigs per thread (11 saved)."
+    )
+    assert format_warm_start_report({**report, "rank": 1, "matched_after": None}).endswith(
+        "did not match it in 100 show pigs per thread (at least 100 saved)."
+    )
+    assert format_warm_start_report({**report, "score": None, "rank": None}) == (
+        "Warm start distribution failed the optimizer's simulation criteria."
+    )
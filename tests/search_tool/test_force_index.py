@@ -0,0 +1,44 @@
+"""Test force-record inverted index queries."""
+
+from utils.search_tool.force_index import ForceIndex
+
+FORCE_RECORD = [
+    {
+        "search": [{"name": "kind", "value": "3"}, {"name": "symbol", "value": "H1"}],
+        "timesTriggered": 3,
+        "bookIds": [7, 2, 5],
+    },
+    {
+        "search": [{"name": "kind", "value": "4"}, {"name": "symbol", "value": "H1"}],
+        "timesTriggered": 2,
+        "bookIds": [5, 9],
+    },
+    {
+        "search": [{"name": "gametype", "value": "freegame"}, {"name": "symbol", "value": "scatter"}],
+        "timesTriggered": 2,
+        "bookIds": [2, 9],
+    },
+]
+
+
+def scan_entries(search_keys):
+    """Reference scan over every entry."""
+    matches = []
+    for idx, entry in enumerate(FORCE_RECORD):
+        search = {item["name"]: item["value"] for item in entry["search"]}
+        if all(search.get(k) == v for k, v in search_keys.items()):
+            matches.append(idx)
+    return matches
+
+
+def test_partial_key_matches():
+    """Index queries should match a full scan of the force record."""
+    force_index = ForceIndex(FORCE_RECORD)
+    for search_keys in [{"symbol": "H1"}, {"kind": "3", "symbol": "H1"}, {"kind": "5"}, {}]:
+        assert force_index.find_entries(search_keys) == scan_entries(search_keys)
+    assert force_index.find_entries({"kind": 3, "symbol": "H1"}) == scan_entries({"kind": "3", "symbol": "H1"})
+
+    assert force_index.get_entry_book_ids({"symbol": "H1"}).tolist() == [2, 5, 7, 5, 9]
+    assert force_index.get_book_ids({"symbol": "H1"}).tolist() == [2, 5, 7, 9]
+    assert force_index.get_times_triggered({"symbol": "H1"}) == 5
+    assert force_index.get_intersecting_book_ids([{"symbol": "H1"}, {"gametype": "freegame"}]).tolist() == [2, 9]
@@ -0,0 +1,30 @@
+"""Test content-keyed analysis cache."""
+
+import os
+from src.write_data.file_manifest import FileManifest
+from utils.game_analytics.analysis_cache import get_mode_cache_key, load_cached_results, save_cached_results
+
+
+def test_cache_invalidated_by_content_and_params(tmp_path):
+    """Results are reused only for identical input files and parameters."""
+    library_path = str(tmp_path)
+    lut_file = os.path.join(library_path, "lookUpTable_base.csv")
+    with open(lut_file, "w", encoding="UTF-8") as f:
+        f.write("1,1,0\n2,1,100\n")
+
+    manifest = FileManifest(library_path)
+    params = {"win_ranges": [(0, 1), (1, 10)]}
+    cache_key = get_mode_cache_key(manifest, [lut_file], params)
+    assert load_cached_results(library_path, "base", cache_key) is None
+
+    results = {"mode_hit_counts": {(0, 1): 1, (1, 10): 1}}
+    save_cached_results(library_path, "base", cache_key, results)
+    assert load_cached_results(library_path, "base", get_mode_cache_key(manifest, [lut_file], params)) == results
+    assert get_mode_cache_key(manifest, [lut_file], {"win_ranges": [(0, 2)]}) != cache_key
+
+    with open(lut_file, "w", encoding="UTF-8") as f:
+        f.write("1,1,0\n2,1,200\n")
+    os.utime(lut_file, ns=(0, 0))
+    new_key = get_mode_cache_key(FileManifest(library_path), [lut_file], params)
+    assert new_key != cache_key
+    assert load_cached_results(library_path, "base", new_key) is None
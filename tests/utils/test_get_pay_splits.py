@@ -0,0 +1,59 @@
+"""Test win-range bucketing and game-type split distributions."""
+
+import os
+import pytest
+import numpy as np
+from utils.game_analytics.get_pay_splits import (
+    get_win_range_totals,
+    get_unoptimized_hits,
+    make_split_win_distribution,
+    return_hit_rates,
+)
+
+
+def test_win_range_totals():
+    """Ordered ranges use first containing range, overlapping ranges can count wins more than once."""
+    wins = np.array([0.0, 0.5, 1.0, 2.0, 10.0, 50.0])
+    weights = np.array([1, 2, 3, 4, 5, 6])
+    assert get_win_range_totals(wins, weights, [(0, 1), (1, 5), (5, 20)]).tolist() == [3, 7, 5]
+    assert get_win_range_totals(wins, weights, [(0, 2), (1, 20)]).tolist() == [6, 9]
+    assert get_win_range_totals(wins, weights, [(0, 2), (1, 20)], first_match=False).tolist() == [6, 12]
+
+
+def test_split_distributions(tmp_path):
+    """Base, free game and cumulative distributions are separated using the criteria of each row."""
+    with open(os.path.join(tmp_path, "lookUpTable_base.csv"), "w", encoding="UTF-8") as f:
+        f.write("1,10,0\n2,5,150\n3,2,500\n4,1,1000\n")
+    with open(os.path.join(tmp_path, "lookUpTableSegmented_base.csv"), "w", encoding="UTF-8") as f:
+        f.write("1,0,0.0,0.0\n2,basegame,1.5,0.0\n3,freegame,1.0,4.0\n4,wincap,0.0,10.0\n")
+
+    win_ranges = [(0, 1), (1, 5), (5, 20)]
+    hit_rates, range_hits = get_unoptimized_hits(str(tmp_path), ["base"], win_ranges)
+    assert range_hits["base"] == {(0, 1): 1, (1, 5): 1, (5, 20): 2}
+    assert hit_rates["base"][(5, 20)] == 2.0
+
+    all_modes = ["basegame", "freegame"]
+    distributions, total_weight = make_split_win_distribution(
+        os.path.join(tmp_path, "lookUpTable_base.csv"),
+        os.path.join(tmp_path, "lookUpTableSegmented_base.csv"),
+        all_modes,
+    )
+    assert total_weight == 18
+    assert distributions["basegame"] == {0.0: 11.0, 1.0: 2.0, 1.5: 5.0}
+    assert distributions["freegame"] == {0.0: 15.0, 4.0: 2.0, 10.0: 1.0}
+    assert distributions["cumulative"] == {0.0: 10.0, 1.5: 5.0, 5.0: 2.0, 10.0: 1.0}
+
+    hits, probs, rtps = return_hit_rates(distributions, total_weight, [(0, 1), (1, 5), (20, 50)], 1)
+    assert hits["freegame"][(1, 5)] == 9.0
+    assert hits["cumulative"][(20, 50)] == "NaN"
+    assert rtps["cumulative"][(1, 5)] == pytest.approx(1.5 * 5 / 18)
+    assert sum(probs["basegame"].values()) == pytest.approx(1.0)
+
+    with open(os.path.join(tmp_path, "lookUpTableSegmented_base.csv"), "w", encoding="UTF-8") as f:
+        f.write("1,0,0.0,1.0\n2,basegame,1.5,0.0\n3,freegame,1.0,4.0\n4,wincap,0.0,10.0\n")
+    with pytest.raises(ValueError):
+        make_split_win_distribution(
+            os.path.join(tmp_path, "lookUpTable_base.csv"),
+            os.path.join(tmp_path, "lookUpTableSegmented_base.csv"),
+            ["basegame"],
+        )
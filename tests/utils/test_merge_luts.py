@@ -0,0 +1,108 @@
+"""Test array based bonus to base lookup table merge."""
+
+import os
+import json
+import numpy as np
+from src.write_data.sim_results import SIM_RESULT_COLUMNS, CRITERIA_FILENAME
+from utils.analysis.lookup_table import load_lookup_table
+from utils.merge_luts.lookup_properties import (
+    FreegameMerge,
+    LookupProperties,
+    calculate_new_freegame_probabilities,
+    override_optimized_lookup,
+)
+
+
+def write_mode(library_path, mode, rows):
+    """Write optimized and segmented lookup tables from (weight, payout, criteria) rows."""
+    with open(os.path.join(library_path, "publish_files", f"lookUpTable_{mode}_0.csv"), "w", encoding="UTF-8") as f:
+        f.write("".join(f"{idx + 1},{weight},{payout}\n" for idx, (weight, payout, _) in enumerate(rows)))
+    with open(
+        os.path.join(library_path, "lookup_tables", f"lookUpTableSegmented_{mode}.csv"), "w", encoding="UTF-8"
+    ) as f:
+        f.write("".join(f"{idx + 1},{criteria},0.0,{payout / 100}\n" for idx, (_, payout, criteria) in enumerate(rows)))
+
+
+def test_merge_freegame_weights(tmp_path, monkeypatch):
+    """Freegame rows in the base table take the bonus table probabilities scaled by the target hit-rate."""
+    library_path = os.path.join(tmp_path, "games", "test_game", "library")
+    for folder in ["publish_files", "lookup_tables"]:
+        os.makedirs(os.path.join(library_path, folder))
+    write_mode(
+        library_path, "base", [(100, 0, "0"), (50, 200, "freegame"), (40, 150, "basegame"), (10, 500, "freegame")]
+    )
+    write_mode(library_path, "bonus", [(3, 200, "freegame"), (1, 500, "freegame"), (1, 100000, "wincap")])
+    monkeypatch.chdir(tmp_path)
+
+    base_table = LookupProperties("test_game", "base")
+    bonus_table = LookupProperties("test_game", "bonus")
+    assert base_table.get_criteria_mask("freegame").tolist() == [False, True, False, True]
+    assert base_table.calculate_criteria_av_win("freegame") == (2 * 50 + 5 * 10) / 200
+
+    new_weights, fg_rtp, fg_hr, fg_weights = calculate_new_freegame_probabilities(
+        base_table, bonus_table, 0.5, "freegame"
+    )
+    assert new_weights.tolist() == [100, 60, 40, 20]
+    assert fg_weights.tolist() == [60, 20]
+    assert fg_hr == 0.4
+    assert np.isclose(fg_rtp, 2 * 0.3 + 5 * 0.1)
+
+    base_name = os.path.join(library_path, "publish_files", "lookUpTable_base_0.csv")
+    override_optimized_lookup(base_name, base_table.ids, base_table.payouts_ints, new_weights)
+    assert load_lookup_table(base_name, use_cache=False).table.tolist() == [
+        [1, 100, 0],
+        [2, 60, 200],
+        [3, 40, 150],
+        [4, 20, 500],
+    ]
+
+
+def test_criteria_from_sim_results(tmp_path, monkeypatch):
+    """Stored simulation results give row criteria without reading the segmented table."""
+    library_path = os.path.join(tmp_path, "games", "test_game", "library")
+    sim_results_path = os.path.join(library_path, "sim_results", "base")
+    for folder in ["publish_files", "lookup_tables", sim_results_path]:
+        os.makedirs(os.path.join(library_path, folder))
+    write_mode(library_path, "base", [(1, 0, "0"), (1, 200, "freegame"), (1, 150, "basegame")])
+    os.remove(os.path.join(library_path, "lookup_tables", "lookUpTableSegmented_base.csv"))
+
+    columns = {col: np.zeros(3, dtype=dtype) for col, dtype in SIM_RESULT_COLUMNS.items()}
+    columns["id"] = np.array([3, 1, 2], dtype=np.uint64)
+    columns["criteria"] = np.array([2, 0, 1], dtype=np.uint16)
+    for col, values in columns.items():
+        np.save(os.path.join(sim_results_path, f"{col}.npy"), values)
+    with open(os.path.join(sim_results_path, CRITERIA_FILENAME), "w", encoding="UTF-8") as f:
+        f.write(json.dumps(["0", "freegame", "basegame"]))
+    monkeypatch.chdir(tmp_path)
+
+    base_table = LookupProperties("test_game", "base")
+    assert base_table.get_criteria_mask("freegame").tolist() == [False, True, False]
+    assert base_table.get_criteria_mask("basegame").tolist() == [False, False, True]
+    assert not base_table.get_criteria_mask("wincap").any()
+
+
+def test_merge_curve(tmp_path, monkeypatch):
+    """Several target hit-rates are evaluated at once, matching single merges of the base table."""
+    library_path = os.path.join(tmp_path, "games", "test_game", "library")
+    for folder in ["publish_files", "lookup_tables"]:
+        os.makedirs(os.path.join(library_path, folder))
+    write_mode(
+        library_path, "base", [(100, 0, "0"), (50, 200, "freegame"), (40, 150, "basegame"), (10, 500, "freegame")]
+    )
+    write_mode(library_path, "bonus", [(3, 200, "freegame"), (1, 500, "freegame"), (1, 100000, "wincap")])
+    monkeypatch.chdir(tmp_path)
+
+    base_table = LookupProperties("test_game", "base")
+    merge = FreegameMerge(base_table, LookupProperties("test_game", "bonus"), "freegame")
+    target_hrs = [0.25, 0.5, 1.0]
+    curve = merge.get_curve(target_hrs)
+    for idx, target_hr in enumerate(target_hrs):
+        new_weights = merge.get_new_weights(target_hr).astype(np.float64)
+        assert np.isclose(curve["rtp"][idx], base_table.payouts @ new_weights / new_weights.sum())
+        assert np.isclose(curve["fg_hr"][idx], new_weights[[1, 3]].sum() / new_weights.sum())
+    assert curve["fg_hr"].tolist() == sorted(curve["fg_hr"].tolist())
+
+    # Rounding the small test weights to integers moves the RTP slightly
+    target_hr = merge.get_target_hr_for_rtp(1.0)
+    assert np.isclose(target_hr, 2 / 7)
+    assert np.isclose(merge.get_curve([target_hr])["rtp"][0], 1.0, atol=0.02)
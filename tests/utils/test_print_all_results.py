@@ -0,0 +1,51 @@
+"""Test incremental JSON and row-ordered worksheet output."""
+
+import os
+import json
+from types import SimpleNamespace
+from utils.game_analytics.print_all_results import JSON_SUMMARIES, PrintJSON, iter_mode_cells
+
+
+def test_json_matches_single_dump(tmp_path):
+    """Writing each mode's section in turn gives the same file as dumping all information at once."""
+    game_info = SimpleNamespace(libraryPath=str(tmp_path))
+    for summary in JSON_SUMMARIES:
+        setattr(game_info, summary, {})
+    game_info.cost_mapping = {"base": 1.0, "bonus": 100.0}
+    game_info.mode_fence_info = {"base": {"freegame": {"hr": 200.0, "rtp": 0.3}}, "bonus": {}}
+    game_info.hr_summary = {"base": {"{'symbol': 'H1', 'kind': 3}": 12.5, "{'symbol': 'H1', 'kind': 4}": 40.0}}
+    game_info.custom_hr_summary = {"base": {"{'symbol': 'scatter'}": [1, 2]}}
+
+    PrintJSON(game_info)
+    with open(os.path.join(tmp_path, "statistics_summary.json"), "r", encoding="UTF-8") as f:
+        content = f.read()
+    assert content == json.dumps({summary: getattr(game_info, summary) for summary in JSON_SUMMARIES}, indent=4)
+
+
+def test_mode_cells_streamed_in_row_order():
+    """Side by side tables are merged row by row, with overlapping cells taken from the last table written."""
+    win_ranges = [(0, 1), (1, 5)]
+    mode_info = {
+        "mode_hit_rate_info": {
+            "all_gameType_hits": {"cumulative": {(0, 1): 0.5, (1, 5): 0.2}, "basegame": {(0, 1): 3, (1, 5): 4}},
+            "all_gameType_rtp": {"basegame": {}, "cumulative": {(0, 1): 0.1, (1, 5): 0.3}},
+        },
+        "mode_hit_counts": {f"({idx}, {idx + 1})": 10 + idx for idx in range(10)},
+        "hr_summary": {"{'symbol': 'H1', 'kind': 3}": 12.5},
+        "sim_count_summary": {"{'symbol': 'H1', 'kind': 3}": 5},
+        "av_win_summary": {"{'symbol': 'H1', 'kind': 3}": 1.25},
+        "custom_hr_summary": {"scatter": 100.0},
+        "custom_sim_count_summary": {"scatter": 2},
+        "custom_av_win_summary": {"scatter": 4.0},
+    }
+    cells = list(iter_mode_cells(mode_info, win_ranges))
+    positions = [(row, col) for row, col, _ in cells]
+    assert positions == sorted(set(positions))
+
+    values = {(row, col): value for row, col, value in cells}
+    assert [values[(1, col)] for col in range(3)] == ["(0, 1)", 0.5, 0.1]
+    assert values[(2, 6)] == "4"
+    assert [values[(6, 0)], values[(7, 1)], values[(8, 0)], values[(8, 1)]] == ["HIT RATES", 3, "H1", 12.5]
+    # The longer range hit count table is written over the average win table
+    assert [values[(8, 8)], values[(8, 9)], values[(8, 10)]] == ["H1", "(7, 8)", 17]
+    assert [values[(13, 0)], values[(15, 0)], values[(15, 1)]] == ["CUSTOM", "scatter", "100.0"]
@@ -0,0 +1,55 @@
+"""Test book field scanning and payout comparison used for RGS verification."""
+
+import json
+import numpy as np
+import pytest
+from src.write_data.seekable_books import SeekableBookWriter
+from utils.analysis.lookup_table import write_lookup_table
+from utils.rgs_verification import scan_books, compare_payout_values, verify_mode
+
+
+def test_scanner_matches_full_parse(tmp_path):
+    """Scanned ids, payouts and event counts should match fully decoded books."""
+    filename = str(tmp_path / "books_base.jsonl.zst")
+    with SeekableBookWriter(filename, books_per_frame=3) as writer:
+        for book_id in range(1, 8):
+            events = [{"index": idx, "type": "reveal", "board": [[{"name": "H1"}]]} for idx in range(book_id % 4)]
+            book = {"id": book_id, "payoutMultiplier": book_id * 10, "events": events, "criteria": "basegame"}
+            writer.write_book(json.dumps(book).encode("UTF-8"))
+        # Books with a different key order fall back to decoding
+        writer.write_book(json.dumps({"events": [{"type": "reveal"}], "payoutMultiplier": 0, "id": 8}).encode("UTF-8"))
+
+    scanned = scan_books(filename)
+    parsed = scan_books(filename, full_parse=True)
+    assert scanned[0].tolist() == parsed[0].tolist() == list(range(1, 9))
+    assert scanned[1].tolist() == parsed[1].tolist()
+    assert scanned[2] == parsed[2] == sum(book_id % 4 for book_id in range(1, 8)) + 1
+
+
+def test_compare_reports_first_mismatch():
+    """Payout comparison should identify the first differing index."""
+    compare_payout_values([0, 10, 20], np.array([0, 10, 20], dtype=np.uint64))
+    with pytest.raises(AssertionError, match="index 2"):
+        compare_payout_values([0, 10, 30, 50], [0, 10, 20, 40])
+    with pytest.raises(AssertionError, match="length"):
+        compare_payout_values([0, 10], [0, 10, 20])
+
+
+def test_verify_mode_statistics(tmp_path):
+    """Statistics of a mode should be computed from matching books and lookup table."""
+    book_file = str(tmp_path / "books_base.jsonl.zst")
+    lut_file = str(tmp_path / "lookUpTable_base_0.csv")
+    payouts = [0, 0, 50, 200]
+    with SeekableBookWriter(book_file) as writer:
+        for book_id, payout in enumerate(payouts, start=1):
+            book = {"id": book_id, "payoutMultiplier": payout, "events": [{"index": 0, "type": "reveal"}]}
+            writer.write_book(json.dumps(book).encode("UTF-8"))
+    rows = [[book_id, 1, payout] for book_id, payout in enumerate(payouts, start=1)]
+    write_lookup_table(lut_file, np.array(rows, dtype=np.uint64))
+
+    stats = verify_mode("base", 1.0, book_file, lut_file)
+    assert stats.num_events == 4
+    assert stats.weight_range == 4.0
+    assert (stats.min_win, stats.max_win) == (0.0, 200.0)
+    assert abs(stats.rtp - 0.625) < 1e-12
+    assert stats.prob_nil == 0.5
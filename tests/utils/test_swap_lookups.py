@@ -0,0 +1,60 @@
+"""Test verified replacement of published lookup tables with optimization outputs."""
+
+import os
+import pytest
+from src.write_data.file_manifest import FileManifest, get_file_details
+from utils.swap_lookups import swap_tables
+
+OPT_HEADER = "Name,Pig1\nScore,1.0\nLockedUpRTP,\nRtp,0.97\nWin Ranges\n(0.0-0.1),1.0\nDistribution\n"
+
+
+def setup_library(root):
+    """Create publish and optimization folders with a published table."""
+    library_path = os.path.join(root, "games", "test_game", "library")
+    for folder in ["publish_files", "optimization_files", "lookup_tables"]:
+        os.makedirs(os.path.join(library_path, folder))
+    with open(os.path.join(library_path, "publish_files", "lookUpTable_base_0.csv"), "w", encoding="UTF-8") as f:
+        f.write("1,1,0\n2,1,150\n3,1,2000\n")
+    return library_path
+
+
+def write_opt_file(library_path, distribution):
+    """Write optimization output for the first distribution."""
+    with open(os.path.join(library_path, "optimization_files", "base_0_1.csv"), "w", encoding="UTF-8") as f:
+        f.write(OPT_HEADER + distribution)
+
+
+def test_swap_verified_table(tmp_path, monkeypatch):
+    """Matching tables are published, with the manifest entry recorded while writing."""
+    library_path = setup_library(tmp_path)
+    write_opt_file(library_path, "1,500,0\n2,300,1.5\n3,2,2000")
+    monkeypatch.chdir(tmp_path)
+
+    swap_tables("test_game", "base", 1)
+    lut_file = os.path.join(library_path, "publish_files", "lookUpTable_base_0.csv")
+    with open(lut_file, "r", encoding="UTF-8") as f:
+        assert f.read() == "1,500,0\n2,300,150\n3,2,2000\n"
+    assert not any(name.endswith(".tmp") for name in os.listdir(os.path.join(library_path, "publish_files")))
+
+    entry = FileManifest(library_path).entries[os.path.join("publish_files", "lookUpTable_base_0.csv")]
+    assert entry["mtime_ns"] == os.stat(lut_file).st_mtime_ns
+    details = get_file_details(lut_file, lookup=True)
+    assert entry["sha256"] == details["sha256"]
+    assert entry["lookup_stats"] == details["lookup_stats"]
+
+
+@pytest.mark.parametrize(
+    "distribution",
+    ["1,500,0\n2,300,100\n3,2,2000\n", "1,500,0\n3,300,150\n2,2,2000\n", "1,500,0\n2,300,150\n"],
+)
+def test_swap_rejects_mismatched_table(tmp_path, monkeypatch, distribution):
+    """Differing payouts, ids or row counts leave the published table unchanged."""
+    library_path = setup_library(tmp_path)
+    write_opt_file(library_path, distribution)
+    monkeypatch.chdir(tmp_path)
+
+    with pytest.raises(ValueError):
+        swap_tables("test_game", "base", 1)
+    with open(os.path.join(library_path, "publish_files", "lookUpTable_base_0.csv"), "r", encoding="UTF-8") as f:
+        assert f.read() == "1,1,0\n2,1,150\n3,1,2000\n"
+    assert not any(name.endswith(".tmp") for name in os.listdir(os.path.join(library_path, "publish_files")))
@@ -0,0 +1,46 @@
+"""Test file details computed while writing and reused through the manifest."""
+
+import os
+import hashlib
+from src.write_data.file_manifest import FileManifest, HashingFileWriter, get_file_details
+from utils.analysis.distribution_functions import WinDistribution
+
+
+def test_streamed_details_match_file(tmp_path):
+    """Details tracked during writing should match a full read of the finished file."""
+    filename = str(tmp_path / "lookUpTable_base.csv")
+    rows = [f"{idx},{idx % 3 + 1},{(idx % 5) * 120}\n" for idx in range(1, 101)]
+    with HashingFileWriter(filename, lookup=True) as outfile:
+        # Split rows across writes to check partial rows are carried over
+        data = "".join(rows)
+        for start in range(0, len(data), 37):
+            outfile.write(data[start : start + 37])
+
+    with open(filename, "rb") as f:
+        assert outfile.details["sha256"] == hashlib.sha256(f.read()).hexdigest()
+    assert outfile.details == get_file_details(filename, lookup=True)
+    assert outfile.details["rows"] == 100
+
+    weights = [idx % 3 + 1 for idx in range(1, 101)]
+    payouts = [(idx % 5) * 1.2 for idx in range(1, 101)]
+    mean = sum(w * p for w, p in zip(weights, payouts)) / sum(weights)
+    variance = sum(w * (p - mean) ** 2 for w, p in zip(weights, payouts)) / sum(weights)
+    distribution = WinDistribution.from_lookup_stats(outfile.details["lookup_stats"])
+    assert abs(distribution.get_average() - mean) < 1e-9
+    assert abs(distribution.get_moments()[1] - variance**0.5) < 1e-9
+
+
+def test_manifest_detects_modified_files(tmp_path):
+    """Stale entries should be recomputed rather than reused."""
+    filename = str(tmp_path / "force.json")
+    with HashingFileWriter(filename) as outfile:
+        outfile.write("{}")
+    manifest = FileManifest(str(tmp_path))
+    manifest.record(filename, outfile.details)
+    manifest.save()
+    assert FileManifest(str(tmp_path)).get(filename)["sha256"] == outfile.details["sha256"]
+
+    with open(filename, "w", encoding="UTF-8") as f:
+        f.write('{"base": []}')
+    os.utime(filename, ns=(0, 0))
+    assert FileManifest(str(tmp_path)).get(filename)["sha256"] == get_file_details(filename)["sha256"]
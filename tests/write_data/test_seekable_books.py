@@ -0,0 +1,57 @@
+"""Test framed book compression and book-id index lookups."""
+
+import os
+import json
+import zstandard as zstd
+from src.write_data.seekable_books import (
+    SeekableBookWriter,
+    SeekableBookReader,
+    get_book_index_name,
+    get_book_dictionary_name,
+    read_all_books,
+)
+
+
+def write_test_books(filename, num_books, books_per_frame):
+    """Write simple books and return their uncompressed JSONL content."""
+    lines = []
+    with SeekableBookWriter(filename, books_per_frame=books_per_frame) as writer:
+        for book_id in range(1, num_books + 1):
+            line = json.dumps({"id": book_id, "payoutMultiplier": book_id * 10, "events": []}) + "\n"
+            writer.write_book(line.encode("UTF-8"))
+            lines.append(line)
+    return "".join(lines).encode("UTF-8")
+
+
+def test_frames_form_standard_stream(tmp_path):
+    """Concatenated frames must decompress as a single zstd stream."""
+    filename = str(tmp_path / "books_base.jsonl.zst")
+    expected = write_test_books(filename, 25, 4)
+    assert read_all_books(filename) == expected
+
+    with open(filename, "rb") as f:
+        reader = zstd.ZstdDecompressor().stream_reader(f, read_across_frames=True)
+        assert reader.read() == expected
+
+
+def test_random_access_books(tmp_path):
+    """Requested book-ids are returned in the order requested."""
+    filename = str(tmp_path / "books_base.jsonl.zst")
+    write_test_books(filename, 25, 4)
+    reader = SeekableBookReader(filename)
+    assert len(reader) == 25
+    books = reader.get_books([17, 2, 25, 9])
+    assert [b["id"] for b in books] == [17, 2, 25, 9]
+    assert reader.get_book(13)["payoutMultiplier"] == 130
+
+
+def test_published_index_outside_publish_files(tmp_path):
+    """Indexes and dictionaries of published books are kept in the library, not the RGS upload folder."""
+    publish_path = tmp_path / "library" / "publish_files"
+    publish_path.mkdir(parents=True)
+    filename = str(publish_path / "books_base.jsonl.zst")
+    write_test_books(filename, 5, 2)
+    assert get_book_index_name(filename) == str(tmp_path / "library" / "book_index" / "books_base.index.npz")
+    assert get_book_dictionary_name(filename) == str(tmp_path / "library" / "book_index" / "books_base.dict")
+    assert sorted(os.listdir(publish_path)) == ["books_base.jsonl.zst"]
+    assert SeekableBookReader(filename).get_book(4)["id"] == 4
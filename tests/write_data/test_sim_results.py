@@ -0,0 +1,43 @@
+"""Test columnar simulation result storage."""
+
+from types import SimpleNamespace
+import numpy as np
+from src.write_data.sim_results import write_temp_sim_results, merge_sim_results, load_sim_results
+
+
+def make_gamestate(first_sim, num_sims):
+    """Minimal gamestate holding a library and matching per-simulation results."""
+    library, sim_results = {}, {}
+    for sim in range(first_sim, first_sim + num_sims):
+        library[sim] = {
+            "id": sim,
+            "payoutMultiplier": sim * 10,
+            "criteria": "freegame" if sim % 2 == 0 else "basegame",
+            "baseGameWins": sim * 0.05,
+            "freeGameWins": sim * 0.05,
+        }
+        sim_results[sim] = (sim % 3, sim % 4, 10 * (sim % 2 == 0), sim == first_sim)
+    return SimpleNamespace(
+        library=library, sim_results=sim_results, criteria_index={"basegame": 0, "freegame": 1}
+    )
+
+
+def test_merge_and_load(tmp_path):
+    """Merged columns should preserve file order and be memory-mappable."""
+    file_list = []
+    for thread, first_sim in enumerate([1, 6]):
+        name = str(tmp_path / f"sim_results_base_{thread}_0.npz")
+        write_temp_sim_results(make_gamestate(first_sim, 5), name)
+        file_list.append(name)
+
+    output_path = str(tmp_path / "sim_results" / "base")
+    merge_sim_results(file_list, output_path, ["basegame", "freegame"])
+    results = load_sim_results(output_path)
+
+    assert results["id"].tolist() == list(range(1, 11))
+    assert results["payout"].tolist() == [sim * 10 for sim in range(1, 11)]
+    assert results["criteria"].tolist() == [sim % 2 == 0 for sim in range(1, 11)]
+    assert results["freespins"].tolist() == [10 * (sim % 2 == 0) for sim in range(1, 11)]
+    assert results["wincap"].tolist() == [sim in [1, 6] for sim in range(1, 11)]
+    assert results["criteria_names"] == ["basegame", "freegame"]
+    assert isinstance(results["id"], np.memmap)
@@ -7,6 +7,7 @@ import hashlib
 import warnings
 import threading
 from botocore.exceptions import NoCredentialsError
+from utils.analysis.lookup_table import load_lookup_table
 
 
 class check_files:
@@ -18,22 +19,17 @@ class check_files:
     def get_lut_length(self, lut_base_path, file):
         """Verify LUT item count matches book count."""
         full_file = lut_base_path + file
-        csv = open(full_file, "r")
-        book_count = len(csv.readlines())
+        book_count = len(load_lookup_table(full_file))
 
         return book_count
 
     def get_lut_sha(self, lut_base_path, target_file):
-        """Compare hash of lookup tables."""
+        """Compare hash of lookup tables, hashing the file contents rather than trusting cached details."""
         file_to_hash = lut_base_path + target_file
+        sha256_file = hashlib.sha256()
         with open(file_to_hash, "rb") as f:
-            sha256_file = hashlib.sha256()
-            while True:
-                data = f.read(65536)
-                if not data:
-                    break
+            for data in iter(lambda: f.read(65536), b""):
                 sha256_file.update(data)
-
         sha256_hexRep = sha256_file.hexdigest()
 
         return sha256_hexRep
@@ -117,20 +113,9 @@ class FileDetails:
 
     def get_win_weights(self, fname):
         """Return sorted win distribution."""
-        file = open(fname, "r")
-        winDict = {}
-        total_weight = 0
-        for line in file:
-            _, weight, win = line.split(",")
-            try:
-                winDict[float(win) / 100] += float(weight)
-            except:
-                winDict[float(win) / 100] = float(weight)
-            total_weight += float(weight)
-
+        winDict = load_lookup_table(fname).get_win_distribution(normalize=False)
         sorted_wins = list(winDict.keys())
-        sorted_wins.sort()
-        sortedWeights = [winDict[win] for win in sorted_wins]
+        sortedWeights = list(winDict.values())
 
         return sorted_wins, sortedWeights
 
@@ -33,6 +33,9 @@ def upload_to_aws(gamestate, game_modes, upload_obj, override_check=False):
         print("Config File Checks Overridden!")
         time.sleep(3)
 
+    if upload_obj["books"] and gamestate.config.publish_with_dictionary:
+        raise RuntimeError("Books published with a compression dictionary are not supported by the RGS.")
+
     bucket_folder = game_to_upload + "/"
     file_details = FileDetails(game_to_upload, game_modes)
     aws_details = AWSCommands(s3_client, BUCKET_NAME, bucket_folder)
@@ -1,134 +1,235 @@
-from collections import defaultdict
 from math import sqrt
 import numpy as np
+from utils.analysis.lookup_table import LookupTable, load_lookup_table
+
+
+class WinDistribution:
+    """
+    Win-distribution backed by sorted, unique payout and weight arrays.
+    When built from a lookup table, payouts (cents) and weights stay integers, so weight totals, RTP and moments
+    are summed exactly before the final conversion to float.
+    """
+
+    def __init__(self, payouts, weights, payout_scale: int = 1):
+        payouts, weights = np.asarray(payouts), np.asarray(weights)
+        assert len(payouts) == len(weights), "payouts and weights must be the same length."
+        self.exact = np.issubdtype(payouts.dtype, np.integer) and np.issubdtype(weights.dtype, np.integer)
+        unique_payouts, inverse = np.unique(payouts, return_inverse=True)
+        unique_weights = np.zeros(len(unique_payouts), dtype=weights.dtype if self.exact else np.float64)
+        np.add.at(unique_weights, inverse, weights)
+        if self.exact:
+            # Python integers avoid overflow in weighted sums of powers
+            self.payout_values = np.array(unique_payouts.tolist(), dtype=object)
+            self.weights = np.array(unique_weights.tolist(), dtype=object)
+        else:
+            self.payout_values = unique_payouts.astype(np.float64)
+            self.weights = unique_weights
+        self.payout_scale = payout_scale
+        self.payouts = unique_payouts.astype(np.float64) / payout_scale
+        self.total_weight = self.weights.sum() if len(self.weights) > 0 else 0
+
+    @classmethod
+    def from_dict(cls, dist: dict) -> "WinDistribution":
+        """Construct from a {payout multiplier: weight} dictionary."""
+        return cls(list(dist.keys()), list(dist.values()))
+
+    @classmethod
+    def from_lookup_table(cls, lookup_table: LookupTable) -> "WinDistribution":
+        """Construct with exact integer payouts (cents) and weights."""
+        payouts, weights = lookup_table.get_payout_weights()
+        return cls(np.array(payouts, dtype=np.uint64), np.array(weights, dtype=np.uint64), payout_scale=100)
+
+    @classmethod
+    def from_lookup_stats(cls, stats: dict) -> "WinDistribution":
+        """Construct from the payout weights recorded for a lookup table in the file manifest."""
+        payout_weights = stats["payout_weights"]
+        return cls(
+            np.array([int(payout) for payout in payout_weights], dtype=np.uint64),
+            np.array(list(payout_weights.values()), dtype=np.uint64),
+            payout_scale=100,
+        )
+
+    @classmethod
+    def from_file(cls, filepath: str) -> "WinDistribution":
+        """Construct from a lookup table csv."""
+        return cls.from_lookup_table(load_lookup_table(filepath))
+
+    def __len__(self):
+        return len(self.payouts)
+
+    def to_dict(self, normalize: bool = True) -> dict:
+        """Return {payout multiplier: weight} dictionary, ordered by payout."""
+        weights = self.get_probabilities() if normalize else self.weights.astype(np.float64)
+        return dict(zip(self.payouts.tolist(), weights.tolist()))
+
+    def get_probabilities(self) -> np.ndarray:
+        """Probability of each unique payout."""
+        if self.exact:
+            return np.array([w / self.total_weight for w in self.weights], dtype=np.float64)
+        return self.weights / self.total_weight
+
+    def get_ratio(self, numerator, denominator) -> float:
+        """Divide sums, without losing precision on large integers."""
+        if self.exact:
+            return numerator / denominator
+        return float(numerator) / float(denominator)
+
+    def get_average(self) -> float:
+        """Weighted average payout multiplier."""
+        weighted_payout = np.dot(self.payout_values, self.weights)
+        return self.get_ratio(weighted_payout, self.total_weight * self.payout_scale)
+
+    def get_rtp(self, bet_cost: float) -> float:
+        """Return to player for a given bet cost."""
+        return self.get_average() / bet_cost
+
+    def get_moments(self) -> tuple:
+        """Return variance, standard deviation, skewness and excess kurtosis."""
+        if len(self) == 0:
+            return 0.0, 0.0, 0.0, 0.0
+        total_weight = self.total_weight
+        if self.exact:
+            # Raw power sums scaled by powers of the total weight keep central moments as exact integers
+            s1 = np.dot(self.payout_values, self.weights)
+            s2 = np.dot(self.payout_values**2, self.weights)
+            s3 = np.dot(self.payout_values**3, self.weights)
+            s4 = np.dot(self.payout_values**4, self.weights)
+            m2 = (total_weight * s2 - s1**2) / total_weight**2
+            m3 = (total_weight**2 * s3 - 3 * total_weight * s1 * s2 + 2 * s1**3) / total_weight**3
+            m4 = (
+                total_weight**3 * s4 - 4 * total_weight**2 * s1 * s3 + 6 * total_weight * s1**2 * s2 - 3 * s1**4
+            ) / total_weight**4
+            m2 /= self.payout_scale**2
+            m3 /= self.payout_scale**3
+            m4 /= self.payout_scale**4
+        else:
+            probabilities = self.weights / total_weight
+            deviation = self.payouts - np.dot(self.payouts, probabilities)
+            m2, m3, m4 = [float(np.dot(deviation**power, probabilities)) for power in [2, 3, 4]]
+
+        variance = max(m2, 0.0)
+        standard_dev = sqrt(variance)
+        # Handle zero standard deviation (all values are the same)
+        if standard_dev > 0:
+            skewness = m3 / standard_dev**3
+            kurtosis = m4 / standard_dev**4 - 3
+        else:
+            skewness, kurtosis = 0.0, 0.0
+        return variance, standard_dev, skewness, kurtosis
+
+    def get_median(self) -> float:
+        """Smallest payout with at least half of the total weight at or below it."""
+        if len(self) == 0:
+            return 0
+        cumulative_weight = np.cumsum(self.weights)
+        return float(self.payouts[np.argmax(2 * cumulative_weight >= self.total_weight)])
+
+    def get_maxwin_hitrate(self) -> float:
+        """Return inverse frequency of the largest payout."""
+        return self.get_ratio(self.total_weight, self.weights[-1])
+
+    def get_prob_no_win(self) -> float:
+        """Probability of 0x payout amount."""
+        if len(self) > 0 and self.payout_values[0] == 0:
+            return self.get_ratio(self.weights[0], self.total_weight)
+        return 0
+
+    def get_non_zero_hitrate(self) -> float:
+        """Inverse probability of a non-zero payout."""
+        if len(self) > 0 and self.payout_values[0] == 0:
+            return self.get_ratio(self.total_weight, self.total_weight - self.weights[0])
+        return 1
+
+    def get_prob_less_than(self, bet_cost: float) -> float:
+        """Probability of winning less than the bet cost."""
+        num_less = np.searchsorted(self.payouts, bet_cost, side="left")
+        return self.get_ratio(self.weights[:num_less].sum() if num_less > 0 else 0, self.total_weight)
+
+    def get_min_difference(self) -> int:
+        """Minimum difference between unique payouts, in cents."""
+        if len(self) < 2:
+            # If there are fewer than 2 unique wins, return 0 or a default value
+            return 0
+        return int(round(float(np.min(np.diff(self.payouts))) * 100))
+
+    def get_statistics(self, bet_cost: float = 1.0) -> dict:
+        """All RGS distribution statistics."""
+        variance, standard_dev, skewness, kurtosis = self.get_moments()
+        return {
+            "total_weight": self.total_weight,
+            "average_win": self.get_average(),
+            "rtp": self.get_rtp(bet_cost),
+            "var": variance,
+            "std": standard_dev,
+            "skew": skewness,
+            "excess_kurtosis": kurtosis,
+            "median": self.get_median(),
+            "hr_max": self.get_maxwin_hitrate(),
+            "non_zero_hr": self.get_non_zero_hitrate(),
+            "prob_nil": self.get_prob_no_win(),
+            "prob_less_bet": self.get_prob_less_than(bet_cost),
+            "min_diff": self.get_min_difference(),
+        }
 
 
 def get_lookup_length(filepath: str) -> int:
     """Get length of lookup table."""
-    return sum(1 for _ in open(filepath, "rb"))
+    return len(load_lookup_table(filepath))
 
 
 def make_win_distribution(filepath: str, normalize: bool = True) -> dict:
     """Construct win-distribution with unique, ordered payouts."""
-    dist = defaultdict(float)
-    with open(filepath, "r", encoding="UTF-8") as f:
-        for line in f:
-            _, weight, payout = line.strip().split(",")
-            weight = int(weight)
-            payout = float(payout) / 100
-            dist[payout] += weight
+    return load_lookup_table(filepath).get_win_distribution(normalize)
 
-    # Sort by win amount
-    dist = dict(sorted(dist.items(), key=lambda x: x[0], reverse=False))
-    if normalize:
-        total_weight = sum(dist.values())
-        dist = {x: y / total_weight for x, y in dist.items()}
 
-    return dist
+def get_win_distribution(dist) -> WinDistribution:
+    """Return WinDistribution from a win-distribution dictionary (or existing WinDistribution)."""
+    if isinstance(dist, WinDistribution):
+        return dist
+    return WinDistribution.from_dict(dist)
 
 
+# `total_weight` arguments are retained for compatibility, the total is always taken from the distribution.
 def get_distribution_average(dist: dict) -> float:
     """Return weighted average from ordered win distribution."""
-    return np.average(list(dist.keys()), weights=list(dist.values()))
+    return get_win_distribution(dist).get_average()
 
 
 def get_distribution_moments(dist: dict) -> float:
-    """Given a (weighted) lookup-table, return standard deviation."""
-    av_win = get_distribution_average(dist)
-    total_weight = sum(list(dist.values()))
-
-    variance = 0.0
-    for pay, weight in dist.items():
-        variance += ((pay - av_win) ** 2) * (weight / total_weight)
-    standard_dev = sqrt(variance)
-
-    skewness, kurtosis = 0.0, 0.0
-    av_win = float(av_win)
-    for win, weight in dist.items():
-        skewness += ((win - av_win) ** 3) * weight
-        kurtosis += ((win - av_win) ** 4) * weight
-    
-    # Handle zero standard deviation (all values are the same)
-    if standard_dev > 0:
-        skewness /= (standard_dev) ** 3
-        kurtosis /= (standard_dev) ** 4
-        kurtosis -= 3
-    else:
-        # If all values are the same, skewness and kurtosis are 0
-        skewness = 0.0
-        kurtosis = 0.0
-
-    return variance, standard_dev, skewness, kurtosis
+    """Given a (weighted) lookup-table, return variance, standard deviation, skewness and excess kurtosis."""
+    return get_win_distribution(dist).get_moments()
 
 
 def get_distribution_median(dist: dict, total_weight=None) -> float:
     """Return median of an ordered win-distribution."""
-    if total_weight is not None:
-        total_weight = sum(list(dist.values()))
-    cumulative_weight = 0
-    for win, weight in dist.items():
-        cumulative_weight += weight
-        if cumulative_weight >= total_weight / 2:
-            return win
-    return 0
+    return get_win_distribution(dist).get_median()
 
 
 def get_maxwin_hitrate(dist: dict, total_weight=None) -> float:
     """Return frequency of max-win."""
-    if total_weight is not None:
-        total_weight = sum(list(dist.values()))
-    max_win_prob = dist[max(list(dist.keys()))] / total_weight
-    return 1.0 / max_win_prob
+    return get_win_distribution(dist).get_maxwin_hitrate()
 
 
 def get_prob_no_win(dist: dict, total_weight=None) -> float:
     "Probability of 0x payout amount."
-    # The distribution is already normalized (weights sum to 1.0)
-    # so we can directly return the probability of 0 wins
-    if min(dist.keys()) == 0:
-        return dist[0]
-    return 0
+    return get_win_distribution(dist).get_prob_no_win()
 
 
 def prob_less_than_bet(dist: dict, bet_cost: float, total_weight=None):
     """Probability of winning less than mode bet cost."""
-    cumulative_prob = 0
-    for win, weight in dist.items():
-        if win < bet_cost:
-            cumulative_prob += weight
-
-    # The distribution is already normalized (weights sum to 1.0)
-    # so we just return the cumulative probability directly
-    return cumulative_prob
+    return get_win_distribution(dist).get_prob_less_than(bet_cost)
 
 
 def non_zero_hitrate(dist: dict, total_weight=None):
     """Calculate probability of"""
-    if total_weight is not None:
-        total_weight = sum(list(dist.values()))
-
-    if min(dist.keys()) == 0:
-        return 1 / (1 - dist[0] / total_weight)
-    else:
-        return 1
+    return get_win_distribution(dist).get_non_zero_hitrate()
 
 
 def calculate_rtp(dist: dict, bet_cost: float, total_weight: float = None) -> float:
     """Get distribution RTP."""
-    if total_weight is not None:
-        total_weight = sum(list(dist.values()))
-    return float(np.dot(list(dist.keys()), list(dist.values()))) / total_weight / bet_cost
+    return get_win_distribution(dist).get_rtp(bet_cost)
 
 
 def min_dist_difference(dist: dict):
     """Minimum payout amount difference"""
-    wins = sorted(list(dist.keys()))
-    if len(wins) < 2:
-        # If there are fewer than 2 unique wins, return 0 or a default value
-        return 0
-    diff = None
-    for i in range(len(wins) - 1):
-        current_diff = abs(wins[i + 1] - wins[i])
-        if diff is None or (diff > current_diff):
-            diff = current_diff
-    return int(round(diff * 100))
+    return get_win_distribution(dist).get_min_difference()
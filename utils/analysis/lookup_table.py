@@ -0,0 +1,185 @@
+"""Shared lookup table reader.
+
+Lookup tables (`id,weight,payout` rows) are parsed once into a (rows, 3) uint64 array, which is cached as a
+memory-mappable `.npy` file. Tables within a game library are cached in `library/.lookup_cache/`, under the
+table's path relative to the library, so nothing is written to the publish folder; other tables are cached in a
+`.lookup_cache/` folder next to the csv. The cache is keyed by the SHA-256 of the csv, with the file size and
+modification time recorded so unchanged tables are loaded without being re-read.
+"""
+
+import io
+import os
+import json
+import hashlib
+import numpy as np
+
+LOOKUP_CACHE_DIR = ".lookup_cache"
+LIBRARY_DIR = "library"
+
+
+def parse_lookup_text(text) -> np.ndarray:
+    """Parse `id,weight,payout` rows into a (rows, 3) uint64 array."""
+    if isinstance(text, bytes):
+        text = text.decode("UTF-8")
+    if len(text.strip()) == 0:
+        return np.empty((0, 3), dtype=np.uint64)
+    try:
+        values = np.loadtxt(io.StringIO(text), delimiter=",", dtype=np.uint64, comments=None, ndmin=2)
+    except ValueError as exc:
+        raise ValueError("Lookup table must only contain non-negative integer [id,weight,payout] rows.") from exc
+    if values.shape[1] != 3:
+        raise ValueError(f"Malformed lookup table, expected 3 columns of [id,weight,payout], found {values.shape[1]}.")
+    return values
+
+
+def iter_lookup_text(table: np.ndarray, chunk_size: int = 1 << 16):
+    """Yield `id,weight,payout` csv rows of a (rows, 3) array, a block of rows at a time."""
+    for start in range(0, len(table), chunk_size):
+        rows = np.asarray(table[start : start + chunk_size]).tolist()
+        yield "".join(f"{idx},{weight},{payout}\n" for idx, weight, payout in rows)
+
+
+def write_lookup_table(filepath: str, table: np.ndarray, chunk_size: int = 1 << 16) -> None:
+    """Write a (rows, 3) array as `id,weight,payout` csv rows."""
+    with open(filepath, "w", encoding="UTF-8") as f:
+        for text in iter_lookup_text(table, chunk_size):
+            f.write(text)
+
+
+def get_lookup_cache_names(filepath: str) -> tuple:
+    """Cache folder and cache details filename for a lookup table."""
+    folder = os.path.dirname(os.path.abspath(filepath))
+    library_path = folder
+    while os.path.basename(library_path) != LIBRARY_DIR:
+        parent = os.path.dirname(library_path)
+        if parent == library_path:
+            library_path = None
+            break
+        library_path = parent
+    if library_path is None:
+        cache_dir = os.path.join(folder, LOOKUP_CACHE_DIR)
+    else:
+        cache_dir = os.path.join(library_path, LOOKUP_CACHE_DIR, os.path.relpath(folder, library_path))
+    cache_dir = os.path.normpath(cache_dir)
+    return cache_dir, os.path.join(cache_dir, os.path.basename(filepath) + ".json")
+
+
+def load_lookup_table(filepath: str, use_cache: bool = True, mmap: bool = True) -> "LookupTable":
+    """Return lookup table arrays, using the cached binary copy where possible."""
+    file_stat = os.stat(filepath)
+    cache_dir, details_name = get_lookup_cache_names(filepath)
+    cache_details = None
+    if use_cache and os.path.isfile(details_name):
+        with open(details_name, "r", encoding="UTF-8") as f:
+            cache_details = json.load(f)
+        cache_name = os.path.join(cache_dir, cache_details["cache_file"])
+        if (
+            cache_details["size"] == file_stat.st_size
+            and cache_details["mtime_ns"] == file_stat.st_mtime_ns
+            and os.path.isfile(cache_name)
+        ):
+            table = np.load(cache_name, mmap_mode="r" if mmap else None)
+            return LookupTable(table, filepath, cache_details["sha256"])
+
+    with open(filepath, "rb") as f:
+        data = f.read()
+    sha256 = hashlib.sha256(data).hexdigest()
+    cache_file = f"{os.path.basename(filepath)}.{sha256[:16]}.npy"
+    if cache_details is not None and cache_details["sha256"] == sha256:
+        # Contents are unchanged (e.g. the file was only touched), reuse existing cache
+        cache_name = os.path.join(cache_dir, cache_file)
+        if os.path.isfile(cache_name):
+            write_lookup_cache_details(details_name, file_stat, sha256, cache_file)
+            return LookupTable(np.load(cache_name, mmap_mode="r" if mmap else None), filepath, sha256)
+
+    table = parse_lookup_text(data)
+    if use_cache:
+        try:
+            if not os.path.exists(cache_dir):
+                os.makedirs(cache_dir)
+            if cache_details is not None and cache_details["cache_file"] != cache_file:
+                stale_cache = os.path.join(cache_dir, cache_details["cache_file"])
+                if os.path.isfile(stale_cache):
+                    os.remove(stale_cache)
+            temp_name = os.path.join(cache_dir, f"{cache_file}.{os.getpid()}.tmp")
+            with open(temp_name, "wb") as f:
+                np.save(f, table)
+            os.replace(temp_name, os.path.join(cache_dir, cache_file))
+            write_lookup_cache_details(details_name, file_stat, sha256, cache_file)
+        except OSError:
+            pass
+    return LookupTable(table, filepath, sha256)
+
+
+def write_lookup_cache_details(details_name: str, file_stat: os.stat_result, sha256: str, cache_file: str):
+    """Record which cached array belongs to the current lookup table."""
+    temp_name = f"{details_name}.{os.getpid()}.tmp"
+    with open(temp_name, "w", encoding="UTF-8") as f:
+        f.write(
+            json.dumps(
+                {
+                    "size": file_stat.st_size,
+                    "mtime_ns": file_stat.st_mtime_ns,
+                    "sha256": sha256,
+                    "cache_file": cache_file,
+                },
+                indent=4,
+            )
+        )
+    os.replace(temp_name, details_name)
+
+
+class LookupTable:
+    """Lookup table id, weight and payout (cents) columns as uint64 arrays."""
+
+    def __init__(self, table: np.ndarray, filepath: str = None, sha256: str = None):
+        self.table = table
+        self.filepath = filepath
+        self.sha256 = sha256
+        self.ids = table[:, 0]
+        self.weights = table[:, 1]
+        self.payouts = table[:, 2]
+        self.id_sort_order, self.sorted_ids = None, None
+
+    def __len__(self):
+        return len(self.table)
+
+    @property
+    def total_weight(self) -> int:
+        """Exact sum of all weights."""
+        if float(np.sum(self.weights, dtype=np.float64)) >= np.iinfo(np.uint64).max:
+            # uint64 sum would overflow
+            return sum(self.weights.tolist())
+        return int(np.sum(self.weights, dtype=np.uint64))
+
+    def get_payout_weights(self) -> tuple:
+        """Return unique payouts (cents) in ascending order, and the summed weight of each as python ints."""
+        payouts, inverse = np.unique(self.payouts, return_inverse=True)
+        weights = np.zeros(len(payouts), dtype=np.uint64)
+        np.add.at(weights, inverse, self.weights)
+        return payouts.tolist(), weights.tolist()
+
+    def get_win_distribution(self, normalize: bool = True) -> dict:
+        """Win-distribution of unique, ordered payout multipliers."""
+        payouts, weights = self.get_payout_weights()
+        dist = {payout / 100: float(weight) for payout, weight in zip(payouts, weights)}
+        if normalize:
+            total_weight = sum(dist.values())
+            dist = {x: y / total_weight for x, y in dist.items()}
+        return dist
+
+    def get_id_index(self, book_ids) -> np.ndarray:
+        """Row index of each requested book-id, or -1 where the id is not in the table."""
+        book_ids = np.asarray(book_ids, dtype=np.uint64)
+        if len(self.ids) == 0:
+            return np.full(len(book_ids), -1, dtype=np.int64)
+        if self.id_sort_order is None:
+            # Lookup tables are normally ordered by id, in which case no sorting is needed
+            if np.all(self.ids[1:] > self.ids[:-1]):
+                self.id_sort_order, self.sorted_ids = np.arange(len(self.ids)), self.ids
+            else:
+                self.id_sort_order = np.argsort(self.ids, kind="stable")
+                self.sorted_ids = self.ids[self.id_sort_order]
+        positions = np.minimum(np.searchsorted(self.sorted_ids, book_ids), len(self.sorted_ids) - 1)
+        found = self.sorted_ids[positions] == book_ids
+        return np.where(found, self.id_sort_order[positions], -1).astype(np.int64)
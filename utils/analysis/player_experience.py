@@ -0,0 +1,132 @@
+"""
+Monte-Carlo player experience score of a win distribution, matching the optimization program's simulation scoring.
+Trials of `max(test_spins)` spins are sampled, and a trial succeeds at a test spin count if the total win over
+those spins returns at least `pmb_rtp` of the amount bet.
+"""
+
+import os
+import numpy as np
+from src.config.paths import PATH_TO_GAMES
+from utils.analysis.distribution_functions import WinDistribution
+
+# Maximum number of sampled spins held in memory at once
+MAX_CHUNK_SPINS = 1 << 22
+
+
+class AliasTable:
+    """Walker/Vose alias table, sampling an index in constant time regardless of the number of outcomes."""
+
+    def __init__(self, probabilities):
+        probabilities = np.asarray(probabilities, dtype=np.float64)
+        assert len(probabilities) > 0 and np.all(probabilities >= 0), "Probabilities must be non-negative."
+        size = len(probabilities)
+        scaled = probabilities * size / probabilities.sum()
+        self.accept = np.ones(size, dtype=np.float64)
+        self.alias = np.arange(size, dtype=np.int64)
+
+        small = [idx for idx in range(size) if scaled[idx] < 1.0]
+        large = [idx for idx in range(size) if scaled[idx] >= 1.0]
+        while len(small) > 0 and len(large) > 0:
+            small_idx, large_idx = small.pop(), large[-1]
+            self.accept[small_idx] = scaled[small_idx]
+            self.alias[small_idx] = large_idx
+            scaled[large_idx] -= 1.0 - scaled[small_idx]
+            if scaled[large_idx] < 1.0:
+                small.append(large.pop())
+        # Remaining entries only differ from 1 by rounding error, so are always accepted
+
+    def __len__(self):
+        return len(self.accept)
+
+    def sample(self, rng: np.random.Generator, size) -> np.ndarray:
+        """Sample outcome indices with the given output shape."""
+        columns = rng.integers(0, len(self), size=size)
+        accepted = rng.random(size=size) < self.accept[columns]
+        return np.where(accepted, columns, self.alias[columns])
+
+
+def get_prob_less_bet_penalty(prob_less_bet: float) -> float:
+    """Score multiplier rewarding a low probability of a non-zero win below the bet, as used by the optimizer."""
+    if prob_less_bet > 0.8:
+        return max(1.0 - (prob_less_bet - 0.8) * 50.0, 0.001)
+    return 1.0 + (0.8 - prob_less_bet) * 5.0
+
+
+def score_distribution(
+    payouts,
+    probabilities,
+    bet: float,
+    test_spins: list,
+    test_spins_weights: list,
+    pmb_rtp: float,
+    trials: int,
+    seed=None,
+    max_chunk_spins: int = MAX_CHUNK_SPINS,
+) -> dict:
+    """
+    Player experience score of a distribution of payout multipliers.
+    Bankrolls of each block of trials are sampled and summed as a single (trials, spins) array, with the block size
+    limited so at most `max_chunk_spins` sampled spins are in memory.
+    """
+    assert len(test_spins) == len(test_spins_weights), "Each test spin count needs a weight."
+    payouts = np.asarray(payouts, dtype=np.float64)
+    test_spins = np.asarray(test_spins, dtype=np.int64)
+    num_spins = int(test_spins.max())
+    alias_table = AliasTable(probabilities)
+    rng = np.random.default_rng(seed)
+    is_less_bet = (payouts > 0) & (payouts < bet)
+
+    successes = np.zeros(len(test_spins), dtype=np.int64)
+    less_bet_count = 0
+    chunk_trials = max(1, max_chunk_spins // num_spins)
+    for start in range(0, trials, chunk_trials):
+        outcomes = alias_table.sample(rng, (min(chunk_trials, trials - start), num_spins))
+        less_bet_count += int(np.count_nonzero(is_less_bet[outcomes]))
+        banks = np.cumsum(payouts[outcomes], axis=1)[:, test_spins - 1]
+        successes += np.count_nonzero(banks / (test_spins * bet) >= pmb_rtp, axis=0)
+
+    success_probs = successes / trials
+    prob_less_bet = less_bet_count / (trials * num_spins)
+    success_score = float(np.dot(success_probs, test_spins_weights))
+    penalty = get_prob_less_bet_penalty(prob_less_bet)
+    return {
+        "test_spins": test_spins.tolist(),
+        "success_probs": success_probs.tolist(),
+        "success_score": success_score,
+        "prob_less_bet": prob_less_bet,
+        "prob_less_bet_penalty": penalty,
+        "score": success_score * penalty,
+    }
+
+
+def score_lookup_table(
+    filepath: str, bet: float, params: dict, trials: int = None, seed=None, max_chunk_spins: int = MAX_CHUNK_SPINS
+) -> dict:
+    """Score a lookup table csv using a mode's optimization `parameters`."""
+    win_dist = WinDistribution.from_file(filepath)
+    return score_distribution(
+        win_dist.payouts,
+        win_dist.get_probabilities(),
+        bet,
+        params["test_spins"],
+        params["test_spins_weights"],
+        params["pmb_rtp"],
+        trials if trials is not None else params["simulation_trials"],
+        seed=seed,
+        max_chunk_spins=max_chunk_spins,
+    )
+
+
+def score_published_modes(game_config, modes: list = None, trials: int = None, seed=None) -> dict:
+    """Score the published lookup table of each bet mode with its optimization parameters."""
+    scores = {}
+    for bet_mode in game_config.bet_modes:
+        mode = bet_mode.get_name()
+        if modes is not None and mode not in modes:
+            continue
+        filepath = os.path.join(
+            PATH_TO_GAMES, game_config.game_id, "library", "publish_files", f"lookUpTable_{mode}_0.csv"
+        )
+        params = game_config.opt_params[mode]["parameters"]
+        scores[mode] = score_lookup_table(filepath, bet_mode.get_cost(), params, trials=trials, seed=seed)
+    return scores
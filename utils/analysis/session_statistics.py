@@ -0,0 +1,105 @@
+"""
+Exact session statistics of a lookup table, from repeated FFT convolution of the payout distribution.
+Payouts are integer cents, so the distribution of a session's total win lies on a lattice with the greatest common
+divisor of the payouts as its step (typically 10 cents), with no sampling of trials required.
+"""
+
+import numpy as np
+from utils.analysis.lookup_table import load_lookup_table
+
+DEFAULT_SESSION_SPINS = [50, 100, 200]
+DEFAULT_SESSION_QUANTILES = [0.05, 0.25, 0.5, 0.75, 0.95]
+# Session RTPs above this value are combined into a single tail bin
+MAX_SESSION_RTP = 5.0
+
+
+def get_payout_step(payouts) -> int:
+    """Largest lattice step (cents) dividing every payout."""
+    payouts = np.asarray(payouts, dtype=np.int64)
+    step = int(np.gcd.reduce(payouts[payouts > 0])) if np.any(payouts > 0) else 1
+    return max(step, 1)
+
+
+def convolve_capped(pmf_a: np.ndarray, pmf_b: np.ndarray, cap: int) -> np.ndarray:
+    """
+    Distribution of the sum of two independent lattice variables, with mass at or above `cap` combined into the
+    final bin. As min(a + b, cap) = min(min(a, cap) + min(b, cap), cap), capping at every step is exact below `cap`.
+    """
+    size = len(pmf_a) + len(pmf_b) - 1
+    fft_size = 1 << (size - 1).bit_length()
+    transform_a = np.fft.rfft(pmf_a, fft_size)
+    # Squaring only needs a single forward transform
+    transform_b = transform_a if pmf_b is pmf_a else np.fft.rfft(pmf_b, fft_size)
+    pmf = np.fft.irfft(transform_a * transform_b, fft_size)[:size]
+    # Rounding error of the transform can leave tiny negative values
+    np.clip(pmf, 0.0, None, out=pmf)
+    if size > cap + 1:
+        pmf[cap] = pmf[cap:].sum()
+        pmf = pmf[: cap + 1]
+    return pmf / pmf.sum()
+
+
+def get_session_pmf(spin_pmf: np.ndarray, spins: int, cap: int) -> np.ndarray:
+    """Distribution of the total win over `spins` spins, by binary exponentiation of the single spin distribution."""
+    spin_pmf = spin_pmf[: cap + 1].copy()
+    session_pmf = np.ones(1, dtype=np.float64)
+    while spins > 0:
+        if spins & 1:
+            session_pmf = convolve_capped(session_pmf, spin_pmf, cap)
+        spins >>= 1
+        if spins > 0:
+            spin_pmf = convolve_capped(spin_pmf, spin_pmf, cap)
+    return session_pmf
+
+
+def get_session_statistics(
+    payouts,
+    weights,
+    cost: float,
+    test_spins: list = None,
+    pmb_rtp: float = 1.0,
+    quantiles: list = None,
+    max_session_rtp: float = MAX_SESSION_RTP,
+) -> dict:
+    """
+    Probability of a session returning at least `pmb_rtp` of the amount bet, and quantiles of the session RTP, for
+    each session length. Payouts are in cents. Quantiles above `max_session_rtp` are returned as None.
+    """
+    test_spins = DEFAULT_SESSION_SPINS if test_spins is None else test_spins
+    quantiles = DEFAULT_SESSION_QUANTILES if quantiles is None else quantiles
+    payouts = np.asarray(payouts, dtype=np.int64)
+    weights = np.asarray(weights, dtype=np.float64)
+    step = get_payout_step(payouts)
+    bet_cents = cost * 100
+
+    lattice_payouts = payouts // step
+    statistics = {}
+    for spins in test_spins:
+        session_bet = spins * bet_cents
+        success_index = int(np.ceil(pmb_rtp * session_bet / step - 1e-9))
+        cap = max(int(np.ceil(max_session_rtp * session_bet / step)), success_index) + 1
+        spin_pmf = np.bincount(np.minimum(lattice_payouts, cap), weights=weights, minlength=cap + 1)
+        session_pmf = get_session_pmf(spin_pmf / spin_pmf.sum(), spins, cap)
+
+        cdf = np.cumsum(session_pmf)
+        quantile_index = np.searchsorted(cdf, np.asarray(quantiles) - 1e-12, side="left")
+        statistics[str(spins)] = {
+            "success_prob": float(session_pmf[success_index:].sum()),
+            "rtp_quantiles": {
+                str(q): (float(idx * step / session_bet) if idx < cap else None)
+                for q, idx in zip(quantiles, quantile_index.tolist())
+            },
+        }
+    return statistics
+
+
+def get_lookup_session_statistics(filepath: str, cost: float, **kwargs) -> dict:
+    """Session statistics of a lookup table csv."""
+    lookup_table = load_lookup_table(filepath)
+    return get_session_statistics(lookup_table.payouts, lookup_table.weights, cost, **kwargs)
+
+
+def get_session_score(statistics: dict, test_spins_weights: list) -> float:
+    """Weighted success probability, comparable to the optimizer's simulated score before the prob_less_bet penalty."""
+    success_probs = [spin_statistics["success_prob"] for spin_statistics in statistics.values()]
+    return float(np.dot(success_probs, test_spins_weights))
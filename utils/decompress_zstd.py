@@ -1,7 +1,7 @@
 """Test file decompression and validate data structure is valid JSON."""
 
 import json
-import zstandard as zstd
+from src.write_data.seekable_books import read_all_books
 
 
 def decompress(input_path: str, save_output: bool = False):
@@ -15,10 +15,7 @@ def decompress(input_path: str, save_output: bool = False):
             print("Invalid JSON!")
             raise RuntimeError("Invalid JSON")
 
-    decompressor = zstd.ZstdDecompressor()
-    with open(input_path, "rb") as f:
-        with decompressor.stream_reader(f) as reader:
-            decompressed_data = reader.read().decode("utf-8")
+    decompressed_data = read_all_books(input_path).decode("utf-8")
 
     all_sims = decompressed_data.split("\n")
     for sim in all_sims:
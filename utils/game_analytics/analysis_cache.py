@@ -0,0 +1,52 @@
+"""Cache PAR-sheet results for each bet mode, keyed by the content of the files and parameters used to compute them."""
+
+import os
+import json
+import pickle
+import hashlib
+from src.write_data.file_manifest import FileManifest
+
+ANALYSIS_CACHE_DIR = "analysis_cache"
+# Increment when the structure or calculation of cached results changes
+ANALYSIS_CACHE_VERSION = 2
+
+
+def get_analysis_cache_name(library_path: str, mode: str) -> str:
+    """Cached results filename for a bet mode."""
+    return os.path.join(library_path, ANALYSIS_CACHE_DIR, f"analysis_{mode}.pkl")
+
+
+def get_mode_cache_key(manifest: FileManifest, input_files: list, params: dict) -> str:
+    """SHA-256 of all input file hashes and analysis parameters."""
+    key_object = {
+        "version": ANALYSIS_CACHE_VERSION,
+        "files": [[os.path.basename(f), manifest.get(f)["sha256"]] for f in input_files],
+        "params": params,
+    }
+    return hashlib.sha256(json.dumps(key_object, sort_keys=True, default=str).encode("UTF-8")).hexdigest()
+
+
+def load_cached_results(library_path: str, mode: str, cache_key: str):
+    """Return stored results if they were computed from identical inputs, otherwise None."""
+    cache_name = get_analysis_cache_name(library_path, mode)
+    if not os.path.isfile(cache_name):
+        return None
+    try:
+        with open(cache_name, "rb") as f:
+            cached = pickle.load(f)
+    except (pickle.UnpicklingError, EOFError, AttributeError):
+        return None
+    if cached.get("key") != cache_key:
+        return None
+    return cached["results"]
+
+
+def save_cached_results(library_path: str, mode: str, cache_key: str, results: dict) -> None:
+    """Store results for a bet mode."""
+    cache_name = get_analysis_cache_name(library_path, mode)
+    if not os.path.exists(os.path.dirname(cache_name)):
+        os.makedirs(os.path.dirname(cache_name))
+    temp_name = f"{cache_name}.{os.getpid()}.tmp"
+    with open(temp_name, "wb") as f:
+        pickle.dump({"key": cache_key, "results": results}, f)
+    os.replace(temp_name, cache_name)
@@ -1,140 +1,151 @@
 from src.config.paths import PATH_TO_GAMES
-from collections import defaultdict
 import os
+import numpy as np
+from utils.analysis.lookup_table import load_lookup_table
+
+
+def get_win_range_totals(wins: np.ndarray, weights: np.ndarray, win_ranges: list, first_match: bool = True):
+    """
+    Sum weights of wins falling within each [start, end) win-range.
+
+    Ordered, non-overlapping ranges are bucketed with a single search over the range edges. Otherwise each range is
+    checked in turn, with wins counted in only the first range containing them if `first_match` is set.
+    """
+    wins = np.asarray(wins, dtype=np.float64)
+    weights = np.asarray(weights, dtype=np.float64)
+    starts = np.array([wr[0] for wr in win_ranges], dtype=np.float64)
+    ends = np.array([wr[1] for wr in win_ranges], dtype=np.float64)
+    if len(win_ranges) == 0:
+        return np.zeros(0)
+
+    if np.all(starts <= ends) and np.all(starts[1:] >= ends[:-1]):
+        range_index = np.searchsorted(starts, wins, side="right") - 1
+        in_range = (range_index >= 0) & (wins < ends[np.maximum(range_index, 0)])
+        return np.bincount(range_index[in_range], weights=weights[in_range], minlength=len(win_ranges))
+
+    totals = np.zeros(len(win_ranges))
+    unassigned = np.ones(len(wins), dtype=bool)
+    for idx, (start, end) in enumerate(zip(starts, ends)):
+        in_range = (wins >= start) & (wins < end)
+        if first_match:
+            in_range &= unassigned
+            unassigned &= ~in_range
+        totals[idx] = weights[in_range].sum()
+    return totals
 
 
 def get_unoptimized_hits(lut_path, all_modes, win_ranges):
     """Calculate hit-rates of simulation output lookup table."""
-    all_modes_base_dist = defaultdict(lambda: defaultdict(int))
-    total_mode_count = {}
+    all_modes_hit_rates, all_modes_range_hits = {}, {}
     for mode in all_modes:
         base_lut_file = os.path.join(lut_path, "lookUpTable_" + str(mode) + ".csv")
-        lut = open(base_lut_file, "r", encoding="UTF-8")
-        counter = 0
-        for line in lut:
-            _, _, payout = line.strip().split(",")
-            all_modes_base_dist[mode][float(round(int(payout) / 100, 2))] += 1
-            counter += 1
+        payouts, counts = np.unique(load_lookup_table(base_lut_file).payouts, return_counts=True)
+        range_hits = get_win_range_totals(payouts / 100, counts, win_ranges)
+        total_mode_count = int(counts.sum())
 
-        total_mode_count[mode] = counter
-
-    # Segregate to win-ranges
-    all_modes_range_hits = {}
-    for mode in all_modes:
-        all_modes_range_hits[mode] = {}
-        for wr in win_ranges:
-            all_modes_range_hits[mode][wr] = 0
-
-        for payout in list(all_modes_base_dist[mode].keys()):
-            for wr in win_ranges:
-                if payout >= wr[0] and payout < wr[1]:
-                    all_modes_range_hits[mode][wr] += all_modes_base_dist[mode][payout]
-                    break
-
-    all_modes_hit_rates = {}
-    for mode in all_modes:
-        all_modes_hit_rates[mode] = {}
-        for wr in win_ranges:
+        all_modes_hit_rates[mode], all_modes_range_hits[mode] = {}, {}
+        for wr, hits in zip(win_ranges, range_hits.tolist()):
+            all_modes_range_hits[mode][wr] = int(hits)
             try:
-                all_modes_hit_rates[mode][wr] = round(
-                    1 / (all_modes_range_hits[mode][wr] / total_mode_count[mode]), 3
-                )
+                all_modes_hit_rates[mode][wr] = round(1 / (int(hits) / total_mode_count), 3)
             except ZeroDivisionError:
                 all_modes_hit_rates[mode][wr] = 0
     return all_modes_hit_rates, all_modes_range_hits
 
 
+def read_split_file(split_file, base_mode_name="basegame"):
+    """
+    Read `id,criteria,basewin,freewin` rows of a segmented lookup table.
+
+    Returns the unique criteria names (with criteria "0" renamed to the base mode), the index into these names for
+    each row, and the base and free game win arrays.
+    """
+    with open(split_file, "r", encoding="UTF-8") as f:
+        text = f.read().replace("\r", "").strip()
+    columns = text.replace("\n", ",").split(",") if len(text) > 0 else []
+    if len(columns) % 4 != 0:
+        raise ValueError(f"Malformed split file, expected rows of [id,criteria,basewin,freewin]: {split_file}")
+
+    fence_names, fence_index = np.unique(np.array(columns[1::4], dtype=str), return_inverse=True)
+    fence_names = [base_mode_name if name == "0" else name for name in fence_names.tolist()]
+    fence_names, name_index = np.unique(np.array(fence_names, dtype=str), return_inverse=True)
+    base_wins = np.array(columns[2::4], dtype=np.float64)
+    free_wins = np.array(columns[3::4], dtype=np.float64)
+
+    return fence_names.tolist(), name_index[fence_index], base_wins, free_wins
+
+
+def get_grouped_weights(wins: np.ndarray, weights: np.ndarray) -> dict:
+    """Sum weights of identical wins into a {win: weight} dictionary ordered by win."""
+    unique_wins, inverse = np.unique(wins, return_inverse=True)
+    summed_weights = np.bincount(inverse, weights=weights, minlength=len(unique_wins))
+    return dict(zip(unique_wins.tolist(), summed_weights.tolist()))
+
+
 def make_split_win_distribution(lut_file, split_file, all_modes, base_mode_name="basegame"):
-    """Separate probability information for different game-types."""
-    combined_distributions = defaultdict(lambda: defaultdict(float))
+    """
+    Separate probability information for different game-types.
+
+    The base game distribution is made from the base game win of every row. Each free game mode uses the free game
+    wins of rows with that criteria, along with rows from the base game and wincap criteria (which are shared across
+    all free game modes).
+    """
     all_modes.append("cumulative")
-    split = open(split_file, "r", encoding="UTF-8")
-    lut = open(lut_file, "r", encoding="UTF-8")
-
-    all_base, all_free, all_fences = [], [], []
-    for line in split:
-        idx, idv_fence, base_win, free_win = line.strip().split(",")
-        all_base.append(float(base_win))
-        all_free.append(float(free_win))
-        if str(idv_fence) == "0":
-            idv_fence = base_mode_name
-        all_fences.append(str(idv_fence))
-
-    all_weights = []
-    for line in lut:
-        _, weight, _ = line.strip().split(",")
-        all_weights.append(int(weight))
-    total_lut_weight = int(sum(all_weights))
+    fence_names, fence_index, base_wins, free_wins = read_split_file(split_file, base_mode_name)
+
+    lookup_table = load_lookup_table(lut_file)
+    weights = lookup_table.weights.astype(np.float64)
+    total_lut_weight = lookup_table.total_weight
 
     # Ensure arrays have matching lengths (LUT and split file should match)
-    if len(all_weights) != len(all_base):
+    if len(weights) != len(base_wins):
         raise ValueError(
-            f"Length mismatch: LUT file has {len(all_weights)} entries, "
-            f"but split file has {len(all_base)} entries. "
+            f"Length mismatch: LUT file has {len(weights)} entries, "
+            f"but split file has {len(base_wins)} entries. "
             f"LUT: {lut_file}, Split: {split_file}. "
             f"This usually means the optimized lookup table doesn't match the split file. "
             f"Regenerate books or regenerate split file."
         )
 
-    for idx, _ in enumerate(all_weights):
-        if base_mode_name in all_modes:
-            combined_distributions[base_mode_name][all_base[idx]] += all_weights[idx]
-
-        if all_fences[idx] != base_mode_name and all_fences[idx] != "wincap":
-            combined_distributions[all_fences[idx]][all_free[idx]] += all_weights[idx]
-        else:
-            for mode in all_modes:
-                if mode != base_mode_name and mode != "cumulative":
-                    combined_distributions[mode][all_free[idx]] += all_weights[idx]
-            if (all_free[idx] != 0) and (all_fences[idx] == base_mode_name):
-                raise ValueError("Non-Zero FreeGame win in baseGame Fence.")
-
-        # Construct cumulative hit-rate data
-        combined_distributions["cumulative"][all_base[idx] + all_free[idx]] += all_weights[idx]
+    shared_names = [base_mode_name, "wincap"]
+    shared_rows = np.isin(fence_index, [idx for idx, name in enumerate(fence_names) if name in shared_names])
+    if base_mode_name in fence_names:
+        base_rows = fence_index == fence_names.index(base_mode_name)
+        if np.any(free_wins[base_rows] != 0):
+            raise ValueError("Non-Zero FreeGame win in baseGame Fence.")
 
-    # Sort all dictionaries by payout
-    all_sorted_payouts = {}
     all_sorted_distributions = {}
     for mode in all_modes:
-        all_sorted_payouts[mode] = sorted(list(combined_distributions[mode].keys()))
-        all_sorted_distributions[mode] = {}
-
-    for mode in all_modes:
-        mode_pays = list(all_sorted_payouts[mode])
-        for pay in mode_pays:
-            all_sorted_distributions[mode][pay] = combined_distributions[mode][pay]
+        if mode == "cumulative":
+            all_sorted_distributions[mode] = get_grouped_weights(base_wins + free_wins, weights)
+        elif mode == base_mode_name:
+            all_sorted_distributions[mode] = get_grouped_weights(base_wins, weights)
+        else:
+            mode_rows = shared_rows
+            if mode in fence_names and mode not in shared_names:
+                mode_rows = shared_rows | (fence_index == fence_names.index(mode))
+            all_sorted_distributions[mode] = get_grouped_weights(free_wins[mode_rows], weights[mode_rows])
 
     return all_sorted_distributions, total_lut_weight
 
 
 def return_hit_rates(all_mode_distributions, total_weight, win_ranges, mode_cost):
     """Calculate hit-rates for game-type specific types."""
-    all_modes = list(all_mode_distributions.keys())
     all_mode_probs = {}
     all_mode_hits = {}
     all_mode_rtps = {}
-    for mode in all_modes:
-        all_mode_probs[mode] = {}
-        all_mode_hits[mode] = {}
-        all_mode_rtps[mode] = {}
-
-    for w in win_ranges:
-        for mode in all_modes:
-            all_mode_probs[mode][w] = 0
-            all_mode_rtps[mode][w] = 0
-
-    for mode in all_modes:
-        mode_wins = list(all_mode_distributions[mode].keys())
-        for win in mode_wins:
-            for win_range in win_ranges:
-                if win >= win_range[0] and win < win_range[1]:
-                    all_mode_probs[mode][win_range] += all_mode_distributions[mode][win] / total_weight
-                    all_mode_rtps[mode][win_range] += win * (all_mode_distributions[mode][win] / total_weight)
-                    continue
-
-        for win_range in win_ranges:
+    for mode, distribution in all_mode_distributions.items():
+        wins = np.fromiter(distribution.keys(), dtype=np.float64, count=len(distribution))
+        probs = np.fromiter(distribution.values(), dtype=np.float64, count=len(distribution)) / total_weight
+        range_probs = get_win_range_totals(wins, probs, win_ranges, first_match=False)
+        range_rtps = get_win_range_totals(wins, wins * probs, win_ranges, first_match=False)
+
+        all_mode_probs[mode], all_mode_hits[mode], all_mode_rtps[mode] = {}, {}, {}
+        for win_range, prob, rtp in zip(win_ranges, range_probs.tolist(), range_rtps.tolist()):
+            all_mode_probs[mode][win_range] = prob
+            all_mode_rtps[mode][win_range] = rtp
             try:
-                all_mode_hits[mode][win_range] = round((1 / (all_mode_probs[mode][win_range])), 3)
+                all_mode_hits[mode][win_range] = round((1 / prob), 3)
                 all_mode_rtps[mode][win_range] /= mode_cost
             except ZeroDivisionError:
                 all_mode_hits[mode][win_range] = "NaN"
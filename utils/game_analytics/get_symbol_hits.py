@@ -1,8 +1,10 @@
 """Analyze symbol hit-rates"""
 
-import json
 import os
+import numpy as np
 from src.config.paths import PATH_TO_GAMES
+from utils.analysis.lookup_table import load_lookup_table
+from utils.search_tool.force_index import ForceIndex
 
 
 class HitRateCalculations:
@@ -22,37 +24,23 @@ class HitRateCalculations:
         lut_file = os.path.join(
             PATH_TO_GAMES, self.game_id, "library", "publish_files", f"lookUpTable_{self.mode}_0.csv"
         )
-        with open(force_file, "r", encoding="UTF-8") as f:
-            file_dict = json.load(f)
-            all_keys = [d.keys() for d in file_dict]
-        f.close()
-
-        lut_ids = []
-        weights = []
-        payouts = []
-        with open(lut_file, "r", encoding="UTF-8") as f:
-            for line in f:
-                lut_ids.append(int(line.strip().split(",")[0]))
-                weights.append(int(line.strip().split(",")[1]))
-                payouts.append(float(line.strip().split(",")[2]))
-        f.close()
-
-        # Create a mapping from book ID to index in the arrays
-        self.id_to_index = {book_id: idx for idx, book_id in enumerate(lut_ids)}
-        self.weights = weights
-        self.total_weight = sum(self.weights)
-        self.payouts = payouts
-        self.force_dict = file_dict
-        self.all_keys = all_keys
+        self.force_index = ForceIndex.from_file(force_file)
+        self.force_dict = self.force_index.force_record
+        self.all_keys = [d.keys() for d in self.force_dict]
+
+        self.lookup_table = load_lookup_table(lut_file)
+        self.weights = self.lookup_table.weights
+        self.total_weight = self.lookup_table.total_weight
+        self.payouts = self.lookup_table.payouts.astype(np.float64)
+
+    def get_lookup_rows(self, unique_ids) -> np.ndarray:
+        """Lookup table rows of the given simulation ids, skipping ids not in the table."""
+        rows = self.lookup_table.get_id_index(unique_ids)
+        return rows[rows >= 0]
 
     def get_hit_rates(self, unique_ids: list) -> float:
         """Get hit-rates using inverse probabilities from optimized lookup tables."""
-        cumulative_weight = 0
-        for idx in unique_ids:
-            # Use the mapping to get the correct index, or skip if ID not found
-            if idx in self.id_to_index:
-                array_idx = self.id_to_index[idx]
-                cumulative_weight += self.weights[array_idx]
+        cumulative_weight = int(np.sum(self.weights[self.get_lookup_rows(unique_ids)], dtype=np.uint64))
 
         prob = cumulative_weight / self.total_weight
         try:
@@ -62,48 +50,22 @@ class HitRateCalculations:
 
     def get_av_wins(self, unique_ids: list) -> float:
         """Return average win amount for a specified list of simulation ids."""
-        search_key_tot_weight = 0
+        rows = self.get_lookup_rows(unique_ids)
         # find out the total payout and weights from the force keys subset of the lookup table
-        for id in unique_ids:
-            if id in self.id_to_index:
-                array_idx = self.id_to_index[id]
-                search_key_tot_weight += self.weights[array_idx]
-        average_win = 0
-        # multiply each win in the subset of lookup table by the ratio of its weight to normalize the avg payout
-        for id in unique_ids:
-            if id in self.id_to_index:
-                array_idx = self.id_to_index[id]
-                norm_payout = self.payouts[array_idx] * (self.weights[array_idx] / search_key_tot_weight if search_key_tot_weight > 0 else 0)
-                average_win += norm_payout
-        try:
-            return average_win
-        except ZeroDivisionError:
+        subset_weights = self.weights[rows].astype(np.float64)
+        search_key_tot_weight = subset_weights.sum()
+        if search_key_tot_weight == 0:
             return 0
+        # multiply each win in the subset of lookup table by the ratio of its weight to normalize the avg payout
+        return float(np.dot(self.payouts[rows], subset_weights) / search_key_tot_weight)
 
     def get_sim_count(self, search_key: dict) -> int:
         """Get raw sim count with partial or complete matches to force file keys."""
-        search_key_count = 0
-        for key in self.force_dict:
-            transform_dict = {}
-            for i in key["search"]:
-                transform_dict[i["name"]] = i["value"]
-            if all(transform_dict.get(x) == y for x, y in search_key.items()):
-                search_key_count += key["timesTriggered"]
-        return search_key_count
-
-    def return_valid_ids(self, search_key) -> list:
-        """Extract all ids with a partial match to search conditions."""
-        valid_ids = []
-        for item in self.force_dict:
-            transform_dict = {}
-            for i in item["search"]:
-                transform_dict[i["name"]] = str(i["value"])
+        return self.force_index.get_times_triggered(search_key)
 
-            if all(transform_dict.get(k) == v for k, v in search_key.items()):
-                validIDs = item["bookIds"]
-                valid_ids.extend(validIDs)
-
-        return valid_ids
+    def return_valid_ids(self, search_key) -> np.ndarray:
+        """Extract all ids with a partial match to search conditions."""
+        return self.force_index.get_entry_book_ids(search_key)
 
 
 def construct_symbol_keys(config) -> list:
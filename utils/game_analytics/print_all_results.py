@@ -4,11 +4,25 @@ Note: The PrintXLSX class assumes the use of 'symbol' and 'kind' keys within the
 """
 
 import json
-import xlsxwriter
 import os
+import heapq
+import itertools
+import xlsxwriter
 
 from src.config.paths import PATH_TO_GAMES
 
+JSON_SUMMARIES = [
+    "cost_mapping",
+    "mode_fence_info",
+    "hr_summary",
+    "av_win_summary",
+    "sim_count_summary",
+    "custom_hr_summary",
+    "custom_av_win_summary",
+    "custom_sim_count_summary",
+    "session_summary",
+]
+
 
 class PrintJSON:
     """Parse json-format PAR-sheet information."""
@@ -21,37 +35,175 @@ class PrintJSON:
 
     def setup_json(self):
         """Create new JSON format file for storing PAR sheet results."""
-        json_path = os.path.join(
-            self.game_info.libraryPath, "statistics_summary.json")
+        json_path = os.path.join(self.game_info.libraryPath, "statistics_summary.json")
         self.json_object = open(json_path, "w", encoding="UTF-8")
 
+    def write_entry(self, key, value, level: int, first: bool) -> None:
+        """Write a single `"key": value` pair, indented to match json.dump(indent=4) at the given nesting level."""
+        indent = " " * 4 * level
+        value_str = json.dumps(value, indent=4).replace("\n", "\n" + indent)
+        self.json_object.write(("\n" if first else ",\n") + indent + json.dumps(str(key)) + ": " + value_str)
+
     def print_info(self):
-        """Parse game information in JSON format."""
-        data = {
-            "cost_mapping": self.game_info.cost_mapping,
-            "mode_fence_info": self.game_info.mode_fence_info,
-            "hr_summary": self.game_info.hr_summary,
-            "av_win_summary": self.game_info.av_win_summary,
-            "sim_count_summary": self.game_info.sim_count_summary,
-            "custom_hr_summary": self.game_info.custom_hr_summary,
-            "custom_av_win_summary": self.game_info.custom_av_win_summary,
-            "custom_sim_count_summary": self.game_info.custom_sim_count_summary,
-        }
-        # Add indent for pretty-printing
-        json.dump(data, self.json_object, indent=4)
+        """Parse game information in JSON format, writing each mode's section in turn."""
+        self.json_object.write("{")
+        for summary_idx, summary in enumerate(JSON_SUMMARIES):
+            mode_summaries = getattr(self.game_info, summary)
+            if len(mode_summaries) == 0:
+                self.write_entry(summary, {}, 1, summary_idx == 0)
+                continue
+            self.json_object.write(("\n" if summary_idx == 0 else ",\n") + " " * 4 + json.dumps(summary) + ": {")
+            for mode_idx, (mode, mode_summary) in enumerate(mode_summaries.items()):
+                self.write_entry(mode, mode_summary, 2, mode_idx == 0)
+            self.json_object.write("\n" + " " * 4 + "}")
+        self.json_object.write("\n}")
+
+
+def iter_row(row: int, col: int, values: list):
+    """Cells of consecutive values in a row, as (row, col, value)."""
+    for idx, value in enumerate(values):
+        yield row, col + idx, value
+
+
+def get_mode_info(game_info, mode: str) -> dict:
+    """Statistics required to lay out a single mode's worksheet."""
+    return {
+        "mode_hit_rate_info": game_info.mode_hit_rate_info[mode],
+        "mode_hit_counts": game_info.mode_hit_counts[mode],
+        "hr_summary": game_info.hr_summary.get(mode, {}),
+        "sim_count_summary": game_info.sim_count_summary.get(mode, {}),
+        "av_win_summary": game_info.av_win_summary.get(mode, {}),
+        "custom_hr_summary": game_info.custom_hr_summary.get(mode, {}),
+        "custom_sim_count_summary": game_info.custom_sim_count_summary.get(mode, {}),
+        "custom_av_win_summary": game_info.custom_av_win_summary.get(mode, {}),
+    }
+
+
+def get_symbol_tables(mode_info: dict) -> tuple:
+    """Symbols, kinds and (title, {symbol: {kind: value}}) tables of symbol combination statistics."""
+    sym_mode_hit_rate = mode_info["hr_summary"]
+    sym_count_hit_rate = mode_info["sim_count_summary"]
+    sym_avg_win = mode_info["av_win_summary"]
+
+    symbols, kinds = [], []
+    for key in list(sym_mode_hit_rate.keys()):
+        temp_kind = eval(key)["kind"]
+        temp_symbol = eval(key)["symbol"]
+        if temp_symbol not in symbols:
+            symbols.append(temp_symbol)
+        if temp_kind not in kinds:
+            kinds.append(temp_kind)
+
+    freq_dict = {}
+    count_dict = {}
+    av_dict = {}
+    for sym in symbols:
+        freq_dict[sym] = {}
+        count_dict[sym] = {}
+        av_dict[sym] = {}
+        for kind in kinds:
+            freq_dict[sym][kind] = 0
+            count_dict[sym][kind] = 0
+            av_dict[sym][kind] = 0
+
+    for key in list(sym_mode_hit_rate.keys()):
+        temp_sym = eval(key)["symbol"]
+        temp_kind = eval(key)["kind"]
+        freq_dict[temp_sym][temp_kind] = round(sym_mode_hit_rate[key], 2)
+        count_dict[temp_sym][temp_kind] = int(sym_count_hit_rate[key])
+        av_dict[temp_sym][temp_kind] = round(sym_avg_win[key], 1)
+
+    return symbols, kinds, [("HIT RATES", freq_dict), ("SIM COUNTS", count_dict), ("AVG WINS", av_dict)]
+
+
+def iter_mode_probs(mode_info: dict, win_ranges: list, x0: int, y0: int):
+    """Main info: rtp-allocation and hit-rates."""
+    yield from iter_row(x0, y0, ["Win Ranges", "Hit Rates", "RTP Allocation"])
+    hr_dict = mode_info["mode_hit_rate_info"]["all_gameType_hits"]["cumulative"]
+    rtp_dict = mode_info["mode_hit_rate_info"]["all_gameType_rtp"]["cumulative"]
+    for idx, win_range in enumerate(win_ranges):
+        yield from iter_row(x0 + idx + 1, y0, [str(win_range), hr_dict[win_range], rtp_dict[win_range]])
+
+
+def iter_game_type_hits(mode_info: dict, game_types: list, win_ranges: list, x0: int, y0: int):
+    """Hit-rate table by game-mode."""
+    yield from iter_row(x0, y0 + 1, game_types)
+    hr_dict = mode_info["mode_hit_rate_info"]["all_gameType_hits"]
+    for idx, win_range in enumerate(win_ranges):
+        yield from iter_row(
+            x0 + idx + 1, y0, [str(win_range)] + [str(hr_dict[game_type][win_range]) for game_type in game_types]
+        )
+
+
+def iter_symbol_table(title: str, table_dict: dict, symbols: list, kinds: list, x0: int, y0: int):
+    """Symbol combination table, with a row per symbol and a column per kind."""
+    yield x0 - 1, y0, title
+    yield from iter_row(x0, y0 + 1, kinds)
+    for idSym, sym in enumerate(symbols):
+        yield from iter_row(x0 + idSym + 1, y0, [str(sym)] + [table_dict[sym][kind] for kind in kinds])
+
+
+def iter_range_hit_counts(mode_info: dict, x0: int, y0: int):
+    """Simulation counts."""
+    range_hit_counts = mode_info["mode_hit_counts"]
+    yield from iter_row(x0, y0, ["Win Ranges", "SIM COUNTS"])
+    for idx, key in enumerate(list(range_hit_counts.keys())):
+        yield from iter_row(x0 + idx + 1, y0, [str(key), range_hit_counts[key]])
+
+
+def iter_custom_key_info(mode_info: dict, row_start: int):
+    """Summary win information for user-defined search keys."""
+    custom_hr = mode_info["custom_hr_summary"]
+    custom_count = mode_info["custom_sim_count_summary"]
+    custom_avg = mode_info["custom_av_win_summary"]
+    # write hr, sim_count, av_win
+    yield row_start, 0, str("CUSTOM")
+    yield from iter_row(row_start + 1, 1, ["HR", "COUNT", "AVG"])
+    for idx, key in enumerate(list(custom_hr.keys())):
+        yield from iter_row(
+            row_start + 2 + idx, 0, [str(key), str(custom_hr[key]), str(custom_count[key]), str(custom_avg[key])]
+        )
+
+
+def iter_mode_cells(mode_info: dict, win_ranges: list):
+    """
+    All (row, col, value) cells of a mode's worksheet, in row then column order as required by constant memory
+    mode. Tables placed side by side are merged as their cells are produced, so no table is held in memory.
+    """
+    game_types = list(mode_info["mode_hit_rate_info"]["all_gameType_rtp"].keys())[:-1]
+    game_col_start = 5
+    top_row_col_end = game_col_start + 3 + len(game_types)
+    symbols, kinds, symbol_tables = get_symbol_tables(mode_info)
+    sym_row = len(win_ranges) + 5
+
+    tables = [
+        iter_mode_probs(mode_info, win_ranges, 0, 0),
+        iter_game_type_hits(mode_info, game_types, win_ranges, 0, game_col_start),
+    ]
+    for idx, (title, table_dict) in enumerate(symbol_tables):
+        tables.append(iter_symbol_table(title, table_dict, symbols, kinds, sym_row, idx * (len(kinds) + 3)))
+    tables.append(iter_range_hit_counts(mode_info, 0, top_row_col_end))
+    tables.append(iter_custom_key_info(mode_info, sym_row + len(symbols) + 5))
+    # Where tables overlap, the cell of the last table listed is kept
+    cells = heapq.merge(*tables, key=lambda cell: cell[:2])
+    for (row, col), position_cells in itertools.groupby(cells, key=lambda cell: cell[:2]):
+        yield row, col, list(position_cells)[-1][2]
 
 
 class PrintXLSX:
-    """Print summary Excel file."""
+    """
+    Print summary Excel file.
+    Worksheets are written in constant memory mode, with each mode's cells streamed to the file in row order.
+    """
 
     def __init__(self, game_info):
         self.game_info = game_info
         self.global_ranges = list(self.game_info.win_ranges)
         self.setup_xlsx()
         for mode in self.game_info.all_modes:
-            self.write_mode_probs(str(mode), 0, 0)
-            self.write_range_hit_counts(str(mode), 0, self.top_row_col_end)
-            self.write_custom_key_info(str(mode), self.last_row_end + 2)
+            worksheet = self.workbook.add_worksheet(str(mode))
+            for row, col, value in iter_mode_cells(get_mode_info(self.game_info, str(mode)), self.global_ranges):
+                worksheet.write(row, col, value)
         self.workbook.close()
 
     def setup_xlsx(self):
@@ -62,149 +214,4 @@ class PrintXLSX:
             "library",
             f"{self.game_info.game_id}_full_statistics.xlsx",
         )
-        self.workbook = xlsxwriter.Workbook(self.stat_file_name)
-
-    def write_mode_probs(self, mode, x0, y0):
-        """Write hit-rate information within its own Excel Worksheet."""
-        # Main info: rtp-allocation and hit-rates
-        self.hit_rate_sheet = self.workbook.add_worksheet(str(mode))
-        headers = ["Win Ranges", "Hit Rates", "RTP Allocation"]
-        self.hit_rate_sheet.write_row(0, 0, headers)
-        hr_dict = self.game_info.mode_hit_rate_info[mode]["all_gameType_hits"]["cumulative"]
-        rtp_dict = self.game_info.mode_hit_rate_info[mode]["all_gameType_rtp"]["cumulative"]
-        for idx, win_range in enumerate(self.global_ranges):
-            self.hit_rate_sheet.write(x0 + idx + 1, y0, str(win_range))
-            self.hit_rate_sheet.write(x0 + idx + 1, y0 + 1, hr_dict[win_range])
-            self.hit_rate_sheet.write(
-                x0 + idx + 1, y0 + 2, list(rtp_dict.values())[idx])
-
-        # Hit-rate table by game-mode
-        game_headers = list(
-            self.game_info.mode_hit_rate_info[mode]["all_gameType_rtp"].keys())
-        game_headers_reduced = game_headers[:-1]
-        game_col_start = y0 + 5
-        self.hit_rate_sheet.write_row(
-            x0, game_col_start + 1, game_headers_reduced)
-
-        hr_dict = self.game_info.mode_hit_rate_info[mode]["all_gameType_hits"]
-        rtp_dict = self.game_info.mode_hit_rate_info[mode]["all_gameType_rtp"]
-
-        for idx, win_range in enumerate(self.global_ranges):
-            self.hit_rate_sheet.write(
-                x0 + idx + 1, game_col_start, str(win_range))
-            for idy, game_type in enumerate(game_headers_reduced):
-                # print(hr_dict[game_type][list(self.global_ranges)[idx]])
-                self.hit_rate_sheet.write(
-                    x0 + idx + 1, game_col_start + 1 +
-                    idy, str(hr_dict[game_type][list(self.global_ranges)[idx]])
-                )
-
-        # Write symbol hit-rate table
-        symRow = len(self.global_ranges) + 5
-        symCol = 0
-        self.top_row_col_end = game_col_start + 4 + idy
-        sym_mode_hit_rate = self.game_info.hr_summary[mode]
-        sym_count_hit_rate = self.game_info.sim_count_summary[mode]
-        sym_avg_win = self.game_info.av_win_summary[mode]
-
-        symbols, kinds = [], []
-        for key in list(sym_mode_hit_rate.keys()):
-            temp_kind = eval(key)["kind"]
-            temp_symbol = eval(key)["symbol"]
-            if temp_symbol not in symbols:
-                symbols.append(temp_symbol)
-            if temp_kind not in kinds:
-                kinds.append(temp_kind)
-
-        freq_dict = {}
-        count_dict = {}
-        av_dict = {}
-        for sym in symbols:
-            freq_dict[sym] = {}
-            count_dict[sym] = {}
-            av_dict[sym] = {}
-            for kind in kinds:
-                freq_dict[sym][kind] = 0
-                count_dict[sym][kind] = 0
-                av_dict[sym][kind] = 0
-
-        for key in list(sym_mode_hit_rate.keys()):
-            temp_sym = eval(key)["symbol"]
-            temp_kind = eval(key)["kind"]
-            freq_dict[temp_sym][temp_kind] = round(sym_mode_hit_rate[key], 2)
-            count_dict[temp_sym][temp_kind] = int(sym_count_hit_rate[key])
-            av_dict[temp_sym][temp_kind] = round(sym_avg_win[key], 1)
-
-        # Symbol combination hit-rates
-        self.hit_rate_sheet.write(symRow - 1, symCol, str("HIT RATES"))
-        for idSym, sym in enumerate(symbols):
-            self.hit_rate_sheet.write(symRow + idSym + 1, symCol, str(sym))
-        for idKind, kind in enumerate(kinds):
-            self.hit_rate_sheet.write(symRow, symCol + 1 + idKind, kind)
-            for idSym, sym in enumerate(symbols):
-                self.hit_rate_sheet.write(
-                    symRow + idSym + 1, symCol + idKind + 1, freq_dict[sym][kind])
-
-        self.last_row_end = symRow + idSym + 1
-        self.last_col_end = symCol + idKind + 4
-
-        # Write number valid sim counts
-        self.hit_rate_sheet.write(
-            symRow - 1, symCol + self.last_col_end, str("SIM COUNTS"))
-        for idSym, sym in enumerate(symbols):
-            self.hit_rate_sheet.write(
-                symRow + idSym + 1, symCol + self.last_col_end, str(sym))
-        for idKind, kind in enumerate(kinds):
-            self.hit_rate_sheet.write(
-                symRow, symCol + 1 + idKind + self.last_col_end, kind)
-            for idSym, sym in enumerate(symbols):
-                self.hit_rate_sheet.write(
-                    symRow + idSym + 1, symCol + idKind + 1 +
-                    self.last_col_end, count_dict[sym][kind]
-                )
-
-        self.last_col_end += symCol + idKind + 4
-        # Write Avg Win for valid symbol combination
-        self.hit_rate_sheet.write(
-            symRow - 1, symCol + self.last_col_end, str("AVG WINS"))
-        for idSym, sym in enumerate(symbols):
-            self.hit_rate_sheet.write(
-                symRow + idSym + 1, symCol + self.last_col_end, str(sym))
-        for idKind, kind in enumerate(kinds):
-            self.hit_rate_sheet.write(
-                symRow, symCol + 1 + idKind + self.last_col_end, kind)
-            for idSym, sym in enumerate(symbols):
-                self.hit_rate_sheet.write(
-                    symRow + idSym + 1, symCol + idKind + 1 +
-                    self.last_col_end, av_dict[sym][kind]
-                )
-
-        self.last_row_end = symRow + idSym + 4
-
-    def write_range_hit_counts(self, mode, x0, y0):
-        """Write simulation counts to Excel sheet."""
-        range_hit_counts = self.game_info.mode_hit_counts
-        self.hit_rate_sheet.write(x0, y0, "Win Ranges")
-        self.hit_rate_sheet.write(x0, y0 + 1, "SIM COUNTS")
-        for idx, key in enumerate(list(range_hit_counts[mode].keys())):
-            self.hit_rate_sheet.write(x0 + idx + 1, y0, str(key))
-            self.hit_rate_sheet.write(
-                x0 + 1 + idx, y0 + 1, range_hit_counts[mode][key])
-
-    def write_custom_key_info(self, mode, row_start):
-        """Write summary win information for user-defined search keys."""
-        custom_hr = self.game_info.custom_hr_summary[mode]
-        custom_count = self.game_info.custom_sim_count_summary[mode]
-        custom_avg = self.game_info.custom_av_win_summary[mode]
-        custom_keys = list(custom_hr.keys())
-        # write hr, sim_count, av_win
-        self.hit_rate_sheet.write(row_start, 0, str("CUSTOM"))
-        self.hit_rate_sheet.write_row(row_start + 1, 1, ["HR", "COUNT", "AVG"])
-        for idx, key in enumerate(custom_keys):
-            self.hit_rate_sheet.write(row_start + 2 + idx, 0, str(key))
-            self.hit_rate_sheet.write(
-                row_start + 2 + idx, 1, str(custom_hr[key]))
-            self.hit_rate_sheet.write(
-                row_start + 2 + idx, 2, str(custom_count[key]))
-            self.hit_rate_sheet.write(
-                row_start + 2 + idx, 3, str(custom_avg[key]))
+        self.workbook = xlsxwriter.Workbook(self.stat_file_name, {"constant_memory": True})
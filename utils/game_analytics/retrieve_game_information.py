@@ -2,14 +2,23 @@ import json
 import importlib
 import sys
 import os
+from multiprocessing import Pool
 
+from src.config.paths import PATH_TO_GAMES
+from src.write_data.file_manifest import FileManifest
+from utils.analysis.session_statistics import get_lookup_session_statistics
+from .analysis_cache import get_mode_cache_key, load_cached_results, save_cached_results
 from .get_pay_splits import (
     return_all_filepaths,
     make_split_win_distribution,
     return_hit_rates,
     get_unoptimized_hits,
 )
-from .get_symbol_hits import construct_symbol_probabilities, construct_custom_key_probabilities
+from .get_symbol_hits import (
+    construct_symbol_keys,
+    construct_symbol_probabilities,
+    construct_custom_key_probabilities,
+)
 
 
 def get_config_class(game_id):
@@ -22,10 +31,73 @@ def get_config_class(game_id):
     return config_class()
 
 
+def analyse_mode(
+    game_id: str,
+    mode: str,
+    sub_modes: list,
+    win_ranges: list,
+    mode_cost: float,
+    lut_path: str,
+    custom_keys=None,
+    session_args: dict = None,
+) -> dict:
+    """
+    Compute all PAR-sheet information for a single bet mode.
+    Symbol and custom key statistics, and session statistics of the published lookup table, are only computed if
+    `custom_keys` is not None. Session lengths and success threshold are given by `session_args` (`test_spins` and
+    `pmb_rtp`), defaulting to those of `get_session_statistics`.
+    """
+    results = {}
+    split_lut_path, split_path = return_all_filepaths(game_id, mode)
+    mode_sorted_distributions, total_mode_weight = make_split_win_distribution(
+        split_lut_path, split_path, list(sub_modes), "basegame"
+    )
+    sub_mode_hits, sub_mode_probs, sub_mode_rtp_allocation = return_hit_rates(
+        mode_sorted_distributions, total_mode_weight, win_ranges, mode_cost
+    )
+    results["mode_hit_rate_info"] = {
+        "all_gameType_hits": sub_mode_hits,
+        "all_gameType_probs": sub_mode_probs,
+        "all_gameType_rtp": sub_mode_rtp_allocation,
+    }
+
+    mode_hit_rates, mode_hit_counts = get_unoptimized_hits(lut_path, [mode], win_ranges)
+    results["mode_hit_rates"] = mode_hit_rates[mode]
+    results["mode_hit_counts"] = mode_hit_counts[mode]
+
+    if custom_keys is not None:
+        config = get_config_class(game_id)
+        hr_summary, av_win_summary, sim_count_summary = construct_symbol_probabilities(config, [mode])
+        results["hr_summary"] = hr_summary[mode]
+        results["av_win_summary"] = av_win_summary[mode]
+        results["sim_count_summary"] = sim_count_summary[mode]
+        hr_summary, av_win_summary, sim_count_summary = construct_custom_key_probabilities(
+            config, [mode], custom_keys
+        )
+        results["custom_hr_summary"] = hr_summary[mode]
+        results["custom_av_win_summary"] = av_win_summary[mode]
+        results["custom_sim_count_summary"] = sim_count_summary[mode]
+        results["session_summary"] = get_lookup_session_statistics(
+            os.path.join(PATH_TO_GAMES, game_id, "library", "publish_files", f"lookUpTable_{mode}_0.csv"),
+            mode_cost,
+            **(session_args or {}),
+        )
+
+    return results
+
+
 class GameInformation:
     """Import game configuration details."""
 
-    def __init__(self, gamestate: object, analysis_ranges=None, modes_to_analyse=None, custom_keys=None):
+    def __init__(
+        self,
+        gamestate: object,
+        analysis_ranges=None,
+        modes_to_analyse=None,
+        custom_keys=None,
+        use_cache: bool = True,
+        num_processes: int = None,
+    ):
         self.game_id = gamestate.config.game_id
         self.modes_to_analyse = modes_to_analyse
         self.config_path = gamestate.output_files.configs["paths"]["be_config"]
@@ -34,6 +106,7 @@ class GameInformation:
         self.libraryPath = gamestate.output_files.library_path
         self.lutPath = gamestate.output_files.lookup_path
         self.finalLUTPath = gamestate.output_files.final_lookup_path
+        self.opt_params = getattr(gamestate.config, "opt_params", None) or {}
 
         if custom_keys is None:
             self.custom_keys = [{}]
@@ -84,13 +157,85 @@ class GameInformation:
             self.modes_to_analyse = self.all_modes
 
         self.get_criteria_info()
-
-        self.get_mode_split_hit_rates()
-        self.get_symbol_hit_rates(self.modes_to_analyse)
-        self.get_custom_hit_rates(modes_to_analyse=self.modes_to_analyse, custom_search_keys=self.custom_keys)
-        self.get_range_hit_counts()
+        self.get_all_mode_information(use_cache=use_cache, num_processes=num_processes)
         print("Successfully loaded PAR-sheet information.")
 
+    def get_all_mode_information(self, use_cache: bool = True, num_processes: int = None) -> None:
+        """
+        Collect PAR-sheet information for every mode. Results are cached using the hash of each mode's lookup
+        tables, force file and analysis parameters, only modes with changed inputs are recomputed (in parallel).
+        """
+        manifest = FileManifest(self.libraryPath)
+        symbol_keys = construct_symbol_keys(self.config)
+        mode_args, cache_keys, mode_results = {}, {}, {}
+        for mode in self.all_modes:
+            lut_path, split_path = return_all_filepaths(self.game_id, mode)
+            input_files = [lut_path, split_path]
+            custom_keys = None
+            if mode in self.modes_to_analyse:
+                force_file = os.path.join(self.libraryPath, "forces", f"force_record_{mode}.json")
+                if not os.path.isfile(force_file):
+                    raise RuntimeError("Force File Does Not Exist.")
+                input_files += [force_file, os.path.join(self.finalLUTPath, f"lookUpTable_{mode}_0.csv")]
+                custom_keys = self.custom_keys
+
+            sub_modes = list(self.mode_fence_info[mode].keys())
+            mode_args[mode] = (
+                self.game_id,
+                mode,
+                sub_modes,
+                self.win_ranges,
+                self.cost_mapping[mode],
+                self.lutPath,
+                custom_keys,
+                self.get_session_args(mode),
+            )
+            params = {"args": mode_args[mode][2:], "symbol_keys": symbol_keys if custom_keys is not None else None}
+            cache_keys[mode] = get_mode_cache_key(manifest, input_files, params)
+            if use_cache:
+                cached_results = load_cached_results(self.libraryPath, mode, cache_keys[mode])
+                if cached_results is not None:
+                    mode_results[mode] = cached_results
+        manifest.save()
+
+        modes_to_compute = [mode for mode in self.all_modes if mode not in mode_results]
+        if len(modes_to_compute) > 0:
+            print(f"Computing PAR-sheet information for modes: {modes_to_compute}")
+            if num_processes is None:
+                num_processes = min(len(modes_to_compute), os.cpu_count() or 1)
+            if num_processes > 1 and len(modes_to_compute) > 1:
+                with Pool(num_processes) as pool:
+                    computed = pool.starmap(analyse_mode, [mode_args[mode] for mode in modes_to_compute])
+            else:
+                computed = [analyse_mode(*mode_args[mode]) for mode in modes_to_compute]
+            for mode, results in zip(modes_to_compute, computed):
+                mode_results[mode] = results
+                save_cached_results(self.libraryPath, mode, cache_keys[mode], results)
+
+        self.mode_hit_rate_info = {mode: mode_results[mode]["mode_hit_rate_info"] for mode in self.all_modes}
+        self.mode_hit_rates = {mode: mode_results[mode]["mode_hit_rates"] for mode in self.all_modes}
+        self.mode_hit_counts = {mode: mode_results[mode]["mode_hit_counts"] for mode in self.all_modes}
+        for summary in [
+            "hr_summary",
+            "av_win_summary",
+            "sim_count_summary",
+            "custom_hr_summary",
+            "custom_av_win_summary",
+            "custom_sim_count_summary",
+            "session_summary",
+        ]:
+            setattr(self, summary, {mode: mode_results[mode][summary] for mode in self.modes_to_analyse})
+
+    def get_session_args(self, mode: str) -> dict:
+        """
+        Session lengths and success threshold of a mode's optimization parameters, so session statistics are
+        comparable to the optimizer's score. Modes without optimization parameters use the defaults.
+        """
+        mode_params = (self.opt_params.get(mode) or {}).get("parameters")
+        if mode_params is None:
+            return {}
+        return {"test_spins": list(mode_params["test_spins"]), "pmb_rtp": mode_params["pmb_rtp"]}
+
     def load_config(self):
         "Load game config details."
         config_class = get_config_class(self.game_id)
@@ -136,47 +281,3 @@ class GameInformation:
                                 mode_fence_info[mode][fences["name"]] = {}
         self.game_type_fences = game_type_mapping
         self.mode_fence_info = mode_fence_info
-
-    def get_mode_split_hit_rates(self, modes_to_analyse=None) -> None:
-        """Separate win information depending on gametype."""
-        if modes_to_analyse is None:
-            modes_to_analyse = self.all_modes
-        mode_hit_rate_info = {}
-        for mode in modes_to_analyse:
-            mode_hit_rate_info[mode] = {}
-            lut_path, split_path = return_all_filepaths(self.game_id, mode)
-            sub_modes = list(self.mode_fence_info[mode].keys())
-            mode_sorted_distributions, total_mode_weight = make_split_win_distribution(
-                lut_path, split_path, sub_modes, "basegame"
-            )
-            sub_mode_hits, sub_mode_probs, sub_mode_rtp_allocation = return_hit_rates(
-                mode_sorted_distributions, total_mode_weight, self.win_ranges, self.cost_mapping[mode]
-            )
-
-            mode_hit_rate_info[mode]["all_gameType_hits"] = sub_mode_hits
-            mode_hit_rate_info[mode]["all_gameType_probs"] = sub_mode_probs
-            mode_hit_rate_info[mode]["all_gameType_rtp"] = sub_mode_rtp_allocation
-
-        self.mode_hit_rate_info = mode_hit_rate_info
-
-    def get_range_hit_counts(self, modes_to_analyse=None) -> None:
-        """Count raw instances of win ranges using initial lookup table."""
-        if modes_to_analyse is None:
-            modes_to_analyse = self.all_modes
-        self.mode_hit_rates, self.mode_hit_counts = get_unoptimized_hits(
-            self.lutPath, self.all_modes, self.win_ranges
-        )
-
-    def get_symbol_hit_rates(self, modes_to_analyse: list) -> None:
-        """Extract symbols from config file and get statistics using optimized lookup tables."""
-        self.hr_summary, self.av_win_summary, self.sim_count_summary = construct_symbol_probabilities(
-            self.config, modes_to_analyse
-        )
-
-    def get_custom_hit_rates(self, modes_to_analyse: list, custom_search_keys: list[dict]) -> None:
-        """Compute hit rates of user defined search conditions."""
-        assert modes_to_analyse is not None, "specify which mode/s to assess"
-        assert custom_search_keys is not None
-        self.custom_hr_summary, self.custom_av_win_summary, self.custom_sim_count_summary = (
-            construct_custom_key_probabilities(self.config, modes_to_analyse, custom_search=custom_search_keys)
-        )
@@ -1,20 +1,12 @@
 """Helper functions for input/output verification"""
 
-import hashlib
+import numpy as np
 import matplotlib.pyplot as plt
 
 
 def compare_payouts_array(array1, array2):
     """verify freegame payouts match"""
-    array1_obj = hashlib.md5()
-    array2_obj = hashlib.md5()
-    for x, y in zip(array1, array2):
-        array1_obj.update(str(x).encode("utf-8"))
-        array2_obj.update(str(y).encode("utf-8"))
-
-    if array1_obj.hexdigest() != array2_obj.hexdigest():
-        return False
-    return True
+    return bool(np.array_equal(np.asarray(array1), np.asarray(array2)))
 
 
 def plot_function_shapes(payouts, old_base_weights, new_base_weights, bonus_weights):
@@ -35,3 +27,10 @@ def print_solution_summary(Efg, H, fg_contribution_in_base, fg_act_hr, fg_act_co
     print(f"Target hit-rate: {H:.6f} (1 in {1/H:.2f})")
     print(f"Derived hit-rate: {fg_act_hr:.6f} (1 in {1/fg_act_hr:.2f})")
     print(f"New total RTP: {new_rtp:.6f}")
+
+
+def print_merge_curve(curve):
+    """display merged base RTP and freegame hit-rate for each target hit-rate"""
+    print(f"{'target hr':>12} {'fg hr (1 in)':>14} {'fg rtp':>10} {'total rtp':>10}")
+    for target_hr, fg_hr, fg_rtp, rtp in zip(curve["target_hr"], curve["fg_hr"], curve["fg_rtp"], curve["rtp"]):
+        print(f"{target_hr:>12.6f} {1/fg_hr:>14.2f} {fg_rtp:>10.4f} {rtp:>10.4f}")
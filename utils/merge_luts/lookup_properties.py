@@ -1,66 +1,103 @@
 """Lookup table properties and helpful functions"""
 
 import os
-from collections import defaultdict
 import numpy as np
+from src.write_data.sim_results import load_lookup_criteria
+from utils.analysis.lookup_table import load_lookup_table, write_lookup_table
 
 
 class LookupProperties:
-    """Extract lookup table characteristics"""
+    """Extract lookup table characteristics as arrays, with the criteria of each row"""
 
     def __init__(self, game_id, mode):
         self.game_id = game_id
-        self.lookup_path = os.path.join("games", game_id, "library", "publish_files", f"LookUpTable_{mode}_0.csv")
-        self.segment_path = os.path.join(
-            "games", game_id, "library", "lookup_tables", f"LookupTableSegmented_{mode}.csv"
-        )
-        self.payouts = []
-        self.payouts_ints = []
-        self.weights_ints = []
-        self.weights_norm = []
-        self.segmented_array = []
-        self.total_weight = 0
-        self.segmented_mapping = defaultdict(str)
-        self.unique_critera = list(set(self.segmented_array))
-        self.criteria_mapping = defaultdict(list)
-        self.win_mapping = defaultdict(list)
-        self.weight_mapping = defaultdict(list)
+        library_path = os.path.join("games", game_id, "library")
+        self.lookup_path = os.path.join(library_path, "publish_files", f"lookUpTable_{mode}_0.csv")
+        self.segment_path = os.path.join(library_path, "lookup_tables", f"lookUpTableSegmented_{mode}.csv")
+        self.sim_results_path = os.path.join(library_path, "sim_results", mode)
         self.read_lookup_table()
-        self.read_segmented_table()
-        self.extract_criteria_indicies()
+        self.read_criteria()
+
+    def __len__(self):
+        return len(self.ids)
 
     def read_lookup_table(self):
         "read csv lookup table"
-        with open(self.lookup_path, "r", encoding="utf-8") as f:
-            for line in f:
-                _, w, p = line.strip().split(",")
-                self.payouts.append(round(int(p) / 100, 3))
-                self.payouts_ints.append(int(p))
-                self.weights_ints.append(int(w))
-                self.total_weight += int(w)
-
-        self.weights_norm = [w / self.total_weight for w in self.weights_ints]
-
-    def read_segmented_table(self):
-        "find criteria mapping"
-        with open(self.segment_path, "r", encoding="utf-8") as f:
-            for line in f:
-                idx, criteria, _, _ = line.strip().split(",")
-                self.segmented_mapping[int(idx)] = criteria
-                self.segmented_array.append(criteria)
-
-    def extract_criteria_indicies(self):
-        "find loookup index for all unique criteria"
-        for idx, entry in enumerate(self.segmented_array):
-            self.criteria_mapping[entry].append(idx)
-            self.win_mapping[entry].append(self.payouts[idx])
-            self.weight_mapping[entry].append(self.weights_ints[idx])
+        self.lookup_table = load_lookup_table(self.lookup_path)
+        self.ids = self.lookup_table.ids
+        self.payouts_ints = self.lookup_table.payouts
+        self.payouts = self.payouts_ints / 100
+        self.weights_ints = self.lookup_table.weights
+        self.total_weight = self.lookup_table.total_weight
+        self.weights_norm = self.weights_ints / self.total_weight
+
+    def read_criteria(self):
+        "find criteria of each lookup row, using stored simulation results if they cover the table"
+        self.criteria_names, self.criteria_index = load_lookup_criteria(
+            self.sim_results_path, self.segment_path, self.lookup_table
+        )
+
+    def get_criteria_mask(self, target_criteria) -> np.ndarray:
+        "boolean mask of lookup rows with the given criteria"
+        if target_criteria not in self.criteria_names:
+            return np.zeros(len(self), dtype=bool)
+        return self.criteria_index == self.criteria_names.index(target_criteria)
 
     def calculate_criteria_av_win(self, target_criteria):
         "find average win conditional on the given criteria"
-        subset_weights = np.array(self.weight_mapping[target_criteria])
-        subset_payouts = np.array(self.win_mapping[target_criteria])
-        return float(subset_payouts @ subset_weights) / self.total_weight
+        mask = self.get_criteria_mask(target_criteria)
+        return float(self.payouts[mask] @ self.weights_ints[mask].astype(np.float64)) / self.total_weight
+
+
+class FreegameMerge:
+    """Freegame rows of the base and bonus tables as arrays, to evaluate the merge at many target hit-rates at once"""
+
+    def __init__(self, base_table: LookupProperties, bonus_table: LookupProperties, freegame_key: str):
+        self.base_table = base_table
+        self.base_mask = base_table.get_criteria_mask(freegame_key)
+        bonus_mask = bonus_table.get_criteria_mask(freegame_key)
+        self.payouts = base_table.payouts[self.base_mask]
+        assert np.array_equal(self.payouts, bonus_table.payouts[bonus_mask]), f"{freegame_key} payouts do not match"
+        self.bonus_probs = bonus_table.weights_ints[bonus_mask] / bonus_table.total_weight
+
+        # Rows outside the freegame criteria keep their weights
+        other_weights = base_table.weights_ints[~self.base_mask].astype(np.float64)
+        self.other_weight = float(other_weights.sum())
+        self.other_win = float(base_table.payouts[~self.base_mask] @ other_weights)
+
+    def get_freegame_weights(self, target_hrs) -> np.ndarray:
+        "integer weights of the freegame rows in the base table, with one row per target hit-rate"
+        w = np.multiply.outer(np.atleast_1d(np.asarray(target_hrs, dtype=np.float64)), self.bonus_probs)
+        return (float(self.base_table.total_weight) * w).astype(np.uint64)
+
+    def get_new_weights(self, target_hr: float) -> np.ndarray:
+        "base table weights with the freegame rows replaced"
+        new_base_weights = np.array(self.base_table.weights_ints, dtype=np.uint64)
+        new_base_weights[self.base_mask] = self.get_freegame_weights(target_hr)[0]
+        return new_base_weights
+
+    def get_curve(self, target_hrs, mode_cost: float = 1.0) -> dict:
+        "RTP, freegame RTP contribution and freegame hit-rate of the merged base table at each target hit-rate"
+        target_hrs = np.atleast_1d(np.asarray(target_hrs, dtype=np.float64))
+        fg_weights = self.get_freegame_weights(target_hrs).astype(np.float64)
+        fg_weight = fg_weights.sum(axis=1)
+        fg_win = fg_weights @ self.payouts
+        total_weight = self.other_weight + fg_weight
+        return {
+            "target_hr": target_hrs,
+            "rtp": (self.other_win + fg_win) / total_weight / mode_cost,
+            "fg_rtp": fg_win / total_weight / mode_cost,
+            "fg_hr": fg_weight / total_weight,
+        }
+
+    def get_target_hr_for_rtp(self, target_rtp: float, mode_cost: float = 1.0) -> float:
+        "target hit-rate giving the merged base table a total RTP (ignoring rounding of weights to integers)"
+        total_weight = float(self.base_table.total_weight)
+        bet_rtp = target_rtp * mode_cost
+        fg_win = total_weight * float(self.payouts @ self.bonus_probs)
+        fg_weight = total_weight * float(self.bonus_probs.sum())
+        assert fg_win != bet_rtp * fg_weight, "freegame average win equals the target RTP"
+        return (bet_rtp * self.other_weight - self.other_win) / (fg_win - bet_rtp * fg_weight)
 
 
 def calculate_new_freegame_probabilities(
@@ -70,29 +107,16 @@ def calculate_new_freegame_probabilities(
     freegame_key: str,
 ):
     """merge optimized bonus lookup into base"""
-    fg_rtp_contribution, fg_act_hr = 0.0, 0.0
-    new_base_weights = []
-    fg_weight_contribution = []
-    counter = 0
-
-    total_base_weight = base_table.total_weight
-    for idx, bp in enumerate(base_table.payouts):
-        if idx in base_table.criteria_mapping[freegame_key]:
-            assert bp == bonus_table.win_mapping[freegame_key][counter]
-            w = target_hr * (bonus_table.weight_mapping[freegame_key][counter] / bonus_table.total_weight)
-            fg_rtp_contribution += bp * w
-            fg_act_hr += w
-            new_base_weights.append(int(total_base_weight * w))
-            fg_weight_contribution.append(int(total_base_weight * w))
-            counter += 1
-        else:
-            new_base_weights.append(base_table.weights_ints[idx])
+    merge = FreegameMerge(base_table, bonus_table, freegame_key)
+    w = target_hr * merge.bonus_probs
+    fg_rtp_contribution = float(merge.payouts @ w)
+    fg_act_hr = float(w.sum())
+    fg_weight_contribution = merge.get_freegame_weights(target_hr)[0]
+    new_base_weights = merge.get_new_weights(target_hr)
 
     return new_base_weights, fg_rtp_contribution, fg_act_hr, fg_weight_contribution
 
 
-def override_optimized_lookup(filename, base_payout, new_weights, sim_start=1):
+def override_optimized_lookup(filename, base_ids, base_payout, new_weights):
     """write new lookup table weights"""
-    with open(filename, "w", encoding="utf-8") as f:
-        for weight, payout in zip(new_weights, base_payout):
-            f.write(f"{sim_start},{weight},{payout}" + "\n")
+    write_lookup_table(filename, np.column_stack([base_ids, new_weights, base_payout]).astype(np.uint64))
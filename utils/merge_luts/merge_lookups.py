@@ -4,6 +4,7 @@ NOTE: This feature is experimental....
 
 import numpy as np
 from utils.merge_luts.lookup_properties import (
+    FreegameMerge,
     LookupProperties,
     calculate_new_freegame_probabilities,
     override_optimized_lookup,
@@ -11,6 +12,7 @@ from utils.merge_luts.lookup_properties import (
 from utils.merge_luts.helper_funcs import (
     compare_payouts_array,
     plot_function_shapes,
+    print_merge_curve,
     print_solution_summary,
 )
 
@@ -19,18 +21,20 @@ def run(game_id: str, swap_key: str, mode_cost: float, plot_overlay=False, overr
     """Main function: only valid for single key swaps from bonus->base substitutions."""
     base_table = LookupProperties(game_id, "base")
     bonus_table = LookupProperties(game_id, "bonus")
+    base_mask = base_table.get_criteria_mask(swap_key)
+    bonus_mask = bonus_table.get_criteria_mask(swap_key)
 
     # verify this substitution method is valid
-    assert len(base_table.criteria_mapping[swap_key]) == len(
-        bonus_table.criteria_mapping[swap_key]
+    assert np.count_nonzero(base_mask) == np.count_nonzero(
+        bonus_mask
     ), f"{swap_key} payout arrays do not match in length"
     assert compare_payouts_array(
-        base_table.win_mapping[swap_key], bonus_table.win_mapping[swap_key]
+        base_table.payouts[base_mask], bonus_table.payouts[bonus_mask]
     ), f"{swap_key} payout arrays must be identical"
 
     # find freegame contribtuion properties from base-game
-    fg_wins = base_table.win_mapping[swap_key]
-    fg_total = np.array(base_table.weight_mapping[swap_key]).sum()
+    fg_wins = base_table.payouts[base_mask]
+    fg_total = base_table.weights_ints[base_mask].sum(dtype=np.float64)
     fg_contribution_in_base = base_table.calculate_criteria_av_win(swap_key) / mode_cost
     Efg = bonus_table.calculate_criteria_av_win("freegame")
 
@@ -39,25 +43,39 @@ def run(game_id: str, swap_key: str, mode_cost: float, plot_overlay=False, overr
     new_base_weights, fg_rtp_contribution, fg_act_hr, fg_weight_contribution = (
         calculate_new_freegame_probabilities(base_table, bonus_table, H, swap_key)
     )
-    new_rtp = np.dot(base_table.payouts, new_base_weights) / sum(new_base_weights)
-    new_fg_total = np.array(fg_weight_contribution).sum()
+    new_rtp = float(base_table.payouts @ new_base_weights.astype(np.float64)) / new_base_weights.sum(
+        dtype=np.float64
+    )
+    new_fg_total = fg_weight_contribution.sum(dtype=np.float64)
 
     print_solution_summary(Efg, H, fg_contribution_in_base, fg_act_hr, fg_rtp_contribution, new_rtp)
 
-    base_fg_norm = [x / fg_total for x in base_table.weight_mapping[swap_key]]
-    new_fg_norm = [x / new_fg_total for x in fg_weight_contribution]
-    bonus_norm = [
-        x / np.array(bonus_table.weight_mapping[swap_key]).sum() for x in bonus_table.weight_mapping[swap_key]
-    ]
+    base_fg_norm = base_table.weights_ints[base_mask] / fg_total
+    new_fg_norm = fg_weight_contribution / new_fg_total
+    bonus_norm = bonus_table.weights_ints[bonus_mask] / bonus_table.weights_ints[bonus_mask].sum(dtype=np.float64)
 
     if override_table:
-        file_name = f"games/{game_id}/library/publish_files/LookUpTable_base_0.csv"
-        override_optimized_lookup(file_name, base_table.payouts_ints, new_base_weights)
+        file_name = f"games/{game_id}/library/publish_files/lookUpTable_base_0.csv"
+        override_optimized_lookup(file_name, base_table.ids, base_table.payouts_ints, new_base_weights)
 
     if plot_overlay:
         plot_function_shapes(fg_wins, base_fg_norm, new_fg_norm, bonus_norm)
 
 
+def run_curve(game_id: str, swap_key: str, mode_cost: float, target_hrs, target_rtp: float = None) -> dict:
+    """
+    Merged base-game RTP and freegame hit-rate at each target hit-rate, reading both tables once.
+    With `target_rtp`, also finds the target hit-rate giving that total RTP.
+    """
+    merge = FreegameMerge(LookupProperties(game_id, "base"), LookupProperties(game_id, "bonus"), swap_key)
+    curve = merge.get_curve(target_hrs, mode_cost)
+    print_merge_curve(curve)
+    if target_rtp is not None:
+        curve["target_hr_for_rtp"] = merge.get_target_hr_for_rtp(target_rtp, mode_cost)
+        print(f"Target hit-rate for RTP {target_rtp:.4f}: {curve['target_hr_for_rtp']:.6f}")
+    return curve
+
+
 if __name__ == "__main__":
 
     GAME_ID = "0_0_lines_feature_match"
@@ -5,24 +5,19 @@ Output statistics tested via RGS
 
 import json
 import os
+import re
 import importlib
-from io import TextIOWrapper
+from array import array
+from multiprocessing import Pool
 import numpy as np
-import zstandard as zst
-import hashlib
-import pickle
-from utils.analysis.distribution_functions import (
-    make_win_distribution,
-    get_distribution_moments,
-    get_distribution_average,
-    non_zero_hitrate,
-    prob_less_than_bet,
-    get_prob_no_win,
-    get_maxwin_hitrate,
-    get_distribution_median,
-    min_dist_difference,
-    calculate_rtp,
-)
+from src.write_data.seekable_books import iter_book_lines
+from utils.analysis.lookup_table import LookupTable, load_lookup_table
+from utils.analysis.distribution_functions import WinDistribution, get_win_distribution
+
+
+# Books written by the simulation engine begin with the id and payout multiplier, and every event starts with its index
+BOOK_HEAD_PATTERN = re.compile(rb'^\{"id":\s*(\d+),\s*"payoutMultiplier":\s*(\d+),\s*"events":\s*\[')
+EVENT_START = b'{"index": '
 
 
 class WinStatistics:
@@ -78,111 +73,124 @@ class WinStatistics:
         return map_object
 
 
-def verify_lookup_format(filename: str) -> list:
+def verify_lookup_format(lookup_table: LookupTable) -> list:
     "Duplicate RGS verification before upload."
-    integer_payouts = []
-    running_weight_total = 0
+    # Loading the table already fails unless all weights and payouts are uint64 values
+    payouts = lookup_table.payouts
+
+    # Payout checks
+    assert np.all((payouts == 0) | (payouts >= 10)), "Minimum non-zero payout is 10 (RGS accepts 'cents' increments)."
+    assert np.all(payouts % 10 == 0), "Payout values must be in increments of 10."
+    integer_payouts = payouts
     min_win, max_win = None, None
-    win_distribution = make_win_distribution(filename)
-
-    with open(filename, "r", encoding="UTF-8") as f:
-        for line in f:
-            _, weight, payout = line.strip().split(",")
-            weight = float(weight)
-            payout = float(payout)
-
-            # Payout checks
-            assert payout.is_integer() and payout >= 0, "Payout mult be uint64 format:"
-            if payout > 0:
-                assert payout >= 10, "Minimum non-zero payout is 10 (RGS accepts 'cents' increments)."
-            assert payout % 10 == 0, "Payout values must be in increments of 10."
-            integer_payouts.append(int(payout))
-
-            if (min_win is None) or (payout < min_win):
-                min_win = payout
-            if (max_win is None) or (payout > max_win):
-                max_win = payout
-            # Weight checks
-            assert weight.is_integer() and weight >= 0, "Weight must be uint64 format."
-            running_weight_total += weight
+    if len(payouts) > 0:
+        min_win, max_win = float(payouts.min()), float(payouts.max())
 
+    # Weight checks
+    running_weight_total = lookup_table.total_weight
     assert running_weight_total <= np.iinfo(np.uint64).max, "Sum of weights must be <= MAX(uint64)"
 
-    return win_distribution, integer_payouts, running_weight_total, min_win, max_win
+    return integer_payouts, float(running_weight_total), min_win, max_win
 
 
-# payout mult value match to lut + length match
-def verify_books_and_payout_mults(books_filename: str) -> list:
-    """Ensure the values written to the books match those in the lookup table exactly."""
+def scan_book_line(line: bytes) -> tuple:
+    """Extract id, payout multiplier and number of events from a single book without decoding it."""
+    match = BOOK_HEAD_PATTERN.match(line)
+    if match is not None and line.rstrip().endswith(b"}"):
+        return int(match.group(1)), int(match.group(2)), line.count(EVENT_START)
+    return parse_book_line(line)
+
+
+def parse_book_line(line: bytes) -> tuple:
+    """Decode a single book, returning id, payout multiplier and number of events."""
+    try:
+        blob = json.loads(line)
+    except json.JSONDecodeError:
+        raise RuntimeError("Invalid JSON format.")
+
+    for key in ["payoutMultiplier", "id", "events"]:
+        if key not in blob:
+            raise RuntimeError(f"Missing required key: {key}")
+    return blob["id"], blob["payoutMultiplier"], len(blob["events"])
+
+
+def scan_books(books_filename: str, full_parse: bool = False) -> tuple:
+    """
+    Return book-id and payout multiplier arrays along with the total number of events.
+    Books written by the simulation engine are read with a field scanner, set `full_parse` to fully decode
+    and validate every book.
+    """
     assert str(books_filename).endswith(".jsonl.zstd") or str(books_filename).endswith(
         "jsonl.zst"
     ), "Verification is only run for compressed book files of format .jsonl.zst."
 
-    book_payout_ints = []
+    read_book = parse_book_line if full_parse else scan_book_line
+    book_ids, book_payouts = array("Q"), array("Q")
     total_num_events = 0
-    with open(books_filename, "rb") as f:
-        decompressor = zst.ZstdDecompressor()
-        with decompressor.stream_reader(f) as reader:
-            txt_stream = TextIOWrapper(reader, encoding="UTF-8")
-            for line in txt_stream:
-                line = line.strip()
-                if not line:
-                    continue
-
-                try:
-                    blob = json.loads(line)
-                except json.JSONDecodeError:
-                    raise RuntimeError("Invalid JSON format.")
-
-                for key in ["payoutMultiplier", "id", "events"]:
-                    if key not in blob:
-                        raise RuntimeError(f"Missing required key: {key}")
-
-                total_num_events += len(blob["events"])
-                book_payout_ints.append(blob["payoutMultiplier"])
+    for line in iter_book_lines(books_filename):
+        book_id, payout, num_events = read_book(line)
+        book_ids.append(book_id)
+        book_payouts.append(payout)
+        total_num_events += num_events
 
+    return np.frombuffer(book_ids, dtype=np.uint64), np.frombuffer(book_payouts, dtype=np.uint64), total_num_events
+
+
+# payout mult value match to lut + length match
+def verify_books_and_payout_mults(books_filename: str, full_parse: bool = False) -> list:
+    """Ensure the values written to the books match those in the lookup table exactly."""
+    _, book_payout_ints, total_num_events = scan_books(books_filename, full_parse)
     return book_payout_ints, total_num_events
 
 
-def compare_payout_values(book_int_payouts, lut_int_payouts) -> None:
+def compare_payout_values(book_int_payouts, lut_int_payouts, name: str = "payout") -> None:
     """Ensure payout multiplier values match between books and lookup tables."""
-    book_ints = pickle.dumps(book_int_payouts)
-    lut_ints = pickle.dumps(lut_int_payouts)
-    assert hashlib.md5(book_ints).hexdigest() == hashlib.md5(lut_ints).hexdigest(), "Mismatch in payout array."
+    book_ints = np.asarray(book_int_payouts, dtype=np.uint64)
+    lut_ints = np.asarray(lut_int_payouts, dtype=np.uint64)
+    assert len(book_ints) == len(lut_ints), (
+        f"Mismatch in {name} array length: {len(book_ints)} books, {len(lut_ints)} lookup table rows."
+    )
+    mismatch = np.flatnonzero(book_ints != lut_ints)
+    if len(mismatch) > 0:
+        idx = int(mismatch[0])
+        raise AssertionError(
+            f"Mismatch in {name} array at index {idx}: book value {book_ints[idx]}, lookup table value "
+            f"{lut_ints[idx]} ({len(mismatch)} total mismatches)."
+        )
 
 
 def get_num_non_zero_payouts(book_int_payouts) -> None:
     """Count non-zero payouts"""
-    return len([p for p in book_int_payouts if p > 0])
+    return int(np.count_nonzero(np.asarray(book_int_payouts) > 0))
 
 
 def get_lut_statistics(
     win_distribution, bet_cost, unique_payouts, weight_range, min_win, max_win, num_events
 ) -> object:
     """Run RGS statistic tests for upload verification."""
-
-    var, std, skew, kurtosis = get_distribution_moments(win_distribution)
+    distribution = get_win_distribution(win_distribution)
+    stats = distribution.get_statistics(bet_cost)
     MathStats = WinStatistics(
         win_distribution=win_distribution,
         num_events=num_events,
         weight_range=weight_range,
         min_win=min_win,
         max_win=max_win,
-        min_diff=min_dist_difference(win_distribution),
+        min_diff=stats["min_diff"],
         unique_wins=unique_payouts,
-        average_wins=float(get_distribution_average(win_distribution)),
-        rtp=calculate_rtp(win_distribution, bet_cost, weight_range),
-        std=std,
-        var=var,
-        hr_max=get_maxwin_hitrate(win_distribution, weight_range),
-        non_zero_hr=non_zero_hitrate(win_distribution, weight_range),
-        prob_nil=get_prob_no_win(win_distribution, weight_range),
-        prob_less_bet=prob_less_than_bet(win_distribution, bet_cost, weight_range),
+        average_wins=float(stats["average_win"]),
+        rtp=stats["rtp"],
+        std=stats["std"],
+        var=stats["var"],
+        hr_max=stats["hr_max"],
+        non_zero_hr=stats["non_zero_hr"],
+        prob_nil=stats["prob_nil"],
+        prob_less_bet=stats["prob_less_bet"],
         num_non_zero_payouts=get_num_non_zero_payouts(unique_payouts),
-        skew=skew,
-        excess_kurtosis=kurtosis,
+        skew=stats["skew"],
+        excess_kurtosis=stats["excess_kurtosis"],
     )
-    median = get_distribution_median(win_distribution, weight_range)
+    median = stats["median"]
     if median > 0:
         m2m = MathStats.average_win / median
         MathStats.m2m = m2m
@@ -191,9 +199,30 @@ def get_lut_statistics(
     return MathStats
 
 
-def execute_all_tests(config, excluded_modes=[]):
-    """Run all tests for a given game"""
-    mode_stats = []
+def verify_mode(name: str, cost: float, book_file: str, lut_file: str, full_parse: bool = False) -> object:
+    """Run all tests for a single bet mode, reading the lookup table and books once each."""
+    if not (os.path.exists(book_file)) or not (os.path.exists(lut_file)):
+        raise RuntimeError("Books/Lookup file does not exist.")
+
+    lookup_table = load_lookup_table(lut_file)
+    lut_payouts, weights_range, min_win, max_win = verify_lookup_format(lookup_table)
+    book_ids, book_payouts, num_events = scan_books(book_file, full_parse)
+
+    compare_payout_values(book_payouts, lut_payouts)
+    compare_payout_values(book_ids, lookup_table.ids, name="book-id")
+
+    StatsObject = get_lut_statistics(
+        WinDistribution.from_lookup_table(lookup_table), cost, lut_payouts, weights_range, min_win, max_win, num_events
+    )
+    # Payout array is not written to the summary, avoid returning it from worker processes
+    StatsObject.unique_wins = None
+    setattr(StatsObject, "name", name)
+    return StatsObject
+
+
+def execute_all_tests(config, excluded_modes=[], num_processes: int = None, full_parse: bool = False):
+    """Run all tests for a given game, verifying bet modes in parallel."""
+    mode_args = []
     for bet_mode in config.bet_modes:
         name = bet_mode.get_name()
         cost = bet_mode.get_cost()
@@ -202,20 +231,15 @@ def execute_all_tests(config, excluded_modes=[]):
             lookup_name = f"lookUpTable_{name}_0.csv"
             book_file = os.path.join(config.publish_path, book_name)
             lut_file = os.path.join(config.publish_path, lookup_name)
+            mode_args.append((name, cost, book_file, lut_file, full_parse))
 
-            if not (os.path.exists(book_file)) or not (os.path.exists(lut_file)):
-                raise RuntimeError("Books/Lookup file does not exist.")
-
-            win_dist, lut_payouts, weights_range, min_win, max_win = verify_lookup_format(lut_file)
-            book_payouts, num_events = verify_books_and_payout_mults(book_file)
-
-            compare_payout_values(book_payouts, lut_payouts)
-
-            StatsObject = get_lut_statistics(
-                win_dist, cost, lut_payouts, weights_range, min_win, max_win, num_events
-            )
-            setattr(StatsObject, "name", name)
-            mode_stats.append(StatsObject)
+    if num_processes is None:
+        num_processes = min(len(mode_args), os.cpu_count() or 1)
+    if num_processes > 1:
+        with Pool(num_processes) as pool:
+            mode_stats = pool.starmap(verify_mode, mode_args)
+    else:
+        mode_stats = [verify_mode(*args) for args in mode_args]
 
     fname = f"games/{config.game_id}/library/stats_summary.json"
     write_all_stats(mode_stats, fname)
@@ -0,0 +1,59 @@
+"""Inverted index over force-record search keys."""
+
+import json
+from collections import defaultdict
+import numpy as np
+
+
+class ForceIndex:
+    """
+    Map each (name, value) search pair to the force-record entries containing it, and each entry to a sorted
+    array of book-ids. Partial key matches become set intersections rather than scans over every entry.
+    """
+
+    def __init__(self, force_record: list):
+        self.force_record = force_record
+        self.key_entries = defaultdict(set)
+        self.entry_ids = []
+        self.times_triggered = np.zeros(len(force_record), dtype=np.int64)
+        for entry_index, entry in enumerate(force_record):
+            for item in entry["search"]:
+                self.key_entries[(item["name"], str(item["value"]))].add(entry_index)
+            self.entry_ids.append(np.sort(np.asarray(entry["bookIds"], dtype=np.uint64)))
+            self.times_triggered[entry_index] = entry["timesTriggered"]
+
+    @classmethod
+    def from_file(cls, force_filename: str) -> "ForceIndex":
+        """Construct index from a `force_record_<mode>.json` file."""
+        with open(force_filename, "r", encoding="UTF-8") as f:
+            return cls(json.load(f))
+
+    def find_entries(self, search_keys: dict) -> list:
+        """Sorted indices of entries containing all given key/value pairs, values compared as strings."""
+        if len(search_keys) == 0:
+            return list(range(len(self.entry_ids)))
+        entry_sets = sorted((self.key_entries.get((k, str(v)), set()) for k, v in search_keys.items()), key=len)
+        return sorted(set.intersection(*entry_sets))
+
+    def get_times_triggered(self, search_keys: dict) -> int:
+        """Total number of times matching entries were recorded."""
+        return int(self.times_triggered[self.find_entries(search_keys)].sum())
+
+    def get_entry_book_ids(self, search_keys: dict) -> np.ndarray:
+        """Book-ids of each matching entry, concatenated (ids appearing in several entries are repeated)."""
+        entry_ids = [self.entry_ids[idx] for idx in self.find_entries(search_keys)]
+        if len(entry_ids) == 0:
+            return np.empty(0, dtype=np.uint64)
+        return np.concatenate(entry_ids)
+
+    def get_book_ids(self, search_keys: dict) -> np.ndarray:
+        """Sorted unique book-ids with a partial match to the given search keys."""
+        return np.unique(self.get_entry_book_ids(search_keys))
+
+    def get_intersecting_book_ids(self, search_array: list) -> np.ndarray:
+        """Sorted book-ids matching every search key in the array."""
+        book_ids = None
+        for search_keys in search_array:
+            key_ids = self.get_book_ids(search_keys)
+            book_ids = key_ids if book_ids is None else np.intersect1d(book_ids, key_ids, assume_unique=True)
+        return book_ids if book_ids is not None else np.empty(0, dtype=np.uint64)
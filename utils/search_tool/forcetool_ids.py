@@ -4,6 +4,9 @@ import os
 import importlib
 import json
 from typing import List, Dict
+import numpy as np
+from utils.analysis.lookup_table import load_lookup_table
+from utils.search_tool.force_index import ForceIndex
 
 
 def load_game_config(game_id: str):
@@ -35,6 +38,7 @@ class ForceTool:
         self.config = load_game_config(game_id)
         self.target_mode = game_mode
         self.current_force_file = None
+        self.force_index = None
         self.search_keys = None
         self.method = None  # For payout range search only
 
@@ -45,8 +49,8 @@ class ForceTool:
     def load_force_file(self):
         "Load JSON format force file."
         force_name = self.get_force_file_name()
-        with open(force_name, "r", encoding="UTF-8") as f:
-            self.current_force_file = json.loads(f.read())
+        self.force_index = ForceIndex.from_file(force_name)
+        self.current_force_file = self.force_index.force_record
 
     def print_search_results(self, search_criteria, simulation_ids: List, filename: str, game_mode: str):
         """Record"""
@@ -79,14 +83,9 @@ class ForceTool:
         """
         assert search_keys is not None, "must specify serach keys and game_mode"
 
-        if reload_force_json:
+        if reload_force_json or self.force_index is None:
             self.load_force_file()
-        matched_book_ids = set()
-        for entry in self.current_force_file:
-            tranform_serach = self.transform_serch_dict(entry)
-            if all(tranform_serach.get(k) == v for k, v in search_keys.items()):
-                for idx in entry["bookIds"]:
-                    matched_book_ids.add(int(idx))
+        matched_book_ids = set(self.force_index.get_book_ids(search_keys).tolist())
 
         if len(matched_book_ids) == 0:
             raise Warning("No book-ids found.")
@@ -133,20 +132,17 @@ class ForceTool:
                 self.config.library_path, "lookup_tables", f"lookUpTable_{self.target_mode}.csv"
             )
 
-        recorded_ids = []
-        with open(lookup_name, "r", encoding="UTF-8") as f:
-            lines = f.readlines()
-            for line in lines:
-                line_val = int(line.strip().split(",")[-1])
-                sim_id = int(line.strip().split(",")[0])
-                if (
-                    (self.method == "RANGE" and line_val >= min_payout and line_val < max_payout)
-                    or (self.method == "MAX" and line_val < max_payout)
-                    or (self.method == "MIN" and line_val < min_payout)
-                ):
-                    recorded_ids.append(sim_id)
-
-                    if count_limit is not None and len(recorded_ids) >= count_limit:
-                        break
-
-        return recorded_ids
+        lookup_table = load_lookup_table(lookup_name)
+        payouts = lookup_table.payouts.astype(np.int64)
+        if self.method == "RANGE":
+            in_range = (payouts >= min_payout) & (payouts < max_payout)
+        elif self.method == "MAX":
+            in_range = payouts < max_payout
+        else:
+            in_range = payouts < min_payout
+
+        recorded_ids = lookup_table.ids[in_range]
+        if count_limit is not None:
+            recorded_ids = recorded_ids[:count_limit]
+
+        return recorded_ids.tolist()
@@ -5,47 +5,123 @@ import argparse
 import sys
 import os
 import json
+import numpy as np
 
 ABS_PATH = Path(__file__).parent.parent
-sys.path.append(ABS_PATH)
+sys.path.append(str(ABS_PATH))
 os.chdir(ABS_PATH)
 
+from src.write_data.file_manifest import FileManifest, HashingFileWriter
+from utils.analysis.lookup_table import iter_lookup_text, load_lookup_table, parse_lookup_text
+
 
 def swap_tables(game_name: str, game_mode: str, target_file_number: int):
-    """Replace default optimization table."""
+    """
+    Replace default optimization table.
+
+    The optimization file is copied a block at a time to a temporary file, with the id and payout columns checked
+    against the current lookup table. The published table is only replaced once the whole file has been verified.
+    """
 
     target_file = f"{game_mode}_0_{target_file_number}.csv"
     lut_name = f"lookUpTable_{game_mode}_0.csv"
-    new_lut_file = os.path.join("games", game_name, "library", "publish_files", lut_name)
-    new_opt_file = os.path.join("games", game_name, "library", "optimization_files", target_file)
-
-    start_recording = False
-
-    with open(new_opt_file, "r", encoding="UTF-8") as infile, open(new_lut_file, "w", encoding="UTF-8") as outfile:
-        for line in infile:
-            line = line.strip()
+    library_path = os.path.join("games", game_name, "library")
+    new_lut_file = os.path.join(library_path, "publish_files", lut_name)
+    new_opt_file = os.path.join(library_path, "optimization_files", target_file)
+
+    current_lut_file = new_lut_file
+    if not os.path.isfile(current_lut_file):
+        current_lut_file = os.path.join(library_path, "lookup_tables", f"lookUpTable_{game_mode}.csv")
+    current_table = load_lookup_table(current_lut_file)
+
+    temp_file = f"{new_lut_file}.{os.getpid()}.tmp"
+    writer = HashingFileWriter(temp_file, lookup=True)
+    try:
+        num_rows = 0
+        for table in iter_distribution_tables(new_opt_file):
+            current_ids = current_table.ids[num_rows : num_rows + len(table)]
+            current_payouts = current_table.payouts[num_rows : num_rows + len(table)]
+            if len(current_ids) != len(table) or not np.array_equal(current_ids, table[:, 0]):
+                raise ValueError(f"Book ids of {new_opt_file} do not match {current_lut_file}.")
+            if not np.array_equal(current_payouts, table[:, 2]):
+                raise ValueError(f"Payouts of {new_opt_file} do not match {current_lut_file}.")
+            for text in iter_lookup_text(table):
+                writer.write(text)
+            num_rows += len(table)
+        if num_rows != len(current_table):
+            raise ValueError(
+                f"{new_opt_file} has {num_rows} rows, but {current_lut_file} has {len(current_table)} rows."
+            )
+        details = writer.close()
+    except Exception:
+        writer.close()
+        os.remove(temp_file)
+        raise
+
+    os.replace(temp_file, new_lut_file)
+    manifest = FileManifest(library_path)
+    manifest.record(new_lut_file, details)
+    manifest.save()
+
+
+def iter_distribution_tables(opt_file: str, chunk_size: int = 1 << 22):
+    """Yield (rows, 3) arrays from the Distribution section of an optimization file, a block of text at a time."""
+    with open(opt_file, "r", encoding="UTF-8") as f:
+        while True:
+            line = f.readline()
             if not line:
-                continue
-            if start_recording:
-                parts = line.split(",")
-                if len(parts) != 3:
-                    raise SyntaxError(f"Malformed line, expecting [id,weight,payout]. Have: {parts}")
-                try:
-                    idx = int(parts[0])
-                    weight = int(parts[1])
-                    payout_str = parts[2].strip()
-                    # Check if payout is already in cents (integer) or needs conversion (float)
-                    if '.' in payout_str:
-                        # Float format - convert to cents
-                        payout = int(round(float(payout_str) * 100, 0))
-                    else:
-                        # Already in cents - use as is
-                        payout = int(payout_str)
-                    outfile.write(f"{idx},{weight},{payout}\n")
-                except Exception as e:
-                    raise ValueError(f"Could not write transformed line: {e}")
-            elif line == "Distribution":
-                start_recording = True
+                return
+            if line.strip() == "Distribution":
+                break
+
+        partial_row = ""
+        while True:
+            data = f.read(chunk_size)
+            if not data:
+                break
+            data = partial_row + data
+            split_index = data.rfind("\n") + 1
+            partial_row = data[split_index:]
+            if split_index > 0:
+                yield parse_distribution_text(data[:split_index])
+        if len(partial_row.strip()) > 0:
+            yield parse_distribution_text(partial_row)
+
+
+def parse_distribution_text(distribution: str) -> np.ndarray:
+    """Parse complete distribution rows into a (rows, 3) uint64 array."""
+    try:
+        return parse_lookup_text(distribution)
+    except ValueError:
+        # Payouts given as floats, or irregular rows
+        return np.array(parse_distribution_lines(distribution), dtype=np.uint64).reshape(-1, 3)
+
+
+def parse_distribution_lines(distribution: str) -> list:
+    """Parse optimization file rows individually, converting float payouts to cents."""
+    table = []
+    for line in distribution.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        parts = line.split(",")
+        if len(parts) != 3:
+            raise SyntaxError(f"Malformed line, expecting [id,weight,payout]. Have: {parts}")
+        try:
+            idx = int(parts[0])
+            weight = int(parts[1])
+            payout_str = parts[2].strip()
+            # Check if payout is already in cents (integer) or needs conversion (float)
+            if '.' in payout_str:
+                # Float format - convert to cents
+                payout = int(round(float(payout_str) * 100, 0))
+            else:
+                # Already in cents - use as is
+                payout = int(payout_str)
+            table.append([idx, weight, payout])
+        except Exception as e:
+            raise ValueError(f"Could not write transformed line: {e}")
+    return table
 
 
 def process_many_files(game_id, file_dict: dict) -> None: